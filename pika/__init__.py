@@ -16,6 +16,8 @@ from pika.connection import ConnectionParameters
 from pika.connection import URLParameters
 from pika.credentials import PlainCredentials
 from pika.spec import BasicProperties
+from pika.properties import BasicPropertiesTemplate
+from pika.properties import FrozenBasicProperties
 
 from pika.adapters import BaseConnection
 from pika.adapters import AsyncoreConnection
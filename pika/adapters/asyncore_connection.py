@@ -45,6 +45,12 @@ class PikaDispatcher(asyncore.dispatcher):
     def fileno(self):
         return self.socket.fileno()
 
+    def recv_into(self, buffer, nbytes=0):
+        return self.socket.recv_into(buffer, nbytes)
+
+    def send(self, data):
+        return self.socket.send(data)
+
     def sendall(self, data):
         return self.socket.sendall(data)
 
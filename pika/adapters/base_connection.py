@@ -10,6 +10,7 @@ import ssl
 
 from pika import connection
 from pika import exceptions
+from pika import frame
 
 try:
     SOL_TCP = socket.SOL_TCP
@@ -31,6 +32,27 @@ class BaseConnection(connection.Connection):
     DO_HANDSHAKE = True
     WARN_ABOUT_IOLOOP = False
 
+    # Adapters driven by an IOLoop put the socket in non-blocking mode once it
+    # is connected and write what the socket accepts on each WRITE event.
+    # Adapters that block on the socket write all of the frames before
+    # returning instead.
+    BLOCKING_SOCKET = False
+
+    # Limits for gathering queued frames into a single socket write. The
+    # frames are joined, so the size limit bounds how much is copied for each
+    # write.
+    MAX_WRITE_FRAMES = 1024
+    MAX_WRITE_SIZE = 131072
+
+    # Budget for draining a non-blocking socket on a READ event. Reads
+    # continue until the socket would block, a read returns less than was
+    # asked for, or MAX_READ_SIZE bytes or MAX_READ_FRAMES frames have been
+    # received, so that a busy connection still yields to timers and to other
+    # connections on the IOLoop. Setting either limit to 0 reads once per
+    # event.
+    MAX_READ_SIZE = 1048576
+    MAX_READ_FRAMES = 4096
+
     def __init__(self,
                  parameters=None,
                  on_open_callback=None,
@@ -201,6 +223,10 @@ class BaseConnection(connection.Connection):
                     sock_addr_tuple[4][0], sock_addr_tuple[4][1], error)
                 LOGGER.error(error)
                 return error
+
+        if not self.BLOCKING_SOCKET:
+            self.socket.setblocking(0)
+
         # Made it this far
         return None
 
@@ -283,13 +309,14 @@ class BaseConnection(connection.Connection):
 
         elif self.params.ssl and isinstance(error_value, ssl.SSLError):
 
-            if error_value.args[0] == ssl.SSL_ERROR_WANT_READ:
-                self.event_state = self.READ
-            elif error_value.args[0] == ssl.SSL_ERROR_WANT_WRITE:
-                self.event_state = self.WRITE
-            else:
-                LOGGER.error("SSL Socket error on fd %d: %r",
-                             self.socket.fileno(), error_value)
+            # The SSL socket needs to wait for the socket to be readable or
+            # writable, and the operation is retried on the next event
+            if error_value.args[0] in (ssl.SSL_ERROR_WANT_READ,
+                                       ssl.SSL_ERROR_WANT_WRITE):
+                LOGGER.debug("Ignoring SSL %s", error_value.args[0])
+                return
+            LOGGER.error("SSL Socket error on fd %d: %r",
+                         self.socket.fileno(), error_value)
         elif error_code == errno.EPIPE:
             # Broken pipe, happens when connection reset
             LOGGER.error("Socket connection was broken")
@@ -302,24 +329,34 @@ class BaseConnection(connection.Connection):
         self._handle_disconnect()
 
     def _handle_events(self, fd, events, error=None, write_only=False):
-        """Handle IO/Event loop events, processing them.
+        """Handle IO/Event loop events, processing them. Returns the READ and
+        WRITE events that were handled and that the socket may still be ready
+        for, for pollers that are only told when the socket becomes ready:
+        READ if the read budget was spent before the socket was drained, and
+        WRITE if the socket accepted everything that was written to it.
 
         :param int fd: The file descriptor for the events
         :param int events: Events from the IO/Event loop
         :param int error: Was an error specified
         :param bool write_only: Only handle write events
+        :rtype: int
 
         """
         if not fd:
             LOGGER.error('Received events on closed socket: %d', fd)
             return
 
+        ready = 0
         if events & self.WRITE:
             self._handle_write()
             self._manage_event_state()
+            if not self._write_blocked:
+                ready |= self.WRITE
 
         if not write_only and (events & self.READ):
             self._handle_read()
+            if self._read_budget_spent:
+                ready |= self.READ
 
         if write_only and (events & self.READ) and (events & self.ERROR):
             LOGGER.error('BAD libc:  Write-Only but Read+Error. '
@@ -330,41 +367,118 @@ class BaseConnection(connection.Connection):
             LOGGER.error('Error event %r, %r', events, error)
             self._handle_error(error)
 
+        return ready
+
     def _handle_read(self):
-        """Read from the socket and call our on_data_available with the data."""
+        """Read from the socket straight into the frame buffer of the
+        connection and process the frames received. A non-blocking socket is
+        read from until it is drained or the read budget set by MAX_READ_SIZE
+        and MAX_READ_FRAMES is spent, returning the number of bytes read.
+
+        Data that an SSL socket has already decrypted is always read, budget
+        or not, since it will not make the socket readable again. SSL reads
+        return at most one record, so a short read does not mean that the
+        socket is drained.
+
+        :rtype: int
+
+        """
+        self._read_budget_spent = False
+        buffer_size = self._buffer_size
+        frame_limit = self.frames_received + self.MAX_READ_FRAMES
+        short_read_drains = not self.params.ssl
+        bytes_read = 0
+        while True:
+            byte_count = self._read_frame_buffer(buffer_size)
+            if not byte_count:
+                return bytes_read or byte_count
+            bytes_read += byte_count
+            if self._ssl_pending():
+                continue
+            if (self.BLOCKING_SOCKET or not self.socket or
+                    (short_read_drains and byte_count < buffer_size)):
+                return bytes_read
+            if (bytes_read >= self.MAX_READ_SIZE or
+                    self.frames_received >= frame_limit):
+                self._read_budget_spent = True
+                return bytes_read
+
+    def _read_frame_buffer(self, buffer_size):
+        """Read up to buffer_size bytes from the socket into the frame buffer
+        and process the frames received, returning the number of bytes read.
+
+        :param int buffer_size: The maximum number of bytes to read
+        :rtype: int
+
+        """
+        space = self._frame_buffer_space(buffer_size)
         try:
-            if self.params.ssl:
-                data = self.socket.read(self._buffer_size)
-            else:
-                data = self.socket.recv(self._buffer_size)
+            byte_count = self.socket.recv_into(space, buffer_size)
         except socket.timeout:
             raise
         except socket.error as error:
             return self._handle_error(error)
+        finally:
+            del space
 
         # Empty data, should disconnect
-        if not data or data == 0:
+        if not byte_count:
             LOGGER.error('Read empty data, calling disconnect')
             return self._handle_disconnect()
 
-        # Pass the data into our top level frame dispatching method
-        self._on_data_available(data)
-        return len(data)
+        # Process the frames in the data received
+        self._on_frame_buffer_filled(byte_count)
+        return byte_count
 
     def _handle_write(self):
-        """Handle any outbound buffer writes that need to take place."""
+        """Handle any outbound buffer writes that need to take place, writing
+        as many of the queued frames as possible with a single call. With a
+        non-blocking socket, the frames that the socket did not accept are put
+        back at the front of the outbound buffer to be written on the next
+        WRITE event.
+
+        If the body of a message that is read from a file or an mmap can not
+        be read, the connection is closed, since the frames sent before it
+        leave the broker in the middle of the message.
+
+        :rtype: int
+
+        """
+        self._write_blocked = False
         bytes_written = 0
         if self.outbound_buffer:
-            frame = self.outbound_buffer.popleft()
             try:
-                self.socket.sendall(frame)
-                bytes_written = len(frame)
+                frames = self._pop_outbound_frames()
+            except (IOError, OSError, ValueError) as error:
+                LOGGER.error('Could not read the body of a message being '
+                             'sent, closing the connection: %s', error)
+                return self._handle_disconnect()
+            try:
+                if self.BLOCKING_SOCKET:
+                    bytes_written = self._send_all(frames)
+                else:
+                    bytes_written = self._send(frames)
             except socket.timeout:
                 raise
             except socket.error as error:
+                if not self.BLOCKING_SOCKET:
+                    self.outbound_buffer.extendleft(reversed(frames))
+                    self._write_blocked = True
                 return self._handle_error(error)
         return bytes_written
 
+    def _ssl_pending(self):
+        """Return the number of bytes that the SSL socket has decrypted and
+        buffered, which can be read without waiting for the socket to become
+        readable.
+
+        :rtype: int
+
+        """
+        if not self.params.ssl or not self.socket:
+            return 0
+        return self.socket.pending()
+
     def _init_connection_state(self):
         """Initialize or reset all of our internal state variables for a given
         connection. If we disconnect and reconnect, all of our state needs to
@@ -376,6 +490,8 @@ class BaseConnection(connection.Connection):
         self.base_events = self.READ | self.ERROR
         self.event_state = self.base_events
         self.socket = None
+        self._read_budget_spent = False
+        self._write_blocked = False
 
     def _manage_event_state(self):
         """Manage the bitmask for reading/writing/error which is used by the
@@ -392,6 +508,86 @@ class BaseConnection(connection.Connection):
             self.event_state = self.base_events
             self.ioloop.update_handler(self.socket.fileno(), self.event_state)
 
+    def _pop_outbound_frames(self):
+        """Remove and return the frames at the front of the outbound buffer
+        that can be written together, up to MAX_WRITE_FRAMES frames and
+        MAX_WRITE_SIZE bytes. A single frame larger than MAX_WRITE_SIZE is
+        returned on its own. The frames of a body that is read from a file or
+        an mmap are marshaled here, one at a time, and its pika.frame.BodyFrames
+        are removed once they have all been marshaled.
+
+        :rtype: list
+
+        """
+        frames = list()
+        size = 0
+        while self.outbound_buffer and len(frames) < self.MAX_WRITE_FRAMES:
+            value = self.outbound_buffer[0]
+            body_frames = isinstance(value, frame.BodyFrames)
+            length = value.next_frame_size if body_frames else len(value)
+            if frames and size + length > self.MAX_WRITE_SIZE:
+                break
+            if body_frames:
+                frames.append(value.marshal_next())
+                if not value:
+                    self.outbound_buffer.popleft()
+            else:
+                frames.append(self.outbound_buffer.popleft())
+            size += length
+        return frames
+
+    def _send(self, frames):
+        """Write as much of the frames as the non-blocking socket accepts with
+        a single call, putting the rest back at the front of the outbound
+        buffer. A partially written frame is put back as a memoryview of its
+        unwritten tail instead of being copied.
+
+        :param list frames: The frames to write
+        :rtype: int
+
+        """
+        if len(frames) == 1:
+            sent = self.socket.send(frames[0])
+        else:
+            sent = self.socket.send(self._join_frames(frames))
+        unsent = sent
+        while frames and unsent >= len(frames[0]):
+            unsent -= len(frames.pop(0))
+        if frames:
+            if unsent:
+                frames[0] = memoryview(frames[0])[unsent:]
+            self.outbound_buffer.extendleft(reversed(frames))
+            self._write_blocked = True
+        return sent
+
+    def _send_all(self, frames):
+        """Write all of the frames to the blocking socket.
+
+        :param list frames: The frames to write
+        :rtype: int
+
+        """
+        size = sum(map(len, frames))
+        if len(frames) == 1:
+            self.socket.sendall(frames[0])
+        else:
+            self.socket.sendall(self._join_frames(frames))
+        return size
+
+    def _join_frames(self, frames):
+        """Join the frames into a single buffer to write. The frames may
+        include the memoryview of a partially written frame, which
+        bytearray.join does not accept.
+
+        :param list frames: The frames to join
+        :rtype: bytearray
+
+        """
+        data = bytearray()
+        for value in frames:
+            data += value
+        return data
+
     def _wrap_socket(self, sock):
         """Wrap the socket for connecting over SSL.
 
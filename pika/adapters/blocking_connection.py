@@ -12,6 +12,7 @@ classes.
 """
 import os
 import logging
+import math
 import select
 import socket
 import time
@@ -24,6 +25,7 @@ from pika import callback
 from pika import channel
 from pika import exceptions
 from pika import spec
+from pika import timer
 from pika import utils
 from pika.adapters import base_connection
 
@@ -89,6 +91,25 @@ class ReadPoller(object):
                                                             self.poll_timeout)
             return bool(ready)
 
+    @retry_on_eintr
+    def wait(self, timeout):
+        """Wait for the socket to have data to read for up to timeout seconds,
+        or for as long as it takes if timeout is None.
+
+        :param float timeout: The number of seconds to wait
+        :rtype: bool
+
+        """
+        if self.poller:
+            # poll takes whole milliseconds, rounded up so that it does not
+            # return just before a deadline
+            if timeout is not None:
+                timeout = int(math.ceil(timeout * 1000))
+            return bool(self.poller.poll(timeout))
+        ready, unused_wri, unused_err = select_function([self.fd], [], [],
+                                                        timeout)
+        return bool(ready)
+
 
 class BlockingConnection(base_connection.BaseConnection):
     """The BlockingConnection creates a layer on top of Pika's asynchronous core
@@ -112,21 +133,33 @@ class BlockingConnection(base_connection.BaseConnection):
     blocking_connection adapter.
 
     """
+    BLOCKING_SOCKET = True
     WRITE_TO_READ_RATIO = 10
     DO_HANDSHAKE = True
+    # No longer used, since sleep() waits for the time it has left instead of
+    # taking naps of this length. Kept for code that reads or overrides it.
     SLEEP_DURATION = 0.1
     SOCKET_CONNECT_TIMEOUT = 0.25
     SOCKET_TIMEOUT_THRESHOLD = 12
     SOCKET_TIMEOUT_CLOSE_THRESHOLD = 3
     SOCKET_TIMEOUT_MESSAGE = "Timeout exceeded, disconnected"
 
-    def __init__(self, parameters=None):
-        """Create a new instance of the Connection object.
+    def __init__(self, parameters=None, busy_poll=0):
+        """Create a new instance of the Connection object. Services that make
+        many RPC round trips can trade CPU time for latency by setting
+        busy_poll, the number of microseconds to poll the socket without
+        blocking when waiting for data before blocking on it. This only pays
+        off when the process has a CPU core to itself, since polling keeps
+        the core busy. It can be changed later by setting the busy_poll
+        attribute.
 
         :param pika.connection.Parameters parameters: Connection parameters
+        :param int busy_poll: Microseconds to poll without blocking, 0 to
+                              block right away
         :raises: RuntimeError
 
         """
+        self.busy_poll = busy_poll
         super(BlockingConnection, self).__init__(parameters, None, False)
 
     def add_on_close_callback(self, callback_method_unused):
@@ -172,15 +205,10 @@ class BlockingConnection(base_connection.BaseConnection):
 
         :param int deadline: The number of seconds to wait to call callback
         :param method callback_method: The callback method
-        :rtype: str
+        :rtype: object
 
         """
-
-        value = {'deadline': time.time() + deadline,
-                 'callback': callback_method}
-        timeout_id = hash(frozenset(value.items()))
-        self._timeouts[timeout_id] = value
-        return timeout_id
+        return self._timeouts.add(deadline, callback_method)
 
     def channel(self, channel_number=None):
         """Create a new channel with the next available or specified channel #.
@@ -211,11 +239,11 @@ class BlockingConnection(base_connection.BaseConnection):
         if self._has_open_channels:
             self._close_channels(reply_code, reply_text)
         while self._has_open_channels:
-            self.process_data_events()
+            self.process_data_events(time_limit=None)
         if self.socket:
             self._send_connection_close(reply_code, reply_text)
         while self.is_closing:
-            self.process_data_events()
+            self.process_data_events(time_limit=None)
         if self.heartbeat:
             self.heartbeat.stop()
         self._remove_connection_callbacks()
@@ -231,13 +259,23 @@ class BlockingConnection(base_connection.BaseConnection):
         if error:
             raise exceptions.AMQPConnectionError(error)
 
-    def process_data_events(self):
+    def process_data_events(self, time_limit=0.01):
         """Will make sure that data events are processed. Your app can
-        block on this method.
+        block on this method. It waits for up to time_limit seconds for data
+        from RabbitMQ, returning early once data has been received and
+        processed or a timeout added with add_timeout is due. A time_limit of
+        0 only processes what can be read without waiting, and a time_limit
+        of None waits for as long as it takes.
+
+        :param float time_limit: The maximum number of seconds to wait
+        :raises: pika.exceptions.ConnectionClosed
 
         """
+        if not self.socket:
+            raise exceptions.ConnectionClosed()
+        self._flush_outbound()
         try:
-            if self._handle_read():
+            if self._handle_read(self._get_wait_timeout(time_limit)):
                 self._socket_timeouts = 0
         except AttributeError:
             raise exceptions.ConnectionClosed()
@@ -247,20 +285,17 @@ class BlockingConnection(base_connection.BaseConnection):
         self.process_timeouts()
 
     def process_timeouts(self):
-        """Process the self._timeouts event stack"""
-        for timeout_id in self._timeouts.keys():
-            if self._deadline_passed(timeout_id):
-                self._call_timeout_method(self._timeouts.pop(timeout_id))
+        """Call the callbacks of the timeouts that are due"""
+        self._timeouts.process()
 
     def remove_timeout(self, timeout_id):
         """Remove the timeout from the IOLoop by the ID returned from
         add_timeout.
 
-        :param str timeout_id: The id of the timeout to remove
+        :param object timeout_id: The id of the timeout to remove
 
         """
-        if timeout_id in self._timeouts:
-            del self._timeouts[timeout_id]
+        self._timeouts.remove(timeout_id)
 
     def send_method(self, channel_number, method_frame, content=None):
         """Constructs a RPC method frame and then sends it to the broker.
@@ -277,15 +312,16 @@ class BlockingConnection(base_connection.BaseConnection):
         """A safer way to sleep than calling time.sleep() directly which will
         keep the adapter from ignoring frames sent from RabbitMQ. The
         connection will "sleep" or block the number of seconds specified in
-        duration in small intervals.
+        duration, waking up only to process frames and timeouts.
 
         :param int duration: The time to sleep
 
         """
         deadline = time.time() + duration
-        while time.time() < deadline:
-            time.sleep(self.SLEEP_DURATION)
-            self.process_data_events()
+        remaining = duration
+        while remaining > 0:
+            self.process_data_events(remaining)
+            remaining = deadline - time.time()
 
     def _adapter_connect(self):
         """Connect to the RabbitMQ broker
@@ -302,11 +338,11 @@ class BlockingConnection(base_connection.BaseConnection):
         self.socket.settimeout(self.SOCKET_CONNECT_TIMEOUT)
         self._frames_written_without_read = 0
         self._socket_timeouts = 0
-        self._timeouts = dict()
+        self._timeouts = timer.TimerQueue()
         self._read_poller = ReadPoller(self.socket.fileno())
         self._on_connected()
         while not self.is_open:
-            self.process_data_events()
+            self.process_data_events(time_limit=None)
         self.socket.settimeout(self.params.socket_timeout)
         self._set_connection_state(self.CONNECTION_OPEN)
 
@@ -318,35 +354,59 @@ class BlockingConnection(base_connection.BaseConnection):
         self._check_state_on_disconnect()
         self._init_connection_state()
 
-    def _call_timeout_method(self, timeout_value):
-        """Execute the method that was scheduled to be called.
+    def _get_wait_timeout(self, time_limit):
+        """Return the number of seconds to wait for data, which is time_limit
+        unless a timeout added with add_timeout is due before then. None
+        waits for as long as it takes.
 
-        :param dict timeout_value: The configuration for the timeout
+        :param float time_limit: The maximum number of seconds to wait
+        :rtype: float
 
         """
-        LOGGER.debug('Invoking scheduled call of %s', timeout_value['callback'])
-        timeout_value['callback']()
+        return self._timeouts.get_timeout(time_limit)
 
-    def _deadline_passed(self, timeout_id):
-        """Returns True if the deadline has passed for the specified timeout_id.
+    def _handle_read(self, timeout=0):
+        """If the ReadPoller says there is data to read, or there is within
+        timeout seconds, read it in the _handle_read of the parent class. Once
+        read, reset the counter that keeps track of how many frames have been
+        written since the last read. Data already decrypted by an SSL socket
+        is read without polling, since the poller does not see it.
 
-        :param str timeout_id: The id of the timeout to check
-        :rtype: bool
+        :param float timeout: The number of seconds to wait for data, or None
+                              to wait until there is data
+        :rtype: int
 
         """
-        if timeout_id not in self._timeouts.keys():
-            return False
-        return self._timeouts[timeout_id]['deadline'] <= time.time()
+        if self._ssl_pending() or self._wait_for_data(timeout):
+            bytes_read = super(BlockingConnection, self)._handle_read()
+            self._frames_written_without_read = 0
+            return bytes_read
+
+    def _wait_for_data(self, timeout):
+        """Wait for the socket to have data to read for up to timeout seconds,
+        or for as long as it takes if timeout is None. With busy_poll set, the
+        socket is polled without blocking for up to busy_poll microseconds
+        first, so that a reply that arrives within that time is read without
+        waiting to be woken up by the kernel.
 
-    def _handle_read(self):
-        """If the ReadPoller says there is data to read, try adn read it in the
-        _handle_read of the parent class. Once read, reset the counter that
-        keeps track of how many frames have been written since the last read.
+        :param float timeout: The number of seconds to wait
+        :rtype: bool
 
         """
-        if self._read_poller.ready():
-            super(BlockingConnection, self)._handle_read()
-            self._frames_written_without_read = 0
+        if self.busy_poll and timeout != 0:
+            start = time.time()
+            deadline = start + self.busy_poll / 1000000.0
+            if timeout is not None:
+                deadline = min(deadline, start + timeout)
+            while True:
+                if self._read_poller.wait(0):
+                    return True
+                now = time.time()
+                if now >= deadline:
+                    break
+            if timeout is not None:
+                timeout = max(timeout - (now - start), 0)
+        return self._read_poller.wait(timeout)
 
     def _handle_timeout(self):
         """Invoked whenever the socket times out"""
@@ -371,8 +431,12 @@ class BlockingConnection(base_connection.BaseConnection):
             raise exceptions.ConnectionClosed()
 
     def _flush_outbound(self):
-        """Flush the outbound socket buffer."""
-        if self.outbound_buffer:
+        """Flush the outbound socket buffer, writing until it is empty so that
+        the body frames of a message that are marshaled as they are written
+        are all sent.
+
+        """
+        while self.outbound_buffer:
             try:
                 if self._handle_write():
                     self._socket_timeouts = 0
@@ -419,7 +483,7 @@ class BlockingConnection(base_connection.BaseConnection):
         if self._frames_written_without_read >= self.WRITE_TO_READ_RATIO:
             if not isinstance(frame_value, frame.Method):
                 self._frames_written_without_read = 0
-                self.process_data_events()
+                self.process_data_events(time_limit=0)
 
 
 class BlockingChannel(channel.Channel):
@@ -505,7 +569,7 @@ class BlockingChannel(channel.Channel):
         self._send_method(spec.Basic.Get(queue=queue,
                                          no_ack=no_ack))
         while not self._response:
-            self.connection.process_data_events()
+            self.connection.process_data_events(time_limit=None)
         if isinstance(self._response[0], spec.Basic.GetEmpty):
             return None, None, None
         return self._response[0], self._response[1], self._response[2]
@@ -523,7 +587,7 @@ class BlockingChannel(channel.Channel):
         :param routing_key: The routing key to bind on
         :type routing_key: str or unicode
         :param body: The message body
-        :type body: str or unicode
+        :type body: str, unicode, list, tuple, file or mmap.mmap
         :param pika.spec.Properties properties: Basic.properties
         :param bool mandatory: The mandatory flag
         :param bool immediate: The immediate flag
@@ -637,7 +701,7 @@ class BlockingChannel(channel.Channel):
         self._confirmation = True
         replies = [spec.Confirm.SelectOk] if nowait is False else []
         self._rpc(spec.Confirm.Select(nowait), None, replies)
-        self.connection.process_data_events()
+        self.connection.process_data_events(time_limit=0)
 
     def cancel(self):
         """Cancel the consumption of a queue, rejecting all pending messages.
@@ -658,7 +722,7 @@ class BlockingChannel(channel.Channel):
             LOGGER.info('Requeueing %i messages with delivery tag %s',
                         messages, method.delivery_tag)
             self.basic_nack(method.delivery_tag, multiple=True, requeue=True)
-            self.connection.process_data_events()
+            self.connection.process_data_events(time_limit=0)
         self._generator = None
         self._generator_messages = list()
         return messages
@@ -725,7 +789,7 @@ class BlockingChannel(channel.Channel):
         while True:
             if self._generator_messages:
                 yield self._generator_messages.pop(0)
-            self.connection.process_data_events()
+            self.connection.process_data_events(time_limit=None)
 
     def force_data_events(self, enable):
         """Turn on and off forcing the blocking adapter to stop and look to see
@@ -951,7 +1015,7 @@ class BlockingChannel(channel.Channel):
     def start_consuming(self):
         """Starts consuming from registered callbacks."""
         while len(self._consumers):
-            self.connection.process_data_events()
+            self.connection.process_data_events(time_limit=None)
 
     def stop_consuming(self, consumer_tag=None):
         """Sends off the Basic.Cancel to let RabbitMQ know to stop consuming and
@@ -1139,7 +1203,7 @@ class BlockingChannel(channel.Channel):
         self._send_method(method_frame, content,
                           self._wait_on_response(method_frame))
         if force_data_events and self._force_data_events_override is not False:
-            self.connection.process_data_events()
+            self.connection.process_data_events(time_limit=0)
         return self._process_replies(replies, callback)
 
     def _send_method(self, method_frame, content=None, wait=False):
@@ -1158,7 +1222,7 @@ class BlockingChannel(channel.Channel):
         self.connection.send_method(self.channel_number, method_frame, content)
         while wait and not self._received_response:
             try:
-                self.connection.process_data_events()
+                self.connection.process_data_events(time_limit=None)
             except exceptions.AMQPConnectionError:
                 break
         self._received_response = prev_received_response
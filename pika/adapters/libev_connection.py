@@ -293,11 +293,3 @@ class LibevConnection(BaseConnection):
         self._active_timers.pop(timer, None)
         timer.stop()
         self._stopped_timers.append(timer)
-
-    def _create_and_connect_to_socket(self, sock_addr_tuple):
-        """Call super and then set the socket to nonblocking."""
-        result = super(LibevConnection,
-                       self)._create_and_connect_to_socket(sock_addr_tuple)
-        if result:
-            self.socket.setblocking(0)
-        return result
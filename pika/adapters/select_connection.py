@@ -3,14 +3,16 @@ platform pika is running on.
 
 """
 import logging
+import math
 import select
 import time
 
+from pika import timer
 from pika.adapters.base_connection import BaseConnection
 
 LOGGER = logging.getLogger(__name__)
 
-# One of select, epoll, kqueue or poll
+# One of select, epoll, epoll_et (edge-triggered epoll), kqueue or poll
 SELECT_TYPE = None
 
 # Use epoll's constants to keep life easy
@@ -21,7 +23,16 @@ ERROR = 0x0008
 
 class SelectConnection(BaseConnection):
     """An asynchronous connection adapter that attempts to use the fastest
-    event loop adapter for the given platform.
+    event loop adapter for the given platform. Connections can share an
+    IOLoop, so that a single thread drives all of them with one poll per
+    pass of the loop:
+
+        ioloop = pika.adapters.IOLoop()
+        connections = [pika.SelectConnection(parameters, on_open,
+                                             stop_ioloop_on_close=False,
+                                             ioloop=ioloop)
+                       for parameters in all_parameters]
+        ioloop.start()
 
     """
 
@@ -30,7 +41,8 @@ class SelectConnection(BaseConnection):
                  on_open_callback=None,
                  on_open_error_callback=None,
                  on_close_callback=None,
-                 stop_ioloop_on_close=True):
+                 stop_ioloop_on_close=True,
+                 ioloop=None):
         """Create a new instance of the Connection object.
 
         :param pika.connection.Parameters parameters: Connection parameters
@@ -40,10 +52,12 @@ class SelectConnection(BaseConnection):
         :type on_open_error_callback: method
         :param method on_close_callback: Method to call on connection close
         :param bool stop_ioloop_on_close: Call ioloop.stop() if disconnected
+        :param IOLoop ioloop: An IOLoop to share with other connections,
+                              a new one is created if it is not set
         :raises: RuntimeError
 
         """
-        ioloop = IOLoop(self._manage_event_state)
+        ioloop = ioloop or IOLoop(self._manage_event_state)
         super(SelectConnection, self).__init__(parameters,
                                                on_open_callback,
                                                on_open_error_callback,
@@ -62,15 +76,25 @@ class SelectConnection(BaseConnection):
         if not error:
             self.ioloop.start_poller(self._handle_events,
                                      self.event_state,
-                                     self.socket.fileno())
+                                     self.socket.fileno(),
+                                     self._manage_event_state)
         return error
 
+    def _adapter_disconnect(self):
+        """Stop polling the socket before it is closed, so that an IOLoop
+        shared with other connections keeps running without it.
+
+        """
+        if self.socket:
+            self.ioloop.remove_handler(self.socket.fileno())
+        super(SelectConnection, self)._adapter_disconnect()
+
     def _flush_outbound(self):
         """Call the state manager who will figure out that we need to write then
         call the poller's poll function to force it to process events.
 
         """
-        self.ioloop.poller._manage_event_state()
+        self._manage_event_state()
         # Force our poller to come up for air, but in write only mode
         # write only mode prevents messages from coming in and kicking off
         # events through the consumer
@@ -84,13 +108,17 @@ class IOLoop(object):
     looping until IOLoop.instance().stop() is called or there is a socket
     error.
 
+    The poller is created for the first connection that starts it, and the
+    sockets of other connections that share the IOLoop are added to it.
+
     Also provides a convenient pass-through for add_timeout and set_events
 
     """
-    def __init__(self, state_manager):
+    def __init__(self, state_manager=None):
         """Create an instance of the IOLoop object.
 
-        :param method state_manager: The method to manage state
+        :param method state_manager: The method to manage state, if it is not
+                                     passed to start_poller
 
         """
         self.poller = None
@@ -104,7 +132,7 @@ class IOLoop(object):
 
         :param int deadline: The number of seconds to wait to call callback
         :param method callback_method: The callback method
-        :rtype: str
+        :rtype: object
 
         """
         if not self.poller:
@@ -121,10 +149,19 @@ class IOLoop(object):
         """
         return self.poller.__class__.__name__
 
+    def remove_handler(self, fileno):
+        """Stop polling the file descriptor.
+
+        :param int fileno: The file descriptor to stop polling
+
+        """
+        if self.poller:
+            self.poller.remove_handler(fileno)
+
     def remove_timeout(self, timeout_id):
         """Remove a timeout if it's still in the timeout stack of the poller
 
-        :param str timeout_id: The timeout id to remove
+        :param object timeout_id: The timeout id to remove
 
         """
         self.poller.remove_timeout(timeout_id)
@@ -138,35 +175,45 @@ class IOLoop(object):
         self.poller.start()
         self.poller.flush_pending_timeouts()
 
-    def start_poller(self, handler, events, fileno):
-        """Start the Poller, once started will take over for IOLoop.start()
+    def start_poller(self, handler, events, fileno, state_manager=None):
+        """Start the Poller, once started will take over for IOLoop.start().
+        If the Poller is already started, the file descriptor is added to it.
 
         :param method handler: The method to call to handle events
         :param int events: The events to handle
         :param int fileno: The file descriptor to poll for
+        :param method state_manager: The method to manage state
 
         """
+        state_manager = state_manager or self._manage_event_state
+        if self.poller:
+            LOGGER.debug('Adding fd %i to the %s', fileno, self.poller_type)
+            self.poller.add_handler(fileno, handler, events, state_manager)
+            return
         LOGGER.debug('Starting the Poller')
-        self.poller = None
         if hasattr(select, 'epoll'):
-            if not SELECT_TYPE or SELECT_TYPE == 'epoll':
+            if SELECT_TYPE == 'epoll_et':
+                LOGGER.debug('Using EdgeTriggeredEPollPoller')
+                self.poller = EdgeTriggeredEPollPoller(fileno, handler, events,
+                                                       state_manager)
+            elif not SELECT_TYPE or SELECT_TYPE == 'epoll':
                 LOGGER.debug('Using EPollPoller')
                 self.poller = EPollPoller(fileno, handler, events,
-                                          self._manage_event_state)
+                                          state_manager)
         if not self.poller and hasattr(select, 'kqueue'):
             if not SELECT_TYPE or SELECT_TYPE == 'kqueue':
                 LOGGER.debug('Using KQueuePoller')
                 self.poller = KQueuePoller(fileno, handler, events,
-                                           self._manage_event_state)
+                                           state_manager)
         if not self.poller and hasattr(select, 'poll') and hasattr(select.poll(), 'modify'):
             if not SELECT_TYPE or SELECT_TYPE == 'poll':
                 LOGGER.debug('Using PollPoller')
                 self.poller = PollPoller(fileno, handler, events,
-                                         self._manage_event_state)
+                                         state_manager)
         if not self.poller:
             LOGGER.debug('Using SelectPoller')
             self.poller = SelectPoller(fileno, handler, events,
-                                       self._manage_event_state)
+                                       state_manager)
 
     def stop(self):
         """Stop the poller's event loop"""
@@ -188,11 +235,17 @@ class SelectPoller(object):
     all of the methods we need for child classes as well. One should only need
     to override the update_handler and start methods for additional types.
 
+    Any number of file descriptors can be polled, each with its own handler
+    and state manager. Polling waits until the next timeout is due, but no
+    longer than TIMEOUT seconds.
+
     """
     TIMEOUT = 1
 
-    def __init__(self, fileno, handler, events, state_manager):
-        """Create an instance of the SelectPoller
+    def __init__(self, fileno=None, handler=None, events=None,
+                 state_manager=None):
+        """Create an instance of the SelectPoller, polling fileno if it is
+        passed in.
 
         :param int fileno: The file descriptor to check events for
         :param method handler: What is called when an event happens
@@ -200,12 +253,29 @@ class SelectPoller(object):
         :param method state_manager: The method to manage state
 
         """
-        self.fileno = fileno
-        self.events = events
         self.open = True
-        self._handler = handler
-        self._timeouts = []
-        self._manage_event_state = state_manager
+        self._handlers = dict()
+        self._events = dict()
+        self._state_managers = dict()
+        self._timeouts = timer.TimerQueue()
+        if fileno is not None:
+            self.add_handler(fileno, handler, events, state_manager)
+
+    def add_handler(self, fileno, handler, events, state_manager=None):
+        """Start polling the file descriptor for events, calling handler with
+        the file descriptor and the events when they happen. The
+        state_manager is called after every pass of the loop.
+
+        :param int fileno: The file descriptor to check events for
+        :param method handler: What is called when an event happens
+        :param int events: The events to look for
+        :param method state_manager: The method to manage state
+
+        """
+        self._handlers[fileno] = handler
+        if state_manager:
+            self._state_managers[fileno] = state_manager
+        self._register(fileno, events)
 
     def add_timeout(self, deadline, callback_method):
         """Add the callback_method to the IOLoop timer to fire after deadline
@@ -215,14 +285,10 @@ class SelectPoller(object):
 
         :param int deadline: The number of seconds to wait to call callback
         :param method callback_method: The callback method
-        :rtype: str
+        :rtype: object
 
         """
-        value = {'deadline': time.time() + deadline,
-                 'callback': callback_method}
-        timeout_id = hash(frozenset(value.items()))
-        self._timeouts.append((timeout_id, value))
-        return timeout_id
+        return self._timeouts.add(deadline, callback_method)
 
     def flush_pending_timeouts(self):
         """
@@ -231,6 +297,22 @@ class SelectPoller(object):
             time.sleep(SelectPoller.TIMEOUT)
         self.process_timeouts()
 
+    def get_poll_timeout(self, write_only=False):
+        """Return the number of seconds to wait for events, which is until the
+        next timeout is due rounded up to the millisecond, but no more than
+        TIMEOUT. A write only poll does not wait at all: it is made to flush
+        the outbound buffer, and a socket that cannot be written to is left
+        for the next pass of the loop, which also handles reads.
+
+        :param bool write_only: The poll only processes write events
+        :rtype: float
+
+        """
+        if write_only:
+            return 0
+        timeout = self._timeouts.get_timeout(SelectPoller.TIMEOUT)
+        return math.ceil(timeout * 1000) / 1000.0
+
     def poll(self, write_only=False):
         """Check to see if the events that are cared about have fired.
 
@@ -240,61 +322,56 @@ class SelectPoller(object):
         """
         # Build our values to pass into select
         input_fileno, output_fileno, error_fileno = [], [], []
-
-        if self.events & READ:
-            input_fileno = [self.fileno]
-        if self.events & WRITE:
-            output_fileno = [self.fileno]
-        if self.events & ERROR:
-            error_fileno = [self.fileno]
+        for fileno, events in self._events.items():
+            if events & READ:
+                input_fileno.append(fileno)
+            if events & WRITE:
+                output_fileno.append(fileno)
+            if events & ERROR:
+                error_fileno.append(fileno)
 
         # Wait on select to let us know what's up
         try:
-            read, write, error = select.select(input_fileno,
-                                               output_fileno,
-                                               error_fileno,
-                                               SelectPoller.TIMEOUT)
+            read, write, error = select.select(
+                input_fileno, output_fileno, error_fileno,
+                self.get_poll_timeout(write_only))
         except select.error as error:
-            return self._handler(self.fileno, ERROR, error)
+            return self._dispatch_error(error)
 
-        # Build our events bit mask
-        events = 0
-        if read:
-            events |= READ
-        if write:
-            events |= WRITE
-        if error:
-            events |= ERROR
+        # Build our events bit masks
+        events = dict()
+        for fileno in read:
+            events[fileno] = READ
+        for fileno in write:
+            events[fileno] = events.get(fileno, 0) | WRITE
+        for fileno in error:
+            events[fileno] = events.get(fileno, 0) | ERROR
 
-        if events:
-            self._handler(self.fileno, events, write_only=write_only)
+        self._dispatch(events.items(), write_only)
 
     def process_timeouts(self):
-        """Process the self._timeouts event stack"""
-        start_time = time.time()
-        # while loop instead of a more straightforward for loop so we can
-        # delete items from the list while iterating
-        i = 0
-        while i < len(self._timeouts):
-            t_id, timeout = self._timeouts[i]
-            if timeout['deadline'] <= start_time:
-                callback = timeout['callback']
-                del self._timeouts[i]
-                callback()
-            else:
-                i += 1
+        """Call the callbacks of the timeouts that are due"""
+        self._timeouts.process()
+
+    def remove_handler(self, fileno):
+        """Stop polling the file descriptor.
+
+        :param int fileno: The file descriptor to stop polling
+
+        """
+        if fileno not in self._handlers:
+            return
+        self._unregister(fileno)
+        del self._handlers[fileno]
+        self._state_managers.pop(fileno, None)
 
     def remove_timeout(self, timeout_id):
         """Remove a timeout if it's still in the timeout stack
 
-        :param str timeout_id: The timeout id to remove
+        :param object timeout_id: The timeout id to remove
 
         """
-        for i in xrange(len(self._timeouts)):
-            t_id, timeout = self._timeouts[i]
-            if t_id == timeout_id:
-                del self._timeouts[i]
-                break
+        self._timeouts.remove(timeout_id)
 
     def start(self):
         """Start the main poller loop. It will loop here until self.closed"""
@@ -310,12 +387,58 @@ class SelectPoller(object):
         :param int events: The event mask
 
         """
-        self.events = events
+        self._events[fileno] = events
+
+    def _dispatch(self, events, write_only):
+        """Call the handlers of the file descriptors that events happened
+        on. A handler that is removed by one called before it is skipped.
+
+        :param list events: The file descriptors and their event masks
+        :param bool write_only: Only process write events
+
+        """
+        for fileno, event in events:
+            handler = self._handlers.get(fileno)
+            if handler:
+                handler(fileno, event, write_only=write_only)
+
+    def _dispatch_error(self, error):
+        """Pass an error raised while polling to all of the handlers.
+
+        :param error: The error raised while polling
+
+        """
+        for fileno, handler in self._handlers.items():
+            if fileno in self._handlers:
+                handler(fileno, ERROR, error)
+
+    def _manage_event_state(self):
+        """Call the state managers of all of the file descriptors"""
+        for state_manager in self._state_managers.values():
+            state_manager()
+
+    def _register(self, fileno, events):
+        """Start polling the file descriptor for events.
+
+        :param int fileno: The file descriptor
+        :param int events: The event mask
+
+        """
+        self._events[fileno] = events
+
+    def _unregister(self, fileno):
+        """Stop polling the file descriptor.
+
+        :param int fileno: The file descriptor
+
+        """
+        del self._events[fileno]
 
 
 class KQueuePoller(SelectPoller):
     """KQueuePoller works on BSD based systems and is faster than select"""
-    def __init__(self, fileno, handler, events, state_manager):
+    def __init__(self, fileno=None, handler=None, events=None,
+                 state_manager=None):
         """Create an instance of the KQueuePoller
 
         :param int fileno: The file descriptor to check events for
@@ -324,12 +447,9 @@ class KQueuePoller(SelectPoller):
         :param method state_manager: The method to manage state
 
         """
+        self._kqueue = select.kqueue()
         super(KQueuePoller, self).__init__(fileno, handler, events,
                                            state_manager)
-        self.events = 0
-        self._kqueue = select.kqueue()
-        self.update_handler(fileno, events)
-        self._manage_event_state = state_manager
 
     def update_handler(self, fileno, events):
         """Set the events to the current events
@@ -339,33 +459,34 @@ class KQueuePoller(SelectPoller):
 
         """
         # No need to update if our events are the same
-        if self.events == events:
+        current = self._events[fileno]
+        if current == events:
             return
 
         kevents = list()
         if not events & READ:
-            if self.events & READ:
+            if current & READ:
                 kevents.append(select.kevent(fileno,
                                              filter=select.KQ_FILTER_READ,
                                              flags=select.KQ_EV_DELETE))
         else:
-            if not self.events & READ:
+            if not current & READ:
                 kevents.append(select.kevent(fileno,
                                              filter=select.KQ_FILTER_READ,
                                              flags=select.KQ_EV_ADD))
         if not events & WRITE:
-            if self.events & WRITE:
+            if current & WRITE:
                 kevents.append(select.kevent(fileno,
                                              filter=select.KQ_FILTER_WRITE,
                                              flags=select.KQ_EV_DELETE))
         else:
-            if not self.events & WRITE:
+            if not current & WRITE:
                 kevents.append(select.kevent(fileno,
                                              filter=select.KQ_FILTER_WRITE,
                                              flags=select.KQ_EV_ADD))
         for event in kevents:
             self._kqueue.control([event], 0)
-        self.events = events
+        self._events[fileno] = events
 
     def start(self):
         """Start the main poller loop. It will loop here until self.closed"""
@@ -381,21 +502,50 @@ class KQueuePoller(SelectPoller):
             the adapter can write.
 
         """
-        events = 0
         try:
-            kevents = self._kqueue.control(None, 1000, SelectPoller.TIMEOUT)
+            kevents = self._kqueue.control(None, 1000,
+                                           self.get_poll_timeout(write_only))
         except OSError as error:
-            return self._handler(self.fileno, ERROR, error)
+            return self._dispatch_error(error)
+        events = dict()
         for event in kevents:
-            if event.filter == select.KQ_FILTER_READ and READ & self.events:
-                events |= READ
-            if event.filter == select.KQ_FILTER_WRITE and WRITE & self.events:
-                events |= WRITE
-            if event.flags & select.KQ_EV_ERROR and ERROR & self.events:
-                events |= ERROR
+            fileno = event.ident
+            wanted = self._events.get(fileno, 0)
+            value = events.get(fileno, 0)
+            if event.filter == select.KQ_FILTER_READ and READ & wanted:
+                value |= READ
+            if event.filter == select.KQ_FILTER_WRITE and WRITE & wanted:
+                value |= WRITE
+            if event.flags & select.KQ_EV_ERROR and ERROR & wanted:
+                value |= ERROR
+            if value:
+                events[fileno] = value
         if events:
-            LOGGER.debug("Calling %s(%i)", self._handler, events)
-            self._handler(self.fileno, events, write_only=write_only)
+            LOGGER.debug("Calling handlers of %i fds", len(events))
+            self._dispatch(events.items(), write_only)
+
+    def _register(self, fileno, events):
+        """Start polling the file descriptor for events.
+
+        :param int fileno: The file descriptor
+        :param int events: The event mask
+
+        """
+        self._events[fileno] = 0
+        self.update_handler(fileno, events)
+
+    def _unregister(self, fileno):
+        """Stop polling the file descriptor.
+
+        :param int fileno: The file descriptor
+
+        """
+        try:
+            self.update_handler(fileno, 0)
+        except OSError as error:
+            LOGGER.debug("Got OSError while unregistering fd %i: %s",
+                         fileno, error)
+        del self._events[fileno]
 
 
 class PollPoller(SelectPoller):
@@ -403,7 +553,8 @@ class PollPoller(SelectPoller):
     certain scenarios.  Both are faster than select.
 
     """
-    def __init__(self, fileno, handler, events, state_manager):
+    def __init__(self, fileno=None, handler=None, events=None,
+                 state_manager=None):
         """Create an instance of the KQueuePoller
 
         :param int fileno: The file descriptor to check events for
@@ -412,9 +563,8 @@ class PollPoller(SelectPoller):
         :param method state_manager: The method to manage state
 
         """
+        self._poll = self._create_poll()
         super(PollPoller, self).__init__(fileno, handler, events, state_manager)
-        self._poll = select.poll()
-        self._poll.register(fileno, self.events)
 
     def update_handler(self, fileno, events):
         """Set the events to the current events
@@ -423,40 +573,62 @@ class PollPoller(SelectPoller):
         :param int events: The event mask
 
         """
-        self.events = events
-        self._poll.modify(fileno, self.events)
+        self._events[fileno] = events
+        self._poll.modify(fileno, events)
 
     def start(self):
         """Start the main poller loop. It will loop here until self.closed"""
-        was_open = self.open
         while self.open:
             self.poll()
             self.process_timeouts()
             self._manage_event_state()
-        if not was_open:
-            return
-        try:
-            LOGGER.info("Unregistering poller on fd %d" % self.fileno)
-            self.update_handler(self.fileno, 0)
-            self._poll.unregister(self.fileno)
-        except IOError as err:
-            LOGGER.debug("Got IOError while shutting down poller: %s", err)
 
     def poll(self, write_only=False):
-        """Poll until TIMEOUT waiting for an event
+        """Poll until the next timeout or TIMEOUT waiting for an event
 
         :param bool write_only: Only process write events
 
         """
         try:
-            events = self._poll.poll(int(SelectPoller.TIMEOUT * 1000))
+            events = self._poll.poll(int(round(
+                self.get_poll_timeout(write_only) * 1000)))
         except select.error as error:
-            return self._handler(self.fileno, ERROR, error)
+            return self._dispatch_error(error)
         if events:
-            LOGGER.debug("Calling %s with %d events",
-                         self._handler, len(events))
-            for fileno, event in events:
-                self._handler(fileno, event, write_only=write_only)
+            LOGGER.debug("Calling handlers with %d events", len(events))
+            self._dispatch(events, write_only)
+
+    def _create_poll(self):
+        """Return the poll object the file descriptors are registered with.
+
+        :rtype: select.poll
+
+        """
+        return select.poll()
+
+    def _register(self, fileno, events):
+        """Start polling the file descriptor for events.
+
+        :param int fileno: The file descriptor
+        :param int events: The event mask
+
+        """
+        self._events[fileno] = events
+        self._poll.register(fileno, events)
+
+    def _unregister(self, fileno):
+        """Stop polling the file descriptor.
+
+        :param int fileno: The file descriptor
+
+        """
+        LOGGER.info("Unregistering poller on fd %d", fileno)
+        try:
+            self._poll.unregister(fileno)
+        except (IOError, KeyError) as err:
+            LOGGER.debug("Got error while unregistering fd %i: %s",
+                         fileno, err)
+        del self._events[fileno]
 
 
 class EPollPoller(PollPoller):
@@ -464,8 +636,45 @@ class EPollPoller(PollPoller):
     certain scenarios. Both are faster than select.
 
     """
-    def __init__(self, fileno, handler, events, state_manager):
-        """Create an instance of the EPollPoller
+    def poll(self, write_only=False):
+        """Poll until the next timeout or TIMEOUT waiting for an event
+
+        :param bool write_only: Only process write events
+
+        """
+        try:
+            events = self._poll.poll(self.get_poll_timeout(write_only))
+        except IOError as error:
+            return self._dispatch_error(error)
+        if events:
+            LOGGER.debug("Calling handlers with %d events", len(events))
+            self._dispatch(events, write_only)
+
+    def _create_poll(self):
+        """Return the epoll object the file descriptors are registered with.
+
+        :rtype: select.epoll
+
+        """
+        return select.epoll()
+
+
+class EdgeTriggeredEPollPoller(EPollPoller):
+    """EPoll in edge-triggered mode, where file descriptors are registered
+    for READ and WRITE once and epoll only reports when they become ready.
+    Turning WRITE on and off for every write then takes no system call, and
+    a socket that is known to be writable is written to without polling it.
+
+    The events that a file descriptor is ready for are kept until its handler
+    has drained them. Handlers return the events that they handled and that
+    the file descriptor may still be ready for, which are dispatched again on
+    the next pass of the loop without waiting. Returning None means that all
+    of the events were drained. Select SELECT_TYPE = 'epoll_et' to use it.
+
+    """
+    def __init__(self, fileno=None, handler=None, events=None,
+                 state_manager=None):
+        """Create an instance of the EdgeTriggeredEPollPoller
 
         :param int fileno: The file descriptor to check events for
         :param method handler: What is called when an event happens
@@ -473,22 +682,106 @@ class EPollPoller(PollPoller):
         :param method state_manager: The method to manage state
 
         """
-        super(EPollPoller, self).__init__(fileno, handler, events,
-                                          state_manager)
-        self._poll = select.epoll()
-        self._poll.register(fileno, self.events)
+        self._ready = dict()
+        super(EdgeTriggeredEPollPoller, self).__init__(fileno, handler, events,
+                                                       state_manager)
+
+    def update_handler(self, fileno, events):
+        """Set the events to the current events. The file descriptor is
+        registered for all of them, so epoll is left alone.
+
+        :param int fileno: The file descriptor
+        :param int events: The event mask
+
+        """
+        self._events[fileno] = events
 
     def poll(self, write_only=False):
-        """Poll until TIMEOUT waiting for an event
+        """Poll until the next timeout or TIMEOUT waiting for an event, or
+        only check for new events if file descriptors are known to be ready
+        for the events they are polled for.
+
+        A write only poll never waits, which matters all the more here since
+        it can be made by a handler that is in the middle of reading a socket
+        that epoll will not report as readable again. It does not check for
+        new events at all if sockets are known to be writable.
 
         :param bool write_only: Only process write events
 
         """
-        try:
-            events = self._poll.poll(SelectPoller.TIMEOUT)
-        except IOError as error:
-            return self._handler(self.fileno, ERROR, error)
-        if events:
-            LOGGER.debug("Calling %s", self._handler)
+        errors = dict()
+        ready = self._get_ready_events(write_only)
+        if not (write_only and ready):
+            try:
+                events = self._poll.poll(0 if ready else
+                                         self.get_poll_timeout(write_only))
+            except IOError as error:
+                return self._dispatch_error(error)
             for fileno, event in events:
-                self._handler(fileno, event, write_only=write_only)
+                if fileno in self._ready:
+                    self._ready[fileno] |= event & (READ | WRITE)
+                    if event & ~(READ | WRITE):
+                        errors[fileno] = event
+            ready = self._get_ready_events(write_only)
+        for fileno, event in errors.items():
+            ready[fileno] = ready.get(fileno, 0) | event
+        if ready:
+            LOGGER.debug("Calling handlers of %i fds", len(ready))
+            self._dispatch(ready.items(), write_only)
+
+    def _dispatch(self, events, write_only):
+        """Call the handlers of the file descriptors that events happened
+        on, keeping the events that they report they are still ready for.
+        The events handled are cleared before the handler is called, so that
+        edges seen by polls made while it runs are kept.
+
+        :param list events: The file descriptors and their event masks
+        :param bool write_only: Only process write events
+
+        """
+        handled_events = WRITE if write_only else READ | WRITE
+        for fileno, event in events:
+            handler = self._handlers.get(fileno)
+            if not handler:
+                continue
+            handled = event & handled_events
+            self._ready[fileno] &= ~handled
+            still_ready = handler(fileno, event, write_only=write_only) or 0
+            if fileno in self._ready:
+                self._ready[fileno] |= still_ready & handled
+
+    def _get_ready_events(self, write_only):
+        """Return the events that file descriptors are known to be ready for
+        and are polled for.
+
+        :param bool write_only: Only return write events
+        :rtype: dict
+
+        """
+        mask = WRITE if write_only else READ | WRITE
+        events = dict()
+        for fileno, ready in self._ready.items():
+            event = ready & self._events[fileno] & mask
+            if event:
+                events[fileno] = event
+        return events
+
+    def _register(self, fileno, events):
+        """Start polling the file descriptor for all events, edge-triggered.
+
+        :param int fileno: The file descriptor
+        :param int events: The event mask
+
+        """
+        self._events[fileno] = events
+        self._ready[fileno] = 0
+        self._poll.register(fileno, READ | WRITE | ERROR | select.EPOLLET)
+
+    def _unregister(self, fileno):
+        """Stop polling the file descriptor.
+
+        :param int fileno: The file descriptor
+
+        """
+        super(EdgeTriggeredEPollPoller, self)._unregister(fileno)
+        del self._ready[fileno]
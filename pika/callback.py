@@ -10,6 +10,9 @@ from pika import amqp_object
 
 LOGGER = logging.getLogger(__name__)
 
+# Returned by getattr for attributes that an object does not have
+_MISSING = object()
+
 
 def _name_or_value(value):
     """Will take Frame objects, classes, etc and attempt to return a valid
@@ -20,19 +23,19 @@ def _name_or_value(value):
     :rtype: str
 
     """
-    # Is it subclass of AMQPObject
-    try:
-        if issubclass(value, amqp_object.AMQPObject):
-            return value.NAME
-    except TypeError:
-        pass
+    # Strings are used as they are
+    if isinstance(value, str):
+        return value
 
     # Is it a Pika frame object?
     if isinstance(value, frame.Method):
         return value.method.NAME
 
-    # Is it a Pika frame object (go after Method since Method extends this)
-    if isinstance(value, amqp_object.AMQPObject):
+    # Is it an AMQPObject or a subclass of AMQPObject (go after Method since
+    # Method extends this)
+    if (isinstance(value, amqp_object.AMQPObject) or
+            (isinstance(value, type) and
+             issubclass(value, amqp_object.AMQPObject))):
         return value.NAME
 
     # Cast the value to a string, encoding it if it's unicode
@@ -43,14 +46,18 @@ def _name_or_value(value):
 
 
 def sanitize_prefix(function):
-    """Automatically call _name_or_value on the prefix passed in."""
+    """Automatically call _name_or_value on the prefix passed in. The
+    CallbackManager methods do this themselves, and no longer use this
+    decorator.
+
+    """
     @functools.wraps(function)
     def wrapper(*args, **kwargs):
         args = list(args)
         offset = 1
         if 'prefix' in kwargs:
             kwargs['prefix'] = _name_or_value(kwargs['prefix'])
-        elif len(args) - 1  >= offset:
+        elif len(args) - 1 >= offset:
             args[offset] = _name_or_value(args[offset])
             offset += 1
         if 'key' in kwargs:
@@ -64,7 +71,8 @@ def sanitize_prefix(function):
 
 def check_for_prefix_and_key(function):
     """Automatically return false if the key or prefix is not in the callbacks
-    for the instance.
+    for the instance. The CallbackManager methods do this themselves, and no
+    longer use this decorator.
 
     """
     @functools.wraps(function)
@@ -84,8 +92,7 @@ def check_for_prefix_and_key(function):
             key = _name_or_value(args[offset])
 
         # Make sure prefix and key are in the stack
-        if (prefix not in args[0]._stack or
-            key not in args[0]._stack[prefix]):
+        if (prefix, key) not in args[0]._stack:
             return False
 
         # Execute the method
@@ -93,13 +100,114 @@ def check_for_prefix_and_key(function):
     return wrapper
 
 
+class _Callback(object):
+    """A registered callback with the values it is processed for. The
+    arguments to validate are kept as a tuple of items so that they can be
+    matched without looking them up in the arguments dict.
+
+    """
+    __slots__ = ('callback', 'one_shot', 'only_caller', 'arguments', 'calls',
+                 '_expected')
+
+    def __init__(self, callback, one_shot, only_caller, arguments):
+        """Create a new callback record.
+
+        :param method callback: The callback to call
+        :param bool one_shot: Remove this callback after it is called
+        :param object only_caller: Only allow one_caller value to call the
+                                   event that fires the callback.
+        :param dict arguments: Arguments to validate when processing
+
+        """
+        self.callback = callback
+        self.one_shot = one_shot
+        self.only_caller = only_caller
+        self.arguments = arguments
+        self.calls = 1 if one_shot else 0
+        self._expected = (tuple(arguments.items())
+                          if arguments is not None else None)
+
+    def __repr__(self):
+        return ('<_Callback callback=%r one_shot=%r only_caller=%r '
+                'arguments=%r calls=%r>' % (self.callback, self.one_shot,
+                                            self.only_caller, self.arguments,
+                                            self.calls))
+
+    def is_duplicate(self, callback, only_caller, arguments):
+        """Return True if the record is for the same callback, caller and
+        arguments.
+
+        :param method callback: The callback to call
+        :param object only_caller: The caller the callback is restricted to
+        :param dict arguments: Arguments to validate when processing
+        :rtype: bool
+
+        """
+        return (self.callback == callback and
+                self.arguments == arguments and
+                self.only_caller == only_caller)
+
+    def arguments_match(self, args):
+        """Validate if the arguments passed in match the expected arguments.
+        We expect this to be a frame passed in to *args for process or
+        passed in as a list from remove.
+
+        :param list|tuple args: The arguments passed in
+        :rtype: bool
+
+        """
+        if self._expected is None:
+            return True
+        if not args:
+            return False
+        value = args[0]
+        if isinstance(value, dict):
+            for key, expected in self._expected:
+                if value.get(key) != expected:
+                    LOGGER.debug('Values in dict do not match for %s', key)
+                    return False
+            return True
+        value = getattr(value, 'method', value)
+        for key, expected in self._expected:
+            actual = getattr(value, key, _MISSING)
+            if actual is _MISSING:
+                LOGGER.debug('%r does not have required attribute: %s',
+                             type(value), key)
+                return False
+            if actual != expected:
+                LOGGER.debug('Values in %s do not match for %s',
+                             type(value), key)
+                return False
+        return True
+
+    def should_process(self, caller, args):
+        """Returns True if the callback should be processed.
+
+        :param object caller: Who is firing the event
+        :param list|tuple args: Any optional arguments
+        :rtype: bool
+
+        """
+        if not self.arguments_match(args):
+            LOGGER.debug('Arguments do not match for %r, %r', self, args)
+            return False
+        return (self.only_caller is None or
+                (self.only_caller and self.only_caller == caller))
+
+
 class CallbackManager(object):
     """CallbackManager is a global callback system designed to be a single place
     where Pika can manage callbacks and process them. It should be referenced
     by the CallbackManager.instance() method instead of constructing new
     instances of it.
 
+    The callbacks are indexed directly by their (prefix, key) pair, and the
+    keys that are registered for each prefix are tracked so that all of the
+    callbacks for a prefix can be removed at once.
+
     """
+    # The names of the values of a callback, which used to be the keys of the
+    # dicts the callbacks were kept in
     CALLS = 'calls'
     ARGUMENTS = 'arguments'
     DUPLICATE_WARNING = 'Duplicate callback found for "%s:%s"'
@@ -110,8 +218,8 @@ class CallbackManager(object):
     def __init__(self):
         """Create an instance of the CallbackManager"""
         self._stack = dict()
+        self._prefixes = dict()
 
-    @sanitize_prefix
     def add(self, prefix, key, callback, one_shot=True, only_caller=None,
             arguments=None):
         """Add a callback to the stack for the specified key. If the call is
@@ -134,39 +242,35 @@ class CallbackManager(object):
         :rtype: tuple(prefix, key)
 
         """
-        # Prep the stack
-        if prefix not in self._stack:
-            self._stack[prefix] = dict()
-
-        if key not in self._stack[prefix]:
-            self._stack[prefix][key] = list()
+        prefix = _name_or_value(prefix)
+        key = _name_or_value(key)
+        callbacks = self._stack.get((prefix, key))
+        if callbacks is None:
+            callbacks = self._stack[(prefix, key)] = list()
+            self._prefixes.setdefault(prefix, set()).add(key)
 
         # Check for a duplicate
-        for callback_dict in self._stack[prefix][key]:
-            if (callback_dict[self.CALLBACK] == callback and
-                callback_dict[self.ARGUMENTS] == arguments and
-                callback_dict[self.ONLY_CALLER] == only_caller):
-                if callback_dict[self.ONE_SHOT] is True:
-                    callback_dict[self.CALLS] += 1
+        for value in callbacks:
+            if value.is_duplicate(callback, only_caller, arguments):
+                if value.one_shot is True:
+                    value.calls += 1
                     LOGGER.debug('Incremented callback reference counter: %r',
-                                 callback_dict)
+                                 value)
                 else:
                     LOGGER.warning(self.DUPLICATE_WARNING, prefix, key)
                 return prefix, key
 
-        # Create the callback dictionary
-        callback_dict = self._callback_dict(callback, one_shot, only_caller,
-                                            arguments)
-        self._stack[prefix][key].append(callback_dict)
-        LOGGER.debug('Added: %r', callback_dict)
+        value = _Callback(callback, one_shot, only_caller, arguments)
+        callbacks.append(value)
+        LOGGER.debug('Added: %r', value)
         return prefix, key
 
     def clear(self):
         """Clear all the callbacks if there are any defined."""
         self._stack = dict()
+        self._prefixes = dict()
         LOGGER.debug('Callbacks cleared')
 
-    @sanitize_prefix
     def cleanup(self, prefix):
         """Remove all callbacks from the stack by a prefix. Returns True
         if keys were there to be removed
@@ -175,13 +279,15 @@ class CallbackManager(object):
         :rtype: bool
 
         """
+        prefix = _name_or_value(prefix)
         LOGGER.debug('Clearing out %r from the stack', prefix)
-        if prefix not in self._stack or not self._stack[prefix]:
+        keys = self._prefixes.pop(prefix, None)
+        if not keys:
             return False
-        del self._stack[prefix]
+        for key in keys:
+            del self._stack[(prefix, key)]
         return True
 
-    @sanitize_prefix
     def pending(self, prefix, key):
         """Return count of callbacks for a given prefix or key or None
 
@@ -192,18 +298,23 @@ class CallbackManager(object):
         :rtype: None or int
 
         """
-        if not prefix in self._stack or not key in self._stack[prefix]:
+        callbacks = self._stack.get((_name_or_value(prefix),
+                                     _name_or_value(key)))
+        if callbacks is None:
             return None
-        return len(self._stack[prefix][key])
+        return len(callbacks)
 
-    @sanitize_prefix
-    @check_for_prefix_and_key
     def process(self, prefix, key, caller, *args, **keywords):
         """Run through and process all the callbacks for the specified keys.
         Caller should be specified at all times so that callbacks which
         require a specific function to call CallbackManager.process will
         not be processed.
 
+        One-shot callbacks that are used up are removed in the same pass
+        that selects the callbacks to call. As with remove, the other
+        callbacks for the same method whose arguments match are removed
+        along with them.
+
         :param prefix: Categorize the callback
         :type prefix: str or int
         :param key: The key for the callback
@@ -214,17 +325,31 @@ class CallbackManager(object):
         :rtype: bool
 
         """
-        LOGGER.debug('Processing %s:%s', prefix, key)
-        if prefix not in self._stack or key not in self._stack[prefix]:
+        prefix = _name_or_value(prefix)
+        key = _name_or_value(key)
+        registered = self._stack.get((prefix, key))
+        if registered is None:
             return False
+        LOGGER.debug('Processing %s:%s', prefix, key)
 
         callbacks = list()
-        # Check each callback, append it to the list if it should be called
-        for callback_dict in list(self._stack[prefix][key]):
-            if self._should_process_callback(callback_dict, caller, list(args)):
-                callbacks.append(callback_dict[self.CALLBACK])
-                if callback_dict[self.ONE_SHOT]:
-                    self._use_one_shot_callback(prefix, key, callback_dict)
+        remaining = list()
+        used = list()
+        for value in registered:
+            if value.should_process(caller, args):
+                callbacks.append(value.callback)
+                if value.one_shot:
+                    value.calls -= 1
+                    if value.calls <= 0:
+                        LOGGER.debug('Removing used oneshot callback: %r',
+                                     value)
+                        used.append(value)
+                        continue
+            remaining.append(value)
+        if used:
+            self._replace_callbacks(prefix, key, remaining)
+            for value in used:
+                self.remove(prefix, key, value.callback, value.arguments)
 
         # Call each callback
         for callback in callbacks:
@@ -232,8 +357,6 @@ class CallbackManager(object):
             callback(*args, **keywords)
         return True
 
-    @sanitize_prefix
-    @check_for_prefix_and_key
     def remove(self, prefix, key, callback_value=None, arguments=None):
         """Remove a callback from the stack by prefix, key and optionally
         the callback itself. If you only pass in prefix and key, all
@@ -246,28 +369,21 @@ class CallbackManager(object):
         :rtype: bool
 
         """
+        prefix = _name_or_value(prefix)
+        key = _name_or_value(key)
+        registered = self._stack.get((prefix, key))
+        if registered is None:
+            return False
         if callback_value:
-            offsets_to_remove = list()
-            for offset in xrange(len(self._stack[prefix][key]), 0, -1):
-                callback_dict = self._stack[prefix][key][offset - 1]
-
-                if (callback_dict[self.CALLBACK] == callback_value and
-                    self._arguments_match(callback_dict, [arguments])):
-                    offsets_to_remove.append(offset - 1)
-
-            for offset in offsets_to_remove:
-                try:
-                    LOGGER.debug('Removing callback #%i: %r', offset,
-                                 self._stack[prefix][key][offset])
-                    del self._stack[prefix][key][offset]
-                except KeyError:
-                    pass
-
-        self._cleanup_callback_dict(prefix, key)
+            remaining = [value for value in registered
+                         if not (value.callback == callback_value and
+                                 value.arguments_match((arguments,)))]
+            if len(remaining) != len(registered):
+                LOGGER.debug('Removing %i callbacks for %s:%s',
+                             len(registered) - len(remaining), prefix, key)
+                self._replace_callbacks(prefix, key, remaining)
         return True
 
-    @sanitize_prefix
-    @check_for_prefix_and_key
     def remove_all(self, prefix, key):
         """Remove all callbacks for the specified prefix and key.
 
@@ -275,126 +391,26 @@ class CallbackManager(object):
         :param str key: The callback key
 
         """
-        del self._stack[prefix][key]
-        self._cleanup_callback_dict(prefix, key)
-
-    def _arguments_match(self, callback_dict, args):
-        """Validate if the arguments passed in match the expected arguments in
-        the callback_dict. We expect this to be a frame passed in to *args for
-        process or passed in as a list from remove.
-
-        :param dict callback_dict: The callback dictionary to evaluate against
-        :param list args: The arguments passed in as a list
-
-        """
-        if callback_dict[self.ARGUMENTS] is None:
-            return True
-        if not args:
+        prefix = _name_or_value(prefix)
+        key = _name_or_value(key)
+        if (prefix, key) not in self._stack:
             return False
-        if isinstance(args[0], dict):
-            return self._dict_arguments_match(args[0],
-                                              callback_dict[self.ARGUMENTS])
-        return self._obj_arguments_match(args[0].method if hasattr(args[0],
-                                                                   'method')
-                                         else args[0],
-                                         callback_dict[self.ARGUMENTS])
+        self._replace_callbacks(prefix, key, None)
 
-    def _callback_dict(self, callback, one_shot, only_caller, arguments):
-        """Return the callback dictionary.
+    def _replace_callbacks(self, prefix, key, callbacks):
+        """Replace the callbacks for the prefix and key, removing the prefix
+        and key from the stack when there are none left.
 
-        :param method callback: The callback to call
-        :param bool one_shot: Remove this callback after it is called
-        :param object only_caller: Only allow one_caller value to call the
-                                   event that fires the callback.
-        :rtype: dict
-
-        """
-        value = {self.CALLBACK: callback,
-                 self.ONE_SHOT: one_shot,
-                 self.ONLY_CALLER: only_caller,
-                 self.ARGUMENTS: arguments}
-        if one_shot:
-            value[self.CALLS] = 1
-        return value
-
-    def _cleanup_callback_dict(self, prefix, key=None):
-        """Remove empty dict nodes in the callback stack.
-
-        :param str or int prefix: The prefix for keeping track of callbacks with
-        :param str key: The callback key
-
-        """
-        if key and key in self._stack[prefix] and not self._stack[prefix][key]:
-            del self._stack[prefix][key]
-        if prefix in self._stack and not self._stack[prefix]:
-            del self._stack[prefix]
-
-    def _dict_arguments_match(self, value, expectation):
-        """Checks an dict to see if it has attributes that meet the expectation.
-
-        :param dict value: The dict to evaluate
-        :param dict expectation: The values to check against
-        :rtype: bool
-
-        """
-        LOGGER.debug('Comparing %r to %r', value, expectation)
-        for key in expectation:
-            if value.get(key) != expectation[key]:
-                LOGGER.debug('Values in dict do not match for %s', key)
-                return False
-        return True
-
-    def _obj_arguments_match(self, value, expectation):
-        """Checks an object to see if it has attributes that meet the
-        expectation.
-
-        :param object value: The object to evaluate
-        :param dict expectation: The values to check against
-        :rtype: bool
-
-        """
-        for key in expectation:
-            if not hasattr(value, key):
-                LOGGER.debug('%r does not have required attribute: %s',
-                             type(value), key)
-                return False
-            if getattr(value, key) != expectation[key]:
-                LOGGER.debug('Values in %s do not match for %s',
-                             type(value), key)
-                return False
-        return True
-
-    def _should_process_callback(self, callback_dict, caller, args):
-        """Returns True if the callback should be processed.
-
-        :param dict callback_dict: The callback configuration
-        :param object caller: Who is firing the event
-        :param list args: Any optional arguments
-        :rtype: bool
-
-        """
-        if not self._arguments_match(callback_dict, args):
-            LOGGER.debug('Arguments do not match for %r, %r',
-                         callback_dict, args)
-            return False
-        return (callback_dict[self.ONLY_CALLER] is None or
-                (callback_dict[self.ONLY_CALLER] and
-                 callback_dict[self.ONLY_CALLER] == caller))
-
-    def _use_one_shot_callback(self, prefix, key, callback_dict):
-        """Process the one-shot callback, decrementing the use counter and
-        removing it from the stack if it's now been fully used.
-
-        :param str or int prefix: The prefix for keeping track of callbacks with
+        :param str prefix: The prefix for keeping track of callbacks with
         :param str key: The callback key
-        :param dict callback_dict: The callback dict to process
+        :param list callbacks: The callbacks to keep
 
         """
-        LOGGER.debug('Processing use of oneshot callback')
-        callback_dict[self.CALLS] -= 1
-        LOGGER.debug('%i registered uses left', callback_dict[self.CALLS])
-
-        if callback_dict[self.CALLS] <= 0:
-            self.remove(prefix, key,
-                        callback_dict[self.CALLBACK],
-                        callback_dict[self.ARGUMENTS])
+        if callbacks:
+            self._stack[(prefix, key)] = callbacks
+            return
+        del self._stack[(prefix, key)]
+        keys = self._prefixes[prefix]
+        keys.discard(key)
+        if not keys:
+            del self._prefixes[prefix]
@@ -3,11 +3,13 @@ implementing the methods and behaviors for an AMQP Channel.
 
 """
 import collections
+import functools
 import logging
+import mmap
+import tempfile
 import warnings
 import uuid
 
-import pika.frame as frame
 import pika.exceptions as exceptions
 import pika.spec as spec
 from pika.utils import is_callable
@@ -44,7 +46,8 @@ class Channel(object):
         self.connection = connection
 
         # The frame-handler changes depending on the type of frame processed
-        self.frame_dispatcher = ContentFrameDispatcher()
+        self.frame_dispatcher = ContentFrameDispatcher(
+            self._get_body_stream, self._wants_bytearray_body)
 
         self._blocked = collections.deque(list())
         self._blocking = None
@@ -56,6 +59,8 @@ class Channel(object):
         self._on_openok_callback = on_open_callback
         self._pending = dict()
         self._state = self.CLOSED
+        self._streaming = set()
+        self._bytearray_bodies = set()
 
     def __int__(self):
         """Return the channel object as its channel number
@@ -180,12 +185,32 @@ class Channel(object):
                     {'consumer_tag': consumer_tag})] if nowait is False else [])
 
     def basic_consume(self, consumer_callback, queue='', no_ack=False,
-                      exclusive=False, consumer_tag=None, arguments=None):
+                      exclusive=False, consumer_tag=None, arguments=None,
+                      streaming=False, bytearray_body=False):
         """Sends the AMQP command Basic.Consume to the broker and binds messages
         for the consumer_tag to the consumer callback. If you do not pass in
         a consumer_tag, one will be automatically generated for you. Returns
         the consumer tag.
 
+        The body passed to the consumer callback is a str, or a read-only
+        mmap.mmap when it is larger than the large_body_threshold of the
+        channel. If bytearray_body is True, a body that is split over several
+        body frames is instead copied into a bytearray of its size as the
+        frames arrive and passed as that bytearray, so that a large message
+        only needs about its own size in memory. A body in a single body
+        frame is still passed as a str.
+
+        If streaming is True, the body of each message is not assembled.
+        Instead, the consumer callback is called with the channel, method
+        and properties of the message and a str for every body frame as it
+        arrives, and then once more with None in place of the body when the
+        message is complete. A message with an empty body only gets the call
+        with None. This lets a consumer process very large messages, such as
+        writing them to disk, without holding the whole body in memory. If the
+        channel closes before a message is complete, or its body frames are
+        longer than its header says, the callback is not called with None, and
+        the part of the body it was passed should be discarded.
+
         For more information on basic_consume, see:
         http://www.rabbitmq.com/amqp-0-9-1-reference.html#basic.consume
 
@@ -197,6 +222,9 @@ class Channel(object):
         :param consumer_tag: Specify your own consumer tag
         :type consumer_tag: str or unicode
         :param dict arguments: Custom key/value pair arguments for the consume
+        :param bool streaming: Pass the body to the callback frame by frame
+        :param bool bytearray_body: Pass bodies split over several frames as
+                                    a bytearray
         :rtype: str
 
         """
@@ -211,6 +239,10 @@ class Channel(object):
 
         self._consumers[consumer_tag] = consumer_callback
         self._pending[consumer_tag] = list()
+        if streaming:
+            self._streaming.add(consumer_tag)
+        if bytearray_body:
+            self._bytearray_bodies.add(consumer_tag)
         self._rpc(spec.Basic.Consume(queue=queue,
                                      consumer_tag=consumer_tag,
                                      no_ack=no_ack,
@@ -275,12 +307,21 @@ class Channel(object):
 
         http://www.rabbitmq.com/amqp-0-9-1-reference.html#basic.publish
 
+        The body may be a list or tuple of str, bytearray or memoryview
+        buffers, which is sent as their concatenation without joining them
+        first. It may also be a seekable file object or an mmap.mmap, such as
+        open(path, 'rb'), in which case it is sent from its current position
+        to its end. Its body frames are read from it as the connection writes
+        them, so the body is never in memory as a whole. The connection keeps
+        a reference to it until then, and it must not be closed or changed
+        in the meantime.
+
         :param exchange: The exchange to publish to
         :type exchange: str or unicode
         :param routing_key: The routing key to bind on
         :type routing_key: str or unicode
         :param body: The message body
-        :type body: str or unicode
+        :type body: str, unicode, list, tuple, file or mmap.mmap
         :param pika.spec.BasicProperties properties: Basic.properties
         :param bool mandatory: The mandatory flag
         :param bool immediate: The immediate flag
@@ -572,6 +613,32 @@ class Channel(object):
         """
         return self._state == self.OPEN
 
+    @property
+    def large_body_threshold(self):
+        """The body size in bytes above which the body of a message that is
+        received on the channel is written to a temporary file as it arrives
+        and delivered as a read-only mmap.mmap of that file, or None if
+        bodies are always kept in memory, which is the default.
+
+        The mmap supports len, slicing and the buffer interface, so consumer
+        callbacks that only read the body keep working, while a rare huge
+        message does not have to fit in memory. The temporary file is
+        removed when the mmap is closed or garbage collected.
+
+        :rtype: int|None
+
+        """
+        return self.frame_dispatcher.large_body_threshold
+
+    @large_body_threshold.setter
+    def large_body_threshold(self, value):
+        """Set the body size above which bodies are spilled to disk.
+
+        :param int|None value: The body size in bytes, or None
+
+        """
+        self.frame_dispatcher.large_body_threshold = value
+
     def open(self):
         """Open the channel"""
         self._set_state(self.OPENING)
@@ -758,10 +825,48 @@ class Channel(object):
                                             header_frame.properties, body))
 
     def _cleanup(self):
-        """Remove all consumers and any callbacks for the channel."""
+        """Remove all consumers and any callbacks for the channel, and drop
+        the message that is only partly received.
+
+        """
+        self.frame_dispatcher.discard()
         self._consumers = dict()
+        self._streaming = set()
+        self._bytearray_bodies = set()
         self.callbacks.cleanup(str(self.channel_number))
 
+    def _get_body_stream(self, method_frame, header_frame):
+        """Return the callable to pass the body of a message to frame by frame
+        if the message is delivered to a streaming consumer that can take it
+        right away, otherwise None so that the body is assembled.
+
+        :param pika.frame.Method method_frame: The method frame received
+        :param pika.frame.Header header_frame: The header frame received
+        :rtype: functools.partial|None
+
+        """
+        if method_frame.method.INDEX != spec.Basic.Deliver.INDEX:
+            return None
+        consumer_tag = method_frame.method.consumer_tag
+        if (consumer_tag not in self._streaming or
+                consumer_tag not in self._consumers or
+                self._pending[consumer_tag]):
+            return None
+        return functools.partial(self._consumers[consumer_tag], self,
+                                 method_frame.method, header_frame.properties)
+
+    def _wants_bytearray_body(self, method_frame, unused_header_frame):
+        """Return True if the body of a message is delivered to a consumer
+        that asked for bodies split over several frames as a bytearray.
+
+        :param pika.frame.Method method_frame: The method frame received
+        :param pika.frame.Header unused_header_frame: The header frame received
+        :rtype: bool
+
+        """
+        return (method_frame.method.INDEX == spec.Basic.Deliver.INDEX and
+                method_frame.method.consumer_tag in self._bytearray_bodies)
+
     def _get_pending_msg(self, consumer_tag):
         """Get a pending message for the consumer tag from the stack.
 
@@ -788,11 +893,12 @@ class Channel(object):
             return self._unexpected_frame(frame_value)
 
         if response:
-            if isinstance(response[0].method, spec.Basic.Deliver):
+            index = response[0].method.INDEX
+            if index == spec.Basic.Deliver.INDEX:
                 self._on_deliver(*response)
-            elif isinstance(response[0].method, spec.Basic.GetOk):
+            elif index == spec.Basic.GetOk.INDEX:
                 self._on_getok(*response)
-            elif isinstance(response[0].method, spec.Basic.Return):
+            elif index == spec.Basic.Return.INDEX:
                 self._on_return(*response)
 
     def _has_content(self, method_frame):
@@ -813,6 +919,8 @@ class Channel(object):
         self._cancelled.append(method_frame.method.consumer_tag)
         if method_frame.method.consumer_tag in self._consumers:
             del self._consumers[method_frame.method.consumer_tag]
+        self._streaming.discard(method_frame.method.consumer_tag)
+        self._bytearray_bodies.discard(method_frame.method.consumer_tag)
 
     def _on_cancelok(self, method_frame):
         """Called in response to a frame from the Broker when the
@@ -825,6 +933,8 @@ class Channel(object):
             del self._consumers[method_frame.method.consumer_tag]
         if method_frame.method.consumer_tag in self._pending:
             del self._pending[method_frame.method.consumer_tag]
+        self._streaming.discard(method_frame.method.consumer_tag)
+        self._bytearray_bodies.discard(method_frame.method.consumer_tag)
 
     def _on_close(self, method_frame):
         """Handle the case where our channel has been closed for us
@@ -878,6 +988,9 @@ class Channel(object):
         if consumer_tag not in self._consumers:
             return self._add_pending_msg(consumer_tag, method_frame,
                                          header_frame, body)
+        if consumer_tag in self._streaming:
+            return self._on_streamed_deliver(consumer_tag, method_frame,
+                                             header_frame, body)
         while self._pending[consumer_tag]:
             self._consumers[consumer_tag](*self._get_pending_msg(consumer_tag))
         self._consumers[consumer_tag](self,
@@ -885,6 +998,29 @@ class Channel(object):
                                       header_frame.properties,
                                       body)
 
+    def _on_streamed_deliver(self, consumer_tag, method_frame, header_frame,
+                             body):
+        """Pass a message whose body has been assembled, and any pending
+        messages before it, to a streaming consumer as a single body frame
+        followed by the end of the body.
+
+        :param str consumer_tag: The consumer tag for the message
+        :param pika.frame.Method method_frame: The method frame received
+        :param pika.frame.Header header_frame: The header frame received
+        :param body: The body received
+        :type body: str or bytearray
+
+        """
+        messages = self._pending[consumer_tag]
+        messages.append((self, method_frame.method, header_frame.properties,
+                         body))
+        while messages:
+            channel, method, properties, body = messages.pop(0)
+            if body:
+                self._consumers[consumer_tag](channel, method, properties,
+                                              body)
+            self._consumers[consumer_tag](channel, method, properties, None)
+
     def _on_eventok(self, method_frame):
         """Generic events that returned ok that may have internal callbacks.
         We keep a list of what we've yet to implement so that we don't silently
@@ -1084,16 +1220,44 @@ class ContentFrameDispatcher(object):
     """Handle content related frames, building a message and return the message
     back in three parts upon receipt.
 
+    A body is returned as a str. When a bytearray callback is passed in, it
+    is called with the method and header frames of each message that has a
+    body, and if it returns True and the body is split over several body
+    frames, the frames are copied into a bytearray of the body size given by
+    the content header as they arrive, and that bytearray is returned, so
+    that a large message only needs about its own size in memory.
+
+    When a stream callback is passed in, it is called with the method and
+    header frames of each message that has a body. If it returns a callable,
+    the body is not assembled: the callable is called with the fragment of
+    every body frame as it arrives and then with None when the body is
+    complete, and no message is returned for it.
+
+    A body that is larger than large_body_threshold is written to a temporary
+    file instead, and returned as a read-only mmap.mmap of that file.
+
     """
-    def __init__(self):
-        """Create a new instance of the Dispatcher passing in the callback
-        manager.
+    def __init__(self, stream_callback=None, bytearray_callback=None):
+        """Create a new instance of the Dispatcher.
+
+        :param method stream_callback: Returns the callable to stream the body
+                                       of a message to, or None
+        :param method bytearray_callback: Returns True to assemble the body of
+                                          a message in a bytearray
 
         """
+        self._stream_callback = stream_callback
+        self._bytearray_callback = bytearray_callback
+        self.large_body_threshold = None
         self._method_frame = None
         self._header_frame = None
         self._seen_so_far = 0
-        self._body_fragments = list()
+        self._body_fragments = None
+        self._as_bytearray = False
+        self._body = None
+        self._body_view = None
+        self._body_stream = None
+        self._body_file = None
 
     def process(self, frame_value):
         """Invoked by the Channel object when passed frames that are not
@@ -1103,51 +1267,131 @@ class ContentFrameDispatcher(object):
         :param Method|Header|Body frame_value: The frame to process
 
         """
-        if (isinstance(frame_value, frame.Method) and
-            spec.has_content(frame_value.method.INDEX)):
-            self._method_frame = frame_value
-        elif isinstance(frame_value, frame.Header):
+        frame_type = frame_value.frame_type
+        if frame_type == spec.FRAME_BODY:
+            return self._handle_body_frame(frame_value)
+        elif frame_type == spec.FRAME_HEADER:
             self._header_frame = frame_value
             if frame_value.body_size == 0:
-                return self._finish()
-        elif isinstance(frame_value, frame.Body):
-            return self._handle_body_frame(frame_value)
+                return self._finish('')
+            if (self._stream_callback is not None and
+                    self._method_frame is not None):
+                self._body_stream = self._stream_callback(self._method_frame,
+                                                          frame_value)
+            if (self._bytearray_callback is not None and
+                    self._method_frame is not None):
+                self._as_bytearray = self._bytearray_callback(
+                    self._method_frame, frame_value)
+        elif (frame_type == spec.FRAME_METHOD and
+              spec.has_content(frame_value.method.INDEX)):
+            self._method_frame = frame_value
         else:
             raise exceptions.UnexpectedFrameError(frame_value)
 
-    def _finish(self):
+    def _finish(self, body):
         """Invoked when all of the message has been received
 
-        :rtype: tuple(pika.frame.Method, pika.frame.Header, str)
+        :param str|bytearray|mmap.mmap body: The message body
+        :rtype: tuple(pika.frame.Method, pika.frame.Header,
+                      str|bytearray|mmap.mmap)
 
         """
-        content = (self._method_frame,
-                   self._header_frame,
-                   ''.join(self._body_fragments))
+        content = (self._method_frame, self._header_frame, body)
         self._reset()
         return content
 
     def _handle_body_frame(self, body_frame):
-        """Receive body frames and append them to the stack. When the body size
-        matches, call the finish method.
+        """Receive body frames, appending them to the body fragments or
+        copying them into the body buffer at the offset they belong at, or
+        writing them to the body file if the body is larger than the
+        threshold. When the body size matches, call the finish method.
 
         :param Body body_frame: The body frame
         :raises: pika.exceptions.BodyTooLongError
-        :rtype: tuple(pika.frame.Method, pika.frame.Header, str)|None
+        :rtype: tuple(pika.frame.Method, pika.frame.Header,
+                      str|bytearray|mmap.mmap)|None
 
         """
-        self._seen_so_far += len(body_frame.fragment)
-        self._body_fragments.append(body_frame.fragment)
-        if self._seen_so_far == self._header_frame.body_size:
-            return self._finish()
-        elif self._seen_so_far > self._header_frame.body_size:
-            raise exceptions.BodyTooLongError(self._seen_so_far,
-                                              self._header_frame.body_size)
+        fragment = body_frame.fragment
+        body_size = self._header_frame.body_size
+        offset = self._seen_so_far
+        self._seen_so_far += len(fragment)
+        if self._seen_so_far > body_size:
+            seen_so_far = self._seen_so_far
+            self._reset()
+            raise exceptions.BodyTooLongError(seen_so_far, body_size)
+        if self._body_stream is not None:
+            body_stream = self._body_stream
+            if self._seen_so_far == body_size:
+                self._reset()
+                body_stream(fragment)
+                body_stream(None)
+            else:
+                body_stream(fragment)
+            return None
+        if (self._body_fragments is None and self._body is None and
+                self._body_file is None):
+            if (self.large_body_threshold is not None and
+                    body_size > self.large_body_threshold):
+                self._body_file = tempfile.TemporaryFile()
+            elif self._seen_so_far == body_size:
+                return self._finish(fragment)
+            elif self._as_bytearray:
+                self._body = bytearray(body_size)
+                self._body_view = memoryview(self._body)
+            else:
+                self._body_fragments = list()
+        if self._body_file is not None:
+            self._body_file.write(fragment)
+            if self._seen_so_far == body_size:
+                return self._finish(self._map_body_file())
+            return None
+        if self._body_fragments is not None:
+            self._body_fragments.append(fragment)
+            if self._seen_so_far == body_size:
+                return self._finish(''.join(self._body_fragments))
+            return None
+        self._body_view[offset:self._seen_so_far] = fragment
+        if self._seen_so_far == body_size:
+            return self._finish(self._body)
         return None
 
+    def _map_body_file(self):
+        """Map the body file that has been written to memory, closing the
+        file. The mapping keeps the removed file around until it is closed.
+
+        :rtype: mmap.mmap
+
+        """
+        body_file = self._body_file
+        self._body_file = None
+        try:
+            body_file.flush()
+            return mmap.mmap(body_file.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            body_file.close()
+
+    def discard(self):
+        """Drop the message that is being received, if any, closing the file
+        of a body that spilled to disk. The callable that a body is being
+        streamed to is not called again.
+
+        """
+        self._reset()
+
     def _reset(self):
-        """Reset the values for processing frames"""
+        """Reset the values for processing frames, closing the file of a body
+        that is only partly received.
+
+        """
         self._method_frame = None
         self._header_frame = None
         self._seen_so_far = 0
-        self._body_fragments = list()
+        self._body_fragments = None
+        self._as_bytearray = False
+        self._body = None
+        self._body_view = None
+        self._body_stream = None
+        if self._body_file is not None:
+            self._body_file.close()
+            self._body_file = None
@@ -3,7 +3,6 @@ import ast
 import sys
 import collections
 import logging
-import math
 import platform
 import threading
 import urllib
@@ -858,7 +857,41 @@ class Connection(object):
         :param str value: The bytes to append to the frame buffer
 
         """
-        self._frame_buffer += value
+        size = len(value)
+        self._frame_buffer_space(size)[:size] = value
+        self._frame_buffer_end += size
+
+    def _compact_frame_buffer(self):
+        """Start filling the frame buffer from its beginning again once all of
+        the bytes in it have been decoded. A trailing partial frame is left in
+        place, and only moved when the space after it runs out.
+
+        """
+        if self._frame_buffer_offset == self._frame_buffer_end:
+            self._frame_buffer_offset = 0
+            self._frame_buffer_end = 0
+
+    def _frame_buffer_space(self, size):
+        """Return a memoryview of the free space at the end of the frame
+        buffer, making room for at least size bytes first. Adapters receive
+        data straight into it and then call _on_frame_buffer_filled. When
+        there is not enough room, the undecoded bytes are moved to the
+        beginning of the buffer, which is replaced by a larger one if needed.
+
+        :param int size: The number of bytes to make room for
+        :rtype: memoryview
+
+        """
+        frame_buffer = self._frame_buffer
+        if len(frame_buffer) - self._frame_buffer_end < size:
+            pending = self._frame_buffer_end - self._frame_buffer_offset
+            if len(frame_buffer) - pending < size:
+                self._frame_buffer = bytearray(max(pending + size, size * 2))
+            self._frame_buffer[:pending] = \
+                frame_buffer[self._frame_buffer_offset:self._frame_buffer_end]
+            self._frame_buffer_offset = 0
+            self._frame_buffer_end = pending
+        return memoryview(self._frame_buffer)[self._frame_buffer_end:]
 
     @property
     def _buffer_size(self):
@@ -968,7 +1001,8 @@ class Connection(object):
         :param pika.frame.Method value: The frame to deliver
 
         """
-        if not value.channel_number in self._channels:
+        channel = self._channels.get(value.channel_number)
+        if channel is None:
             if self._is_basic_deliver_frame(value):
                 self._reject_out_of_band_delivery(value.channel_number,
                                                   value.method.delivery_tag)
@@ -976,7 +1010,7 @@ class Connection(object):
                 LOGGER.warning("Received %r for non-existing channel %i",
                                value, value.channel_number)
             return
-        return self._channels[value.channel_number]._handle_content_frame(value)
+        return channel._handle_content_frame(value)
 
     def _detect_backpressure(self):
         """Attempt to calculate if TCP backpressure is being applied due to
@@ -1064,8 +1098,16 @@ class Connection(object):
         # Outbound buffer for buffering writes until we're able to send them
         self.outbound_buffer = collections.deque([])
 
-        # Inbound buffer for decoding frames
-        self._frame_buffer = bytes()
+        # Inbound buffer for decoding frames, the offset of the first byte in
+        # it that has not been decoded yet and the offset of the end of the
+        # data received into it. The space after the end is reused for the
+        # data that is received next.
+        self._frame_buffer = bytearray()
+        self._frame_buffer_offset = 0
+        self._frame_buffer_end = 0
+
+        # Frames that have been decoded but not yet dispatched
+        self._inbound_frames = collections.deque()
 
         # Dict of open channels
         self._channels = dict()
@@ -1280,12 +1322,37 @@ class Connection(object):
 
         """
         self._append_frame_buffer(data_in)
-        while self._frame_buffer:
-            consumed_count, frame_value = self._read_frame()
-            if not frame_value:
-                return
-            self._trim_frame_buffer(consumed_count)
-            self._process_frame(frame_value)
+        self._process_frame_buffer()
+
+    def _on_frame_buffer_filled(self, byte_count):
+        """This is called by our Adapter after it has received byte_count
+        bytes from the socket into the space returned by _frame_buffer_space.
+
+        :param int byte_count: The number of bytes received
+
+        """
+        self._frame_buffer_end += byte_count
+        self._process_frame_buffer()
+
+    def _process_frame_buffer(self):
+        """Decode and dispatch all of the complete frames in the frame
+        buffer. If an invalid frame is found, the frames before it are
+        dispatched before its error is raised.
+
+        :raises: pika.exceptions.InvalidFrameError
+
+        """
+        frames, error = self._read_frames()
+        self._inbound_frames.extend(frames)
+        self._compact_frame_buffer()
+
+        # Frames are queued rather than iterated over directly so that they
+        # are still dispatched in order if processing one of them reads more
+        # data from the socket and re-enters this method
+        while self._inbound_frames:
+            self._process_frame(self._inbound_frames.popleft())
+        if error:
+            raise error
 
     def _on_disconnect(self, reply_code, reply_text):
         """Invoke passing in the reply_code and reply_text from internal
@@ -1351,6 +1418,14 @@ class Connection(object):
         # Keep track of how many frames have been read
         self.frames_received += 1
 
+        # Content frames of deliveries go straight to the channel
+        frame_type = frame_value.frame_type
+        if (frame_type == spec.FRAME_BODY or
+                frame_type == spec.FRAME_HEADER or
+                (frame_type == spec.FRAME_METHOD and
+                 frame_value.method.INDEX == spec.Basic.Deliver.INDEX)):
+            return self._deliver_frame_to_channel(frame_value)
+
         # Process any callbacks, if True, exit method
         if self._process_callbacks(frame_value):
             return
@@ -1367,13 +1442,19 @@ class Connection(object):
         elif frame_value.channel_number > 0:
             self._deliver_frame_to_channel(frame_value)
 
-    def _read_frame(self):
-        """Try and read from the frame buffer and decode a frame.
+    def _read_frames(self):
+        """Decode all of the complete frames in the frame buffer, marking the
+        bytes they used as consumed. Returns the frames and the error raised
+        by an invalid frame that follows them, or None.
 
-        :rtype tuple: (int, pika.frame.Frame)
+        :rtype: tuple(list, pika.exceptions.InvalidFrameError|None)
 
         """
-        return frame.decode_frame(self._frame_buffer)
+        frames, offset, error = frame.decode_frames(self._frame_buffer,
+                                                    self._frame_buffer_offset,
+                                                    self._frame_buffer_end)
+        self._trim_frame_buffer(offset - self._frame_buffer_offset)
+        return frames, error
 
     def _reject_out_of_band_delivery(self, channel_number, delivery_tag):
         """Reject a delivery on the specified channel number and delivery tag
@@ -1511,8 +1592,10 @@ class Connection(object):
 
     def _send_message(self, channel_number, method_frame, content=None):
         """Send the message directly, bypassing the single _send_frame
-        invocation by directly appending to the output buffer and flushing
-        within a lock.
+        invocation by marshaling all of its frames into a single buffer,
+        appending it to the output buffer and flushing within a lock. The
+        body frames of a body that is a file object or an mmap are appended
+        as pika.frame.BodyFrames instead, to be marshaled as they are written.
 
         :param int channel_number: The channel number for the frame
         :param pika.object.Method method_frame: The method frame to send
@@ -1520,23 +1603,22 @@ class Connection(object):
                               properties and body.
 
         """
-        length = len(content[1])
-        write_buffer = [frame.Method(channel_number, method_frame).marshal(),
-                        frame.Header(channel_number,
-                                     length, content[0]).marshal()]
-        if content[1]:
-            chunks = int(math.ceil(float(length) / self._body_max_length))
-            for chunk in range(0, chunks):
-                s = chunk * self._body_max_length
-                e = s + self._body_max_length
-                if e > length:
-                    e = length
-                write_buffer.append(frame.Body(channel_number,
-                                               content[1][s:e]).marshal())
+        body = content[1]
+        if hasattr(body, 'read'):
+            body = frame.BodyFrames(channel_number, body,
+                                    self._body_max_length)
+        marshaled_message, frame_count = frame.marshal_message(
+            channel_number, method_frame, content[0], body,
+            self._body_max_length)
 
         with self._write_lock:
-            self.outbound_buffer += write_buffer
-            self.frames_sent += len(write_buffer)
+            self.outbound_buffer.append(marshaled_message)
+            self.bytes_sent += len(marshaled_message)
+            self.frames_sent += frame_count
+            if isinstance(body, frame.BodyFrames) and body:
+                self.outbound_buffer.append(body)
+                self.bytes_sent += len(body)
+                self.frames_sent += body.frame_count
             self._flush_outbound()
             if self.params.backpressure_detection:
                 self._detect_backpressure()
@@ -1562,12 +1644,13 @@ class Connection(object):
             del self.server_properties['capabilities']
 
     def _trim_frame_buffer(self, byte_count):
-        """Trim the leading N bytes off the frame buffer and increment the
-        counter that keeps track of how many bytes have been read/used from the
-        socket.
+        """Mark the leading N undecoded bytes of the frame buffer as consumed
+        and increment the counter that keeps track of how many bytes have been
+        read/used from the socket. The bytes are not removed until the buffer
+        is compacted.
 
         :param int byte_count: The number of bytes consumed
 
         """
-        self._frame_buffer = self._frame_buffer[byte_count:]
+        self._frame_buffer_offset += byte_count
         self.bytes_received += byte_count
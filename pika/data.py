@@ -6,6 +6,32 @@ from datetime import datetime
 
 from pika import exceptions
 
+# Precompiled structs for the fixed width values in AMQP tables
+_OCTET = struct.Struct('>B')
+_SIGNED_OCTET = struct.Struct('>b')
+_SHORT = struct.Struct('>h')
+_UNSIGNED_SHORT = struct.Struct('>H')
+_LONG = struct.Struct('>i')
+_UNSIGNED_LONG = struct.Struct('>I')
+_LONG_LONG = struct.Struct('>q')
+_UNSIGNED_LONG_LONG = struct.Struct('>Q')
+_FLOAT = struct.Struct('>f')
+_DOUBLE = struct.Struct('>d')
+
+# Precompiled structs for encoding values with their type code
+_TYPED_OCTET = struct.Struct('>cB')
+_TYPED_LONG = struct.Struct('>ci')
+_TYPED_UNSIGNED_LONG = struct.Struct('>cI')
+_TYPED_LONG_LONG = struct.Struct('>cq')
+_TYPED_UNSIGNED_LONG_LONG = struct.Struct('>cQ')
+_TYPED_DECIMAL = struct.Struct('>cBi')
+
+# Encoded table keys by key, including their length octet. Tables such as
+# message headers tend to reuse the same keys, so they are only encoded once.
+# The cache stops growing once it holds _KEY_CACHE_SIZE keys.
+_KEY_CACHE_SIZE = 1024
+_encoded_keys = dict()
+
 
 def encode_table(pieces, table):
     """Encode a dict as an AMQP table appending the encded table to the
@@ -21,17 +47,31 @@ def encode_table(pieces, table):
     pieces.append(None)  # placeholder
     tablesize = 0
     for (key, value) in table.items():
-        if isinstance(key, unicode):
-            key = key.encode('utf-8')
-        pieces.append(struct.pack('B', len(key)))
-        pieces.append(key)
-        tablesize = tablesize + 1 + len(key)
+        encoded_key = _encoded_keys.get(key)
+        if encoded_key is None:
+            encoded_key = _encode_key(key)
+        pieces.append(encoded_key)
+        tablesize += len(encoded_key)
         tablesize += encode_value(pieces, value)
 
-    pieces[length_index] = struct.pack('>I', tablesize)
+    pieces[length_index] = _UNSIGNED_LONG.pack(tablesize)
     return tablesize + 4
 
 
+def _encode_key(key):
+    """Encode a table key as a short string, adding it to the key cache.
+
+    :param str|unicode key: The key to encode
+    :rtype: str
+
+    """
+    value = key.encode('utf-8') if isinstance(key, unicode) else key
+    encoded_key = _OCTET.pack(len(value)) + value
+    if len(_encoded_keys) < _KEY_CACHE_SIZE:
+        _encoded_keys[key] = encoded_key
+    return encoded_key
+
+
 def encode_value(pieces, value):
     """Encode the value passed in and append it to the pieces list returning
     the the size of the encoded value.
@@ -41,51 +81,102 @@ def encode_value(pieces, value):
     :rtype: int
 
     """
-    if isinstance(value, basestring):
-        if isinstance(value, unicode):
-            value = value.encode('utf-8')
-        pieces.append(struct.pack('>cI', 'S', len(value)))
-        pieces.append(value)
-        return 5 + len(value)
-    elif isinstance(value, bool):
-        pieces.append(struct.pack('>cB', 't', int(value)))
-        return 2
-    elif isinstance(value, int):
-        pieces.append(struct.pack('>ci', 'I', value))
-        return 5
-    elif isinstance(value, long):
-        pieces.append(struct.pack('>cq', 'l', value))
-        return 9
-    elif isinstance(value, decimal.Decimal):
-        value = value.normalize()
-        if value._exp < 0:
-            decimals = -value._exp
-            raw = int(value * (decimal.Decimal(10) ** decimals))
-            pieces.append(struct.pack('>cBi', 'D', decimals, raw))
+    encoder = _ENCODERS.get(value.__class__)
+    if encoder is None:
+        for value_type, encoder in _ENCODER_TYPES:
+            if isinstance(value, value_type):
+                break
         else:
-            # per spec, the "decimals" octet is unsigned (!)
-            pieces.append(struct.pack('>cBi', 'D', 0, int(value)))
-        return 6
-    elif isinstance(value, datetime):
-        pieces.append(struct.pack('>cQ', 'T',
-                                  calendar.timegm(value.utctimetuple())))
-        return 9
-    elif isinstance(value, dict):
-        pieces.append(struct.pack('>c', 'F'))
-        return 1 + encode_table(pieces, value)
-    elif isinstance(value, list):
-        p = []
-        for v in value:
-            encode_value(p, v)
-        piece = ''.join(p)
-        pieces.append(struct.pack('>cI', 'A', len(piece)))
-        pieces.append(piece)
-        return 5 + len(piece)
-    elif value is None:
-        pieces.append(struct.pack('>c', 'V'))
-        return 1
+            raise exceptions.UnsupportedAMQPFieldException(pieces, value)
+    return encoder(pieces, value)
+
+
+def _encode_string(pieces, value):
+    pieces.append(_TYPED_UNSIGNED_LONG.pack('S', len(value)))
+    pieces.append(value)
+    return 5 + len(value)
+
+
+def _encode_unicode(pieces, value):
+    return _encode_string(pieces, value.encode('utf-8'))
+
+
+def _encode_basestring(pieces, value):
+    if isinstance(value, unicode):
+        return _encode_unicode(pieces, value)
+    return _encode_string(pieces, value)
+
+
+def _encode_bool(pieces, value):
+    pieces.append(_TYPED_OCTET.pack('t', int(value)))
+    return 2
+
+
+def _encode_int(pieces, value):
+    pieces.append(_TYPED_LONG.pack('I', value))
+    return 5
+
+
+def _encode_long(pieces, value):
+    pieces.append(_TYPED_LONG_LONG.pack('l', value))
+    return 9
+
+
+def _encode_decimal(pieces, value):
+    value = value.normalize()
+    if value._exp < 0:
+        decimals = -value._exp
+        raw = int(value * (decimal.Decimal(10) ** decimals))
+        pieces.append(_TYPED_DECIMAL.pack('D', decimals, raw))
     else:
-        raise exceptions.UnsupportedAMQPFieldException(pieces, value)
+        # per spec, the "decimals" octet is unsigned (!)
+        pieces.append(_TYPED_DECIMAL.pack('D', 0, int(value)))
+    return 6
+
+
+def _encode_datetime(pieces, value):
+    pieces.append(_TYPED_UNSIGNED_LONG_LONG.pack(
+        'T', calendar.timegm(value.utctimetuple())))
+    return 9
+
+
+def _encode_dict(pieces, value):
+    pieces.append('F')
+    return 1 + encode_table(pieces, value)
+
+
+def _encode_list(pieces, value):
+    p = []
+    for v in value:
+        encode_value(p, v)
+    piece = ''.join(p)
+    pieces.append(_TYPED_UNSIGNED_LONG.pack('A', len(piece)))
+    pieces.append(piece)
+    return 5 + len(piece)
+
+
+def _encode_none(pieces, value):
+    pieces.append('V')
+    return 1
+
+
+# The value encoders by type, checked in order with isinstance for values of
+# types that are not in _ENCODERS, such as subclasses
+_ENCODER_TYPES = ((basestring, _encode_basestring),
+                  (bool, _encode_bool),
+                  (int, _encode_int),
+                  (long, _encode_long),
+                  (decimal.Decimal, _encode_decimal),
+                  (datetime, _encode_datetime),
+                  (dict, _encode_dict),
+                  (list, _encode_list),
+                  (type(None), _encode_none))
+
+# The value encoders by the exact type of the value
+_ENCODERS = dict(_ENCODER_TYPES)
+_ENCODERS[str] = _encode_string
+_ENCODERS[unicode] = _encode_unicode
+del _ENCODERS[basestring]
 
 
 def decode_table(encoded, offset):
@@ -95,19 +186,23 @@ def decode_table(encoded, offset):
     :param str encoded: The binary encoded data to decode
     :param int offset: The starting byte offset
     :rtype: tuple
+    :raises: pika.exceptions.InvalidFieldTypeException
 
     """
     result = {}
-    tablesize = struct.unpack_from('>I', encoded, offset)[0]
+    tablesize = _UNSIGNED_LONG.unpack_from(encoded, offset)[0]
     offset += 4
     limit = offset + tablesize
+    decoders = _DECODERS
     while offset < limit:
-        keylen = struct.unpack_from('B', encoded, offset)[0]
+        keylen = ord(encoded[offset])
         offset += 1
         key = encoded[offset: offset + keylen]
         offset += keylen
-        value, offset = decode_value(encoded, offset)
-        result[key] = value
+        decoder = decoders.get(encoded[offset])
+        if decoder is None:
+            raise exceptions.InvalidFieldTypeException(encoded[offset])
+        result[key], offset = decoder(encoded, offset + 1)
     return result, offset
 
 
@@ -121,111 +216,105 @@ def decode_value(encoded, offset):
     :raises: pika.exceptions.InvalidFieldTypeException
 
     """
-    kind = encoded[offset]
+    decoder = _DECODERS.get(encoded[offset])
+    if decoder is None:
+        raise exceptions.InvalidFieldTypeException(encoded[offset])
+    return decoder(encoded, offset + 1)
+
+
+def _fixed_decoder(unpacker, size, convert=None):
+    """Return a decoder for a fixed width value.
+
+    :param struct.Struct unpacker: The struct to unpack the value with
+    :param int size: The size of the value
+    :param callable convert: Called with the unpacked value if set
+    :rtype: callable
+
+    """
+    unpack_from = unpacker.unpack_from
+    if convert is None:
+        def decoder(encoded, offset):
+            return unpack_from(encoded, offset)[0], offset + size
+    else:
+        def decoder(encoded, offset):
+            return convert(unpack_from(encoded, offset)[0]), offset + size
+    return decoder
+
+
+def _decode_decimal(encoded, offset):
+    decimals = _OCTET.unpack_from(encoded, offset)[0]
+    raw = _LONG.unpack_from(encoded, offset + 1)[0]
+    return (decimal.Decimal(raw) * (decimal.Decimal(10) ** -decimals),
+            offset + 5)
+
+
+def _decode_short_string(encoded, offset):
+    length = ord(encoded[offset])
     offset += 1
+    return encoded[offset: offset + length].decode('utf8'), offset + length
 
-    # Bool
-    if kind == 't':
-        value = struct.unpack_from('>B', encoded, offset)[0]
-        value = bool(value)
-        offset += 1
 
-    # Short-Short Int
-    elif kind == 'b':
-        value = struct.unpack_from('>B', encoded, offset)[0]
-        offset += 1
+def _decode_long_string(encoded, offset):
+    length = _UNSIGNED_LONG.unpack_from(encoded, offset)[0]
+    offset += 4
+    return encoded[offset: offset + length].decode('utf8'), offset + length
 
-    # Short-Short Unsigned Int
-    elif kind == 'B':
-        value = struct.unpack_from('>b', encoded, offset)[0]
-        offset += 1
 
-    # Short Int
-    elif kind == 'U':
-        value = struct.unpack_from('>h', encoded, offset)[0]
-        offset += 2
+def _decode_array(encoded, offset):
+    length = _UNSIGNED_LONG.unpack_from(encoded, offset)[0]
+    offset += 4
+    offset_end = offset + length
+    value = []
+    while offset < offset_end:
+        v, offset = decode_value(encoded, offset)
+        value.append(v)
+    return value, offset
 
-    # Short Unsigned Int
-    elif kind == 'u':
-        value = struct.unpack_from('>H', encoded, offset)[0]
-        offset += 2
 
-    # Long Int
-    elif kind == 'I':
-        value = struct.unpack_from('>i', encoded, offset)[0]
-        offset += 4
+def _decode_timestamp(encoded, offset):
+    return (datetime.utcfromtimestamp(
+        _UNSIGNED_LONG_LONG.unpack_from(encoded, offset)[0]), offset + 8)
 
-    # Long Unsigned Int
-    elif kind == 'i':
-        value = struct.unpack_from('>I', encoded, offset)[0]
-        offset += 4
 
-    # Long-Long Int
-    elif kind == 'L':
-        value = long(struct.unpack_from('>q', encoded, offset)[0])
-        offset += 8
+def _decode_void(encoded, offset):
+    return None, offset
 
-    # Long-Long Unsigned Int
-    elif kind == 'l':
-        value = long(struct.unpack_from('>Q', encoded, offset)[0])
-        offset += 8
 
+# The value decoders by type code
+_DECODERS = {
+    # Bool
+    't': _fixed_decoder(_OCTET, 1, bool),
+    # Short-Short Int
+    'b': _fixed_decoder(_OCTET, 1),
+    # Short-Short Unsigned Int
+    'B': _fixed_decoder(_SIGNED_OCTET, 1),
+    # Short Int
+    'U': _fixed_decoder(_SHORT, 2),
+    # Short Unsigned Int
+    'u': _fixed_decoder(_UNSIGNED_SHORT, 2),
+    # Long Int
+    'I': _fixed_decoder(_LONG, 4),
+    # Long Unsigned Int
+    'i': _fixed_decoder(_UNSIGNED_LONG, 4),
+    # Long-Long Int
+    'L': _fixed_decoder(_LONG_LONG, 8, long),
+    # Long-Long Unsigned Int
+    'l': _fixed_decoder(_UNSIGNED_LONG_LONG, 8, long),
     # Float
-    elif kind == 'f':
-        value = long(struct.unpack_from('>f', encoded, offset)[0])
-        offset += 4
-
+    'f': _fixed_decoder(_FLOAT, 4, long),
     # Double
-    elif kind == 'd':
-        value = long(struct.unpack_from('>d', encoded, offset)[0])
-        offset += 8
-
+    'd': _fixed_decoder(_DOUBLE, 8, long),
     # Decimal
-    elif kind == 'D':
-        decimals = struct.unpack_from('B', encoded, offset)[0]
-        offset += 1
-        raw = struct.unpack_from('>i', encoded, offset)[0]
-        offset += 4
-        value = decimal.Decimal(raw) * (decimal.Decimal(10) ** -decimals)
-
+    'D': _decode_decimal,
     # Short String
-    elif kind == 's':
-        length = struct.unpack_from('B', encoded, offset)[0]
-        offset += 1
-        value = encoded[offset: offset + length].decode('utf8')
-        offset += length
-
+    's': _decode_short_string,
     # Long String
-    elif kind == 'S':
-        length = struct.unpack_from('>I', encoded, offset)[0]
-        offset += 4
-        value = encoded[offset: offset + length].decode('utf8')
-        offset += length
-
+    'S': _decode_long_string,
     # Field Array
-    elif kind == 'A':
-        length = struct.unpack_from('>I', encoded, offset)[0]
-        offset += 4
-        offset_end = offset + length
-        value = []
-        while offset < offset_end:
-            v, offset = decode_value(encoded, offset)
-            value.append(v)
-
+    'A': _decode_array,
     # Timestamp
-    elif kind == 'T':
-        value = datetime.utcfromtimestamp(struct.unpack_from('>Q', encoded,
-                                                             offset)[0])
-        offset += 8
-
+    'T': _decode_timestamp,
     # Field Table
-    elif kind == 'F':
-        (value, offset) = decode_table(encoded, offset)
-
+    'F': decode_table,
     # Null / Void
-    elif kind == 'V':
-        value = None
-    else:
-        raise exceptions.InvalidFieldTypeException(kind)
-
-    return value, offset
+    'V': _decode_void}
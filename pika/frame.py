@@ -1,13 +1,31 @@
 """Frame objects that do the frame demarshaling and marshaling."""
 import logging
+import mmap
+import os
 import struct
 
 from pika import amqp_object
 from pika import exceptions
+from pika import properties
 from pika import spec
 
 LOGGER = logging.getLogger(__name__)
 
+# Precompiled structs for the frame header and end marker, and for the fixed
+# width prefixes of method and content header frame payloads
+_FRAME_HEADER = struct.Struct('>BHI')
+_FRAME_END = struct.Struct('B')
+_METHOD_ID = struct.Struct('>I')
+_CONTENT_HEADER = struct.Struct('>HHQ')
+_CONTENT_HEADER_PREFIX = struct.Struct('>HxxQ')
+_PROTOCOL_VERSION = struct.Struct('BBB')
+
+# The frame end marker as it is written to the wire
+_FRAME_END_MARKER = chr(spec.FRAME_END)
+
+# The first byte of a protocol header frame
+_PROTOCOL_HEADER_START = ord('A')
+
 
 class Frame(amqp_object.AMQPObject):
     """Base Frame object mapping. Defines a behavior for all child classes for
@@ -33,11 +51,11 @@ class Frame(amqp_object.AMQPObject):
         :rtype: str
 
         """
-        payload = ''.join(pieces)
-        return struct.pack('>BHI',
-                           self.frame_type,
-                           self.channel_number,
-                           len(payload)) + payload + chr(spec.FRAME_END)
+        pieces.insert(0, _FRAME_HEADER.pack(self.frame_type,
+                                            self.channel_number,
+                                            sum(map(len, pieces))))
+        pieces.append(_FRAME_END_MARKER)
+        return ''.join(pieces)
 
     def marshal(self):
         """To be ended by child classes
@@ -72,7 +90,7 @@ class Method(Frame):
 
         """
         pieces = self.method.encode()
-        pieces.insert(0, struct.pack('>I', self.method.INDEX))
+        pieces.insert(0, _METHOD_ID.pack(self.method.INDEX))
         return self._marshal(pieces)
 
 
@@ -102,9 +120,8 @@ class Header(Frame):
 
         """
         pieces = self.properties.encode()
-        pieces.insert(0, struct.pack('>HxxQ',
-                                     self.properties.INDEX,
-                                     self.body_size))
+        pieces.insert(0, _CONTENT_HEADER_PREFIX.pack(self.properties.INDEX,
+                                                     self.body_size))
         return self._marshal(pieces)
 
 
@@ -189,49 +206,61 @@ class ProtocolHeader(amqp_object.AMQPObject):
                                     self.revision)
 
 
-def decode_frame(data_in):
+def decode_frame(data_in, offset=0, end=None):
     """Receives raw socket data and attempts to turn it into a frame.
-    Returns bytes used to make the frame and the frame
-
-    :param str data_in: The raw data stream
+    Returns bytes used to make the frame and the frame. The data is read in
+    place starting at offset, so callers can walk a buffer without slicing
+    off the bytes that were already consumed. If end is set, the bytes from
+    end on are not part of the data, which lets callers decode from a buffer
+    that has room to receive more data.
+
+    :param str|bytearray data_in: The raw data stream
+    :param int offset: The position in data_in to start decoding at
+    :param int end: The position in data_in the data ends at
     :rtype: tuple(bytes consumed, frame)
     :raises: pika.exceptions.InvalidFrameError
 
     """
-    # Look to see if it's a protocol header frame
-    try:
-        if data_in[0:4] == 'AMQP':
-            major, minor, revision = struct.unpack_from('BBB', data_in, 5)
-            return 8, ProtocolHeader(major, minor, revision)
-    except (IndexError, struct.error):
-        return 0, None
+    if end is None:
+        end = len(data_in)
 
     # Get the Frame Type, Channel Number and Frame Size
-    try:
-        (frame_type,
-         channel_number,
-         frame_size) = struct.unpack('>BHL', data_in[0:7])
-    except struct.error:
+    if offset + spec.FRAME_HEADER_SIZE > end:
         return 0, None
+    (frame_type,
+     channel_number,
+     frame_size) = _FRAME_HEADER.unpack_from(data_in, offset)
+
+    # Look to see if it's a protocol header frame, only slicing the buffer
+    # when the first byte could be the start of one
+    if frame_type == _PROTOCOL_HEADER_START:
+        if data_in[offset:offset + 4] == 'AMQP':
+            if offset + 8 > end:
+                return 0, None
+            major, minor, revision = _PROTOCOL_VERSION.unpack_from(
+                data_in, offset + 5)
+            return 8, ProtocolHeader(major, minor, revision)
 
     # Get the frame data
     frame_end = spec.FRAME_HEADER_SIZE + frame_size + spec.FRAME_END_SIZE
 
     # We don't have all of the frame yet
-    if frame_end > len(data_in):
+    if offset + frame_end > end:
         return 0, None
 
     # The Frame termination chr is wrong
-    if data_in[frame_end - 1] != chr(spec.FRAME_END):
+    if _FRAME_END.unpack_from(data_in,
+                              offset + frame_end - 1)[0] != spec.FRAME_END:
         raise exceptions.InvalidFrameError("Invalid FRAME_END marker")
 
-    # Get the raw frame data
-    frame_data = data_in[spec.FRAME_HEADER_SIZE:frame_end - 1]
+    # Copy the raw frame data out of the buffer in a single pass
+    frame_data = memoryview(data_in)[offset + spec.FRAME_HEADER_SIZE:
+                                     offset + frame_end - 1].tobytes()
 
     if frame_type == spec.FRAME_METHOD:
 
         # Get the Method ID from the frame data
-        method_id = struct.unpack_from('>I', frame_data)[0]
+        method_id = _METHOD_ID.unpack_from(frame_data)[0]
 
         # Get a Method object for this method_id
         method = spec.methods[method_id]()
@@ -245,16 +274,16 @@ def decode_frame(data_in):
     elif frame_type == spec.FRAME_HEADER:
 
         # Return the header class and body size
-        class_id, weight, body_size = struct.unpack_from('>HHQ', frame_data)
+        class_id, weight, body_size = _CONTENT_HEADER.unpack_from(frame_data)
 
-        # Get the Properties type
-        properties = spec.props[class_id]()
+        # Get the Properties type, Basic properties are decoded on demand
+        props = properties.props[class_id]()
 
         # Decode the properties
-        out = properties.decode(frame_data[12:])
+        props.decode(frame_data, 12)
 
         # Return a Header frame
-        return frame_end, Header(channel_number, body_size, properties)
+        return frame_end, Header(channel_number, body_size, props)
 
     elif frame_type == spec.FRAME_BODY:
 
@@ -267,3 +296,226 @@ def decode_frame(data_in):
         return frame_end, Heartbeat()
 
     raise exceptions.InvalidFrameError("Unknown frame type: %i" % frame_type)
+
+
+def decode_frames(data_in, offset=0, end=None):
+    """Decode all of the complete frames in data_in starting at offset in a
+    single pass. Returns the list of frames, the offset of the first byte
+    that was not consumed, which is the start of a trailing partial frame or
+    the end of the data, and the InvalidFrameError raised by the frame at
+    that offset or None. The error is returned rather than raised so that the
+    frames decoded before an invalid frame can still be processed.
+
+    :param str|bytearray data_in: The raw data stream
+    :param int offset: The position in data_in to start decoding at
+    :param int end: The position in data_in the data ends at
+    :rtype: tuple(list, int, pika.exceptions.InvalidFrameError|None)
+
+    """
+    frames = list()
+    if end is None:
+        end = len(data_in)
+    try:
+        while offset < end:
+            consumed, frame_value = decode_frame(data_in, offset, end)
+            if not frame_value:
+                break
+            frames.append(frame_value)
+            offset += consumed
+    except exceptions.InvalidFrameError as error:
+        return frames, offset, error
+    return frames, offset, None
+
+
+def marshal_message(channel_number, method, properties, body,
+                    body_max_length):
+    """Marshal the method, content header and body frames of a message into a
+    single buffer. The body is split into body frames of at most
+    body_max_length bytes that are copied into the buffer straight from the
+    body, without slicing it into intermediate strings. A body that is a list
+    or tuple of buffers is sent as their concatenation, and its body frames
+    are cut across the boundaries of the buffers without joining them first.
+    The body frames of a BodyFrames body are left out, to be marshaled as
+    they are written.
+
+    :param int channel_number: The channel number for the frames
+    :param pika.amqp_object.Method method: The content method to send
+    :param pika.spec.BasicProperties properties: The message properties
+    :param str|list|tuple|BodyFrames body: The message body
+    :param int body_max_length: The maximum size of a body frame payload
+    :rtype: tuple(bytearray, int)
+
+    """
+    marshaled = bytearray(Method(channel_number, method).marshal())
+    if isinstance(body, BodyFrames):
+        marshaled += Header(channel_number, body.body_size,
+                            properties).marshal()
+        return marshaled, 2
+    if isinstance(body, (list, tuple)):
+        body_size = sum(map(len, body))
+        marshaled += Header(channel_number, body_size, properties).marshal()
+        return marshaled, 2 + _marshal_body_parts(marshaled, channel_number,
+                                                  body, body_size,
+                                                  body_max_length)
+    body_size = len(body)
+    marshaled += Header(channel_number, body_size, properties).marshal()
+    body_view = memoryview(body)
+    frame_count = 2
+    for offset in xrange(0, body_size, body_max_length):
+        fragment = body_view[offset:offset + body_max_length]
+        marshaled += _FRAME_HEADER.pack(spec.FRAME_BODY, channel_number,
+                                        len(fragment))
+        marshaled += fragment
+        marshaled.append(spec.FRAME_END)
+        frame_count += 1
+    return marshaled, frame_count
+
+
+def _marshal_body_parts(marshaled, channel_number, parts, body_size,
+                        body_max_length):
+    """Append the body frames of a body made of several buffers to marshaled,
+    copying each buffer into the frames it spans. Returns the number of body
+    frames.
+
+    :param bytearray marshaled: The message being marshaled
+    :param int channel_number: The channel number for the frames
+    :param list|tuple parts: The buffers the body is made of
+    :param int body_size: The total size of the buffers
+    :param int body_max_length: The maximum size of a body frame payload
+    :rtype: int
+
+    """
+    if not body_size:
+        return 0
+    if body_size <= body_max_length:
+        marshaled += _FRAME_HEADER.pack(spec.FRAME_BODY, channel_number,
+                                        body_size)
+        for part in parts:
+            marshaled += part
+        marshaled.append(spec.FRAME_END)
+        return 1
+    frame_count = 0
+    frame_left = 0
+    body_left = body_size
+    for part in parts:
+        part_view = memoryview(part)
+        part_size = len(part_view)
+        offset = 0
+        while offset < part_size:
+            if not frame_left:
+                if frame_count:
+                    marshaled.append(spec.FRAME_END)
+                frame_left = min(body_left, body_max_length)
+                body_left -= frame_left
+                marshaled += _FRAME_HEADER.pack(spec.FRAME_BODY,
+                                                channel_number, frame_left)
+                frame_count += 1
+            length = min(frame_left, part_size - offset)
+            marshaled += part_view[offset:offset + length]
+            offset += length
+            frame_left -= length
+    if frame_count:
+        marshaled.append(spec.FRAME_END)
+    return frame_count
+
+
+class BodyFrames(object):
+    """The body frames of a message whose body is read from a file object or
+    an mmap, from its current position to its end. The frames are marshaled
+    one at a time as the outbound buffer is written, so only a few of them
+    are in memory at once however large the body is. The body is copied
+    straight into each frame, with readinto for files that support it.
+
+    The body is referenced until all of its frames have been marshaled, and
+    must not be closed or changed before then.
+
+    """
+    FRAME_OVERHEAD = spec.FRAME_HEADER_SIZE + spec.FRAME_END_SIZE
+
+    def __init__(self, channel_number, body, body_max_length):
+        """Create the body frames for the body.
+
+        :param int channel_number: The channel number for the frames
+        :param file|mmap.mmap body: The seekable message body
+        :param int body_max_length: The maximum size of a body frame payload
+
+        """
+        self.channel_number = channel_number
+        self.body_max_length = body_max_length
+        self._body = body
+        self._position = body.tell()
+        body.seek(0, os.SEEK_END)
+        self.body_size = body.tell() - self._position
+        body.seek(self._position)
+        self.frame_count = self._frames(self.body_size)
+        self._remaining = self.body_size
+
+    def __len__(self):
+        """Return the size of the frames that are left to marshal.
+
+        :rtype: int
+
+        """
+        return (self._remaining +
+                self._frames(self._remaining) * self.FRAME_OVERHEAD)
+
+    @property
+    def next_frame_size(self):
+        """The size of the next frame to marshal.
+
+        :rtype: int
+
+        """
+        return (min(self._remaining, self.body_max_length) +
+                self.FRAME_OVERHEAD)
+
+    def marshal_next(self):
+        """Marshal the next body frame, reading its payload from the body.
+
+        :rtype: bytearray
+        :raises: IOError
+
+        """
+        length = min(self._remaining, self.body_max_length)
+        marshaled = bytearray(length + self.FRAME_OVERHEAD)
+        _FRAME_HEADER.pack_into(marshaled, 0, spec.FRAME_BODY,
+                                self.channel_number, length)
+        marshaled[-1] = spec.FRAME_END
+        self._read_into(memoryview(marshaled)[spec.FRAME_HEADER_SIZE:-1])
+        self._remaining -= length
+        if not self._remaining:
+            self._body = None
+        return marshaled
+
+    def _frames(self, size):
+        """Return the number of body frames it takes to send size bytes.
+
+        :param int size: The number of body bytes
+        :rtype: int
+
+        """
+        return (size + self.body_max_length - 1) // self.body_max_length
+
+    def _read_into(self, view):
+        """Fill the view with the next bytes of the body.
+
+        :param memoryview view: The payload of the frame being marshaled
+        :raises: IOError
+
+        """
+        if isinstance(self._body, mmap.mmap):
+            view[:] = buffer(self._body, self._position, len(view))
+            self._position += len(view)
+            return
+        readinto = getattr(self._body, 'readinto', None)
+        while view:
+            if readinto is not None:
+                count = readinto(view)
+            else:
+                value = self._body.read(len(view))
+                count = len(value)
+                view[:count] = value
+            if not count:
+                raise IOError('The message body ended before its %i bytes '
+                              'were read' % self.body_size)
+            view = view[count:]
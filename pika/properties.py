@@ -0,0 +1,372 @@
+"""BasicProperties variants that are decoded on demand or encoded once"""
+import struct
+
+from pika import amqp_object
+from pika import data
+from pika import spec
+
+# Precompiled structs for the fixed width property values
+_OCTET = struct.Struct('>B')
+_UNSIGNED_SHORT = struct.Struct('>H')
+_UNSIGNED_LONG = struct.Struct('>I')
+_UNSIGNED_LONG_LONG = struct.Struct('>Q')
+
+# Property domains
+_SHORTSTR = 0
+_OCTET_VALUE = 1
+_TIMESTAMP = 2
+_TABLE = 3
+
+# The Basic properties in the order they are encoded with their presence flag
+# and domain
+_BASIC_FIELDS = (
+    ('content_type', spec.BasicProperties.FLAG_CONTENT_TYPE, _SHORTSTR),
+    ('content_encoding', spec.BasicProperties.FLAG_CONTENT_ENCODING,
+     _SHORTSTR),
+    ('headers', spec.BasicProperties.FLAG_HEADERS, _TABLE),
+    ('delivery_mode', spec.BasicProperties.FLAG_DELIVERY_MODE, _OCTET_VALUE),
+    ('priority', spec.BasicProperties.FLAG_PRIORITY, _OCTET_VALUE),
+    ('correlation_id', spec.BasicProperties.FLAG_CORRELATION_ID, _SHORTSTR),
+    ('reply_to', spec.BasicProperties.FLAG_REPLY_TO, _SHORTSTR),
+    ('expiration', spec.BasicProperties.FLAG_EXPIRATION, _SHORTSTR),
+    ('message_id', spec.BasicProperties.FLAG_MESSAGE_ID, _SHORTSTR),
+    ('timestamp', spec.BasicProperties.FLAG_TIMESTAMP, _TIMESTAMP),
+    ('type', spec.BasicProperties.FLAG_TYPE, _SHORTSTR),
+    ('user_id', spec.BasicProperties.FLAG_USER_ID, _SHORTSTR),
+    ('app_id', spec.BasicProperties.FLAG_APP_ID, _SHORTSTR),
+    ('cluster_id', spec.BasicProperties.FLAG_CLUSTER_ID, _SHORTSTR))
+
+_BASIC_FIELD_DOMAINS = dict([(name, domain)
+                             for name, flag, domain in _BASIC_FIELDS])
+
+# The values of the Basic properties that are not set
+_BASIC_UNSET = dict([(name, None) for name, flag, domain in _BASIC_FIELDS])
+
+# Returns the instance dict of properties, bypassing the __dict__ properties
+# below that fill it in first
+_instance_dict = vars(amqp_object.AMQPObject)['__dict__'].__get__
+
+
+class LazyBasicProperties(spec.BasicProperties):
+    """BasicProperties that keep the encoded content header payload when they
+    are decoded, and only decode it when a property is read. The first read
+    decodes the short string and numeric properties in a single pass, while
+    the headers table is only decoded when the headers are read. Consumers
+    that never look at the properties do not pay for decoding them at all.
+
+    Decoded and assigned values behave exactly like the attributes of
+    pika.spec.BasicProperties. Reading __dict__, which vars(), repr() and
+    pickling do, decodes all of the properties.
+
+    """
+    __slots__ = ('_encoded', '_offset', '_decoded', '_headers_offset')
+
+    def __init__(self, *args, **kwargs):
+        """Create a new instance. When no properties are passed in, they are
+        left unset so that they can be decoded on demand.
+
+        """
+        self._encoded = None
+        self._offset = 0
+        self._decoded = False
+        self._headers_offset = None
+        if args or kwargs:
+            spec.BasicProperties.__init__(self, *args, **kwargs)
+
+    def __getattr__(self, name):
+        """Decode the properties the first time one of them is read. Only
+        called for attributes that are not set.
+
+        :param str name: The attribute name
+        :raises: AttributeError
+
+        """
+        if name not in _BASIC_FIELD_DOMAINS:
+            raise AttributeError(name)
+        if not self._decoded:
+            self._decode_properties()
+        values = _instance_dict(self)
+        if name not in values:
+            if name != 'headers' or self._headers_offset is None:
+                raise AttributeError(name)
+            self._decode_headers()
+        return values[name]
+
+    @property
+    def __dict__(self):
+        """The properties, all of them decoded.
+
+        :rtype: dict
+
+        """
+        if not self._decoded:
+            self._decode_properties()
+        if self._headers_offset is not None:
+            self._decode_headers()
+        return _instance_dict(self)
+
+    def __getstate__(self):
+        """Return the decoded properties to pickle.
+
+        :rtype: dict
+
+        """
+        return dict(self.__dict__)
+
+    def __setstate__(self, state):
+        """Restore the properties from their pickled state.
+
+        :param dict state: The decoded properties
+
+        """
+        self._encoded = None
+        self._offset = 0
+        self._decoded = True
+        self._headers_offset = None
+        _instance_dict(self).update(state)
+
+    def decode(self, encoded, offset=0):
+        """Keep the encoded properties to decode them when they are read.
+
+        :param str encoded: The encoded content header payload
+        :param int offset: The position of the property flags in encoded
+        :rtype: LazyBasicProperties
+
+        """
+        values = _instance_dict(self)
+        if values:
+            for name, flag, domain in _BASIC_FIELDS:
+                values.pop(name, None)
+        self._encoded = encoded
+        self._offset = offset
+        self._decoded = False
+        self._headers_offset = None
+        return self
+
+    def _decode_properties(self):
+        """Decode all of the properties except for the headers table, which
+        is skipped over and its offset kept. Properties that were assigned
+        before they were decoded keep their assigned value.
+
+        """
+        self._decoded = True
+        values = _instance_dict(self)
+        assigned = dict(values)
+        values.update(_BASIC_UNSET)
+        encoded = self._encoded
+        if encoded is not None:
+            offset = self._offset
+            flags = 0
+            flagword_index = 0
+            while True:
+                partial_flags = _UNSIGNED_SHORT.unpack_from(encoded,
+                                                            offset)[0]
+                offset += 2
+                flags = flags | (partial_flags << (flagword_index * 16))
+                if not (partial_flags & 1):
+                    break
+                flagword_index += 1
+            for name, flag, domain in _BASIC_FIELDS:
+                if not flags & flag:
+                    continue
+                if domain == _SHORTSTR:
+                    length = _OCTET.unpack_from(encoded, offset)[0]
+                    offset += 1
+                    values[name] = encoded[offset:offset + length]
+                    offset += length
+                elif domain == _OCTET_VALUE:
+                    values[name] = _OCTET.unpack_from(encoded, offset)[0]
+                    offset += 1
+                elif domain == _TIMESTAMP:
+                    values[name] = _UNSIGNED_LONG_LONG.unpack_from(encoded,
+                                                                   offset)[0]
+                    offset += 8
+                else:
+                    del values[name]
+                    self._headers_offset = offset
+                    offset += 4 + _UNSIGNED_LONG.unpack_from(encoded,
+                                                             offset)[0]
+        if assigned:
+            if 'headers' in assigned:
+                self._headers_offset = None
+            values.update(assigned)
+
+    def _decode_headers(self):
+        """Decode the headers table that was skipped over when the other
+        properties were decoded.
+
+        """
+        _instance_dict(self)['headers'] = data.decode_table(
+            self._encoded, self._headers_offset)[0]
+        self._headers_offset = None
+
+
+# The properties classes used to decode content headers by class id
+props = dict(spec.props)
+props[LazyBasicProperties.INDEX] = LazyBasicProperties
+
+
+class FrozenBasicProperties(spec.BasicProperties):
+    """Immutable BasicProperties that are encoded once when they are created.
+    Publishers that send many messages with the same properties can create
+    them once and pass them to every Channel.basic_publish call, so only the
+    body size is encoded for each message. Assigning or deleting a property
+    raises an AttributeError. The headers table is copied, and the copy must
+    not be changed.
+
+    """
+    __slots__ = ('_encoded',)
+
+    def __init__(self, *args, **kwargs):
+        """Create the properties, taking the same arguments as
+        pika.spec.BasicProperties.
+
+        """
+        spec.BasicProperties.__init__(self, *args, **kwargs)
+        if self.headers is not None:
+            self.__dict__['headers'] = dict(self.headers)
+        self._encoded = ''.join(spec.BasicProperties.encode(self))
+
+    def __setattr__(self, name, value):
+        if hasattr(self, '_encoded'):
+            raise AttributeError('%s are immutable' % self.NAME)
+        spec.BasicProperties.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError('%s are immutable' % self.NAME)
+
+    def __getstate__(self):
+        """Return the properties to pickle.
+
+        :rtype: dict
+
+        """
+        return dict(self.__dict__)
+
+    def __setstate__(self, state):
+        """Restore the properties from their pickled state, encoding them
+        again.
+
+        :param dict state: The properties
+
+        """
+        _instance_dict(self).update(state)
+        self._encoded = ''.join(spec.BasicProperties.encode(self))
+
+    def encode(self):
+        """Return the encoded properties.
+
+        :rtype: list
+
+        """
+        return [self._encoded]
+
+
+class BasicPropertiesTemplate(object):
+    """Pre-encoded BasicProperties for publishers that send messages with a
+    headers table where most of the entries are the same for every message.
+    The constant properties and header entries are encoded once when the
+    template is created. Each call to render only encodes the variable header
+    entries, patching them into the table along with its length:
+
+        template = pika.BasicPropertiesTemplate(
+            content_type='application/json',
+            headers={'service': 'billing', 'schema-version': 3})
+        channel.basic_publish('exchange', 'routing.key', body,
+                              template.render({'trace-id': trace_id}))
+
+    The variable entries may not use the keys of the constant entries.
+
+    """
+    def __init__(self, *args, **kwargs):
+        """Create the template, taking the same arguments as
+        pika.spec.BasicProperties. The headers are the constant entries of
+        the headers table.
+
+        """
+        values = spec.BasicProperties(*args, **kwargs)
+        if values.headers is None:
+            values.headers = dict()
+        self.properties = FrozenBasicProperties(**values.__dict__)
+        self._keys = frozenset(self.properties.headers)
+
+        # Split the encoded properties around the headers table entries
+        encoded = self.properties._encoded
+        offset = 2
+        for name in ('content_type', 'content_encoding'):
+            value = getattr(self.properties, name)
+            if value is not None:
+                offset += 1 + _OCTET.unpack_from(encoded, offset)[0]
+        size = _UNSIGNED_LONG.unpack_from(encoded, offset)[0]
+        self._prefix = encoded[:offset]
+        self._entries = encoded[offset + 4:offset + 4 + size]
+        self._suffix = encoded[offset + 4 + size:]
+
+    def render(self, headers=None):
+        """Return the properties with the variable header entries added to
+        the constant ones. The variable entries are copied, so changing the
+        dict afterwards does not change the properties.
+
+        :param dict headers: The variable header entries
+        :rtype: TemplateBasicProperties
+        :raises: ValueError
+
+        """
+        headers = headers or dict()
+        if not self._keys.isdisjoint(headers):
+            raise ValueError('Header entries %r are constant in the template' %
+                             sorted(self._keys.intersection(headers)))
+        pieces = [self._prefix, None, self._entries]
+        size = len(self._entries) + data.encode_table(pieces, headers) - 4
+        pieces[1] = _UNSIGNED_LONG.pack(size)
+        del pieces[3]
+        pieces.append(self._suffix)
+        return TemplateBasicProperties(self, dict(headers), ''.join(pieces))
+
+
+class TemplateBasicProperties(FrozenBasicProperties):
+    """Immutable BasicProperties rendered from a BasicPropertiesTemplate. The
+    properties are only read from the template and merged with the variable
+    header entries when they are accessed, which includes reading __dict__.
+
+    """
+    __slots__ = ('_template', '_headers')
+
+    def __init__(self, template, headers, encoded):
+        """Create the properties.
+
+        :param BasicPropertiesTemplate template: The rendered template
+        :param dict headers: The variable header entries
+        :param str encoded: The encoded properties
+
+        """
+        self._template = template
+        self._headers = headers
+        self._encoded = encoded
+
+    def __getattr__(self, name):
+        """Read the properties from the template the first time one of them
+        is read. Only called for attributes that are not set.
+
+        :param str name: The attribute name
+        :raises: AttributeError
+
+        """
+        if name not in _BASIC_FIELD_DOMAINS:
+            raise AttributeError(name)
+        return self.__dict__[name]
+
+    @property
+    def __dict__(self):
+        """The properties, read from the template.
+
+        :rtype: dict
+
+        """
+        values = _instance_dict(self)
+        if not values:
+            values.update(self._template.properties.__dict__)
+            headers = dict(values['headers'])
+            headers.update(self._headers)
+            values['headers'] = headers
+        return values
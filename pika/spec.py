@@ -43,6 +43,19 @@ RESOURCE_LOCKED = 405
 SYNTAX_ERROR = 502
 UNEXPECTED_FRAME = 505
 
+_STRUCT_B = struct.Struct('>B')
+_STRUCT_BB = struct.Struct('>BB')
+_STRUCT_H = struct.Struct('>H')
+_STRUCT_HB = struct.Struct('>HB')
+_STRUCT_HH = struct.Struct('>HH')
+_STRUCT_HIH = struct.Struct('>HIH')
+_STRUCT_I = struct.Struct('>I')
+_STRUCT_IHB = struct.Struct('>IHB')
+_STRUCT_II = struct.Struct('>II')
+_STRUCT_Q = struct.Struct('>Q')
+_STRUCT_QB = struct.Struct('>QB')
+_STRUCT_QBB = struct.Struct('>QBB')
+
 
 class Connection(amqp_object.Class):
 
@@ -66,12 +79,10 @@ class Connection(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.version_major = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
-            self.version_minor = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.version_major, self.version_minor) = _STRUCT_BB.unpack_from(encoded, offset)
+            offset += 2
             (self.server_properties, offset) = data.decode_table(encoded, offset)
-            length = struct.unpack_from('>I', encoded, offset)[0]
+            length = _STRUCT_I.unpack_from(encoded, offset)[0]
             offset += 4
             self.mechanisms = encoded[offset:offset + length]
             try:
@@ -79,7 +90,7 @@ class Connection(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('>I', encoded, offset)[0]
+            length = _STRUCT_I.unpack_from(encoded, offset)[0]
             offset += 4
             self.locales = encoded[offset:offset + length]
             try:
@@ -91,18 +102,17 @@ class Connection(amqp_object.Class):
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('B', self.version_major))
-            pieces.append(struct.pack('B', self.version_minor))
+            pieces.append(_STRUCT_BB.pack(self.version_major, self.version_minor))
             data.encode_table(pieces, self.server_properties)
             assert isinstance(self.mechanisms, basestring),\
                    'A non-bytestring value was supplied for self.mechanisms'
             value = self.mechanisms.encode('utf-8') if isinstance(self.mechanisms, unicode) else self.mechanisms
-            pieces.append(struct.pack('>I', len(value)))
+            pieces.append(_STRUCT_I.pack(len(value)))
             pieces.append(value)
             assert isinstance(self.locales, basestring),\
                    'A non-bytestring value was supplied for self.locales'
             value = self.locales.encode('utf-8') if isinstance(self.locales, unicode) else self.locales
-            pieces.append(struct.pack('>I', len(value)))
+            pieces.append(_STRUCT_I.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -123,7 +133,7 @@ class Connection(amqp_object.Class):
 
         def decode(self, encoded, offset=0):
             (self.client_properties, offset) = data.decode_table(encoded, offset)
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.mechanism = encoded[offset:offset + length]
             try:
@@ -131,7 +141,7 @@ class Connection(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('>I', encoded, offset)[0]
+            length = _STRUCT_I.unpack_from(encoded, offset)[0]
             offset += 4
             self.response = encoded[offset:offset + length]
             try:
@@ -139,7 +149,7 @@ class Connection(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.locale = encoded[offset:offset + length]
             try:
@@ -155,17 +165,17 @@ class Connection(amqp_object.Class):
             assert isinstance(self.mechanism, basestring),\
                    'A non-bytestring value was supplied for self.mechanism'
             value = self.mechanism.encode('utf-8') if isinstance(self.mechanism, unicode) else self.mechanism
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             assert isinstance(self.response, basestring),\
                    'A non-bytestring value was supplied for self.response'
             value = self.response.encode('utf-8') if isinstance(self.response, unicode) else self.response
-            pieces.append(struct.pack('>I', len(value)))
+            pieces.append(_STRUCT_I.pack(len(value)))
             pieces.append(value)
             assert isinstance(self.locale, basestring),\
                    'A non-bytestring value was supplied for self.locale'
             value = self.locale.encode('utf-8') if isinstance(self.locale, unicode) else self.locale
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -182,7 +192,7 @@ class Connection(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('>I', encoded, offset)[0]
+            length = _STRUCT_I.unpack_from(encoded, offset)[0]
             offset += 4
             self.challenge = encoded[offset:offset + length]
             try:
@@ -197,7 +207,7 @@ class Connection(amqp_object.Class):
             assert isinstance(self.challenge, basestring),\
                    'A non-bytestring value was supplied for self.challenge'
             value = self.challenge.encode('utf-8') if isinstance(self.challenge, unicode) else self.challenge
-            pieces.append(struct.pack('>I', len(value)))
+            pieces.append(_STRUCT_I.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -214,7 +224,7 @@ class Connection(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('>I', encoded, offset)[0]
+            length = _STRUCT_I.unpack_from(encoded, offset)[0]
             offset += 4
             self.response = encoded[offset:offset + length]
             try:
@@ -229,7 +239,7 @@ class Connection(amqp_object.Class):
             assert isinstance(self.response, basestring),\
                    'A non-bytestring value was supplied for self.response'
             value = self.response.encode('utf-8') if isinstance(self.response, unicode) else self.response
-            pieces.append(struct.pack('>I', len(value)))
+            pieces.append(_STRUCT_I.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -248,19 +258,13 @@ class Connection(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.channel_max = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            self.frame_max = struct.unpack_from('>I', encoded, offset)[0]
-            offset += 4
-            self.heartbeat = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
+            (self.channel_max, self.frame_max, self.heartbeat) = _STRUCT_HIH.unpack_from(encoded, offset)
+            offset += 8
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.channel_max))
-            pieces.append(struct.pack('>I', self.frame_max))
-            pieces.append(struct.pack('>H', self.heartbeat))
+            pieces.append(_STRUCT_HIH.pack(self.channel_max, self.frame_max, self.heartbeat))
             return pieces
 
     class TuneOk(amqp_object.Method):
@@ -278,19 +282,13 @@ class Connection(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            self.channel_max = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            self.frame_max = struct.unpack_from('>I', encoded, offset)[0]
-            offset += 4
-            self.heartbeat = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
+            (self.channel_max, self.frame_max, self.heartbeat) = _STRUCT_HIH.unpack_from(encoded, offset)
+            offset += 8
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.channel_max))
-            pieces.append(struct.pack('>I', self.frame_max))
-            pieces.append(struct.pack('>H', self.heartbeat))
+            pieces.append(_STRUCT_HIH.pack(self.channel_max, self.frame_max, self.heartbeat))
             return pieces
 
     class Open(amqp_object.Method):
@@ -308,7 +306,7 @@ class Connection(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.virtual_host = encoded[offset:offset + length]
             try:
@@ -316,7 +314,7 @@ class Connection(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.capabilities = encoded[offset:offset + length]
             try:
@@ -324,7 +322,7 @@ class Connection(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.insist = (bit_buffer & (1 << 0)) != 0
             return self
@@ -334,17 +332,17 @@ class Connection(amqp_object.Class):
             assert isinstance(self.virtual_host, basestring),\
                    'A non-bytestring value was supplied for self.virtual_host'
             value = self.virtual_host.encode('utf-8') if isinstance(self.virtual_host, unicode) else self.virtual_host
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             assert isinstance(self.capabilities, basestring),\
                    'A non-bytestring value was supplied for self.capabilities'
             value = self.capabilities.encode('utf-8') if isinstance(self.capabilities, unicode) else self.capabilities
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.insist:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class OpenOk(amqp_object.Method):
@@ -360,7 +358,7 @@ class Connection(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.known_hosts = encoded[offset:offset + length]
             try:
@@ -375,7 +373,7 @@ class Connection(amqp_object.Class):
             assert isinstance(self.known_hosts, basestring),\
                    'A non-bytestring value was supplied for self.known_hosts'
             value = self.known_hosts.encode('utf-8') if isinstance(self.known_hosts, unicode) else self.known_hosts
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -395,32 +393,26 @@ class Connection(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.reply_code = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.reply_code, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.reply_text = encoded[offset:offset + length]
             try:
                 self.reply_text = str(self.reply_text)
             except UnicodeEncodeError:
                 pass
             offset += length
-            self.class_id = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            self.method_id = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
+            (self.class_id, self.method_id) = _STRUCT_HH.unpack_from(encoded, offset)
+            offset += 4
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.reply_code))
             assert isinstance(self.reply_text, basestring),\
                    'A non-bytestring value was supplied for self.reply_text'
             value = self.reply_text.encode('utf-8') if isinstance(self.reply_text, unicode) else self.reply_text
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.reply_code, len(value)))
             pieces.append(value)
-            pieces.append(struct.pack('>H', self.class_id))
-            pieces.append(struct.pack('>H', self.method_id))
+            pieces.append(_STRUCT_HH.pack(self.class_id, self.method_id))
             return pieces
 
     class CloseOk(amqp_object.Method):
@@ -455,7 +447,7 @@ class Connection(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.reason = encoded[offset:offset + length]
             try:
@@ -470,7 +462,7 @@ class Connection(amqp_object.Class):
             assert isinstance(self.reason, basestring),\
                    'A non-bytestring value was supplied for self.reason'
             value = self.reason.encode('utf-8') if isinstance(self.reason, unicode) else self.reason
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -512,7 +504,7 @@ class Channel(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.out_of_band = encoded[offset:offset + length]
             try:
@@ -527,7 +519,7 @@ class Channel(amqp_object.Class):
             assert isinstance(self.out_of_band, basestring),\
                    'A non-bytestring value was supplied for self.out_of_band'
             value = self.out_of_band.encode('utf-8') if isinstance(self.out_of_band, unicode) else self.out_of_band
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -544,7 +536,7 @@ class Channel(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('>I', encoded, offset)[0]
+            length = _STRUCT_I.unpack_from(encoded, offset)[0]
             offset += 4
             self.channel_id = encoded[offset:offset + length]
             try:
@@ -559,7 +551,7 @@ class Channel(amqp_object.Class):
             assert isinstance(self.channel_id, basestring),\
                    'A non-bytestring value was supplied for self.channel_id'
             value = self.channel_id.encode('utf-8') if isinstance(self.channel_id, unicode) else self.channel_id
-            pieces.append(struct.pack('>I', len(value)))
+            pieces.append(_STRUCT_I.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -576,7 +568,7 @@ class Channel(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.active = (bit_buffer & (1 << 0)) != 0
             return self
@@ -586,7 +578,7 @@ class Channel(amqp_object.Class):
             bit_buffer = 0
             if self.active:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class FlowOk(amqp_object.Method):
@@ -602,7 +594,7 @@ class Channel(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.active = (bit_buffer & (1 << 0)) != 0
             return self
@@ -612,7 +604,7 @@ class Channel(amqp_object.Class):
             bit_buffer = 0
             if self.active:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class Close(amqp_object.Method):
@@ -631,32 +623,26 @@ class Channel(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.reply_code = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.reply_code, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.reply_text = encoded[offset:offset + length]
             try:
                 self.reply_text = str(self.reply_text)
             except UnicodeEncodeError:
                 pass
             offset += length
-            self.class_id = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            self.method_id = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
+            (self.class_id, self.method_id) = _STRUCT_HH.unpack_from(encoded, offset)
+            offset += 4
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.reply_code))
             assert isinstance(self.reply_text, basestring),\
                    'A non-bytestring value was supplied for self.reply_text'
             value = self.reply_text.encode('utf-8') if isinstance(self.reply_text, unicode) else self.reply_text
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.reply_code, len(value)))
             pieces.append(value)
-            pieces.append(struct.pack('>H', self.class_id))
-            pieces.append(struct.pack('>H', self.method_id))
+            pieces.append(_STRUCT_HH.pack(self.class_id, self.method_id))
             return pieces
 
     class CloseOk(amqp_object.Method):
@@ -702,7 +688,7 @@ class Access(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.realm = encoded[offset:offset + length]
             try:
@@ -710,7 +696,7 @@ class Access(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.exclusive = (bit_buffer & (1 << 0)) != 0
             self.passive = (bit_buffer & (1 << 1)) != 0
@@ -724,7 +710,7 @@ class Access(amqp_object.Class):
             assert isinstance(self.realm, basestring),\
                    'A non-bytestring value was supplied for self.realm'
             value = self.realm.encode('utf-8') if isinstance(self.realm, unicode) else self.realm
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.exclusive:
@@ -737,7 +723,7 @@ class Access(amqp_object.Class):
                 bit_buffer = bit_buffer | (1 << 3)
             if self.read:
                 bit_buffer = bit_buffer | (1 << 4)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class RequestOk(amqp_object.Method):
@@ -753,13 +739,13 @@ class Access(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
+            self.ticket = _STRUCT_H.unpack_from(encoded, offset)[0]
             offset += 2
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
+            pieces.append(_STRUCT_H.pack(self.ticket))
             return pieces
 
 
@@ -789,17 +775,15 @@ class Exchange(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.ticket, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.exchange = encoded[offset:offset + length]
             try:
                 self.exchange = str(self.exchange)
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.type = encoded[offset:offset + length]
             try:
@@ -807,7 +791,7 @@ class Exchange(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.passive = (bit_buffer & (1 << 0)) != 0
             self.durable = (bit_buffer & (1 << 1)) != 0
@@ -819,16 +803,15 @@ class Exchange(amqp_object.Class):
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
             assert isinstance(self.exchange, basestring),\
                    'A non-bytestring value was supplied for self.exchange'
             value = self.exchange.encode('utf-8') if isinstance(self.exchange, unicode) else self.exchange
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.ticket, len(value)))
             pieces.append(value)
             assert isinstance(self.type, basestring),\
                    'A non-bytestring value was supplied for self.type'
             value = self.type.encode('utf-8') if isinstance(self.type, unicode) else self.type
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.passive:
@@ -841,7 +824,7 @@ class Exchange(amqp_object.Class):
                 bit_buffer = bit_buffer | (1 << 3)
             if self.nowait:
                 bit_buffer = bit_buffer | (1 << 4)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             data.encode_table(pieces, self.arguments)
             return pieces
 
@@ -880,17 +863,15 @@ class Exchange(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.ticket, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.exchange = encoded[offset:offset + length]
             try:
                 self.exchange = str(self.exchange)
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.if_unused = (bit_buffer & (1 << 0)) != 0
             self.nowait = (bit_buffer & (1 << 1)) != 0
@@ -898,18 +879,17 @@ class Exchange(amqp_object.Class):
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
             assert isinstance(self.exchange, basestring),\
                    'A non-bytestring value was supplied for self.exchange'
             value = self.exchange.encode('utf-8') if isinstance(self.exchange, unicode) else self.exchange
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.ticket, len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.if_unused:
                 bit_buffer = bit_buffer | (1 << 0)
             if self.nowait:
                 bit_buffer = bit_buffer | (1 << 1)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class DeleteOk(amqp_object.Method):
@@ -949,17 +929,15 @@ class Exchange(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.ticket, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.destination = encoded[offset:offset + length]
             try:
                 self.destination = str(self.destination)
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.source = encoded[offset:offset + length]
             try:
@@ -967,7 +945,7 @@ class Exchange(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.routing_key = encoded[offset:offset + length]
             try:
@@ -975,7 +953,7 @@ class Exchange(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.nowait = (bit_buffer & (1 << 0)) != 0
             (self.arguments, offset) = data.decode_table(encoded, offset)
@@ -983,26 +961,25 @@ class Exchange(amqp_object.Class):
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
             assert isinstance(self.destination, basestring),\
                    'A non-bytestring value was supplied for self.destination'
             value = self.destination.encode('utf-8') if isinstance(self.destination, unicode) else self.destination
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.ticket, len(value)))
             pieces.append(value)
             assert isinstance(self.source, basestring),\
                    'A non-bytestring value was supplied for self.source'
             value = self.source.encode('utf-8') if isinstance(self.source, unicode) else self.source
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             assert isinstance(self.routing_key, basestring),\
                    'A non-bytestring value was supplied for self.routing_key'
             value = self.routing_key.encode('utf-8') if isinstance(self.routing_key, unicode) else self.routing_key
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.nowait:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             data.encode_table(pieces, self.arguments)
             return pieces
 
@@ -1043,17 +1020,15 @@ class Exchange(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.ticket, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.destination = encoded[offset:offset + length]
             try:
                 self.destination = str(self.destination)
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.source = encoded[offset:offset + length]
             try:
@@ -1061,7 +1036,7 @@ class Exchange(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.routing_key = encoded[offset:offset + length]
             try:
@@ -1069,7 +1044,7 @@ class Exchange(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.nowait = (bit_buffer & (1 << 0)) != 0
             (self.arguments, offset) = data.decode_table(encoded, offset)
@@ -1077,26 +1052,25 @@ class Exchange(amqp_object.Class):
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
             assert isinstance(self.destination, basestring),\
                    'A non-bytestring value was supplied for self.destination'
             value = self.destination.encode('utf-8') if isinstance(self.destination, unicode) else self.destination
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.ticket, len(value)))
             pieces.append(value)
             assert isinstance(self.source, basestring),\
                    'A non-bytestring value was supplied for self.source'
             value = self.source.encode('utf-8') if isinstance(self.source, unicode) else self.source
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             assert isinstance(self.routing_key, basestring),\
                    'A non-bytestring value was supplied for self.routing_key'
             value = self.routing_key.encode('utf-8') if isinstance(self.routing_key, unicode) else self.routing_key
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.nowait:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             data.encode_table(pieces, self.arguments)
             return pieces
 
@@ -1145,17 +1119,15 @@ class Queue(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.ticket, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.queue = encoded[offset:offset + length]
             try:
                 self.queue = str(self.queue)
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.passive = (bit_buffer & (1 << 0)) != 0
             self.durable = (bit_buffer & (1 << 1)) != 0
@@ -1167,11 +1139,10 @@ class Queue(amqp_object.Class):
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
             assert isinstance(self.queue, basestring),\
                    'A non-bytestring value was supplied for self.queue'
             value = self.queue.encode('utf-8') if isinstance(self.queue, unicode) else self.queue
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.ticket, len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.passive:
@@ -1184,7 +1155,7 @@ class Queue(amqp_object.Class):
                 bit_buffer = bit_buffer | (1 << 3)
             if self.nowait:
                 bit_buffer = bit_buffer | (1 << 4)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             data.encode_table(pieces, self.arguments)
             return pieces
 
@@ -1203,7 +1174,7 @@ class Queue(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.queue = encoded[offset:offset + length]
             try:
@@ -1211,10 +1182,8 @@ class Queue(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            self.message_count = struct.unpack_from('>I', encoded, offset)[0]
-            offset += 4
-            self.consumer_count = struct.unpack_from('>I', encoded, offset)[0]
-            offset += 4
+            (self.message_count, self.consumer_count) = _STRUCT_II.unpack_from(encoded, offset)
+            offset += 8
             return self
 
         def encode(self):
@@ -1222,10 +1191,9 @@ class Queue(amqp_object.Class):
             assert isinstance(self.queue, basestring),\
                    'A non-bytestring value was supplied for self.queue'
             value = self.queue.encode('utf-8') if isinstance(self.queue, unicode) else self.queue
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
-            pieces.append(struct.pack('>I', self.message_count))
-            pieces.append(struct.pack('>I', self.consumer_count))
+            pieces.append(_STRUCT_II.pack(self.message_count, self.consumer_count))
             return pieces
 
     class Bind(amqp_object.Method):
@@ -1246,17 +1214,15 @@ class Queue(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.ticket, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.queue = encoded[offset:offset + length]
             try:
                 self.queue = str(self.queue)
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.exchange = encoded[offset:offset + length]
             try:
@@ -1264,7 +1230,7 @@ class Queue(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.routing_key = encoded[offset:offset + length]
             try:
@@ -1272,7 +1238,7 @@ class Queue(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.nowait = (bit_buffer & (1 << 0)) != 0
             (self.arguments, offset) = data.decode_table(encoded, offset)
@@ -1280,26 +1246,25 @@ class Queue(amqp_object.Class):
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
             assert isinstance(self.queue, basestring),\
                    'A non-bytestring value was supplied for self.queue'
             value = self.queue.encode('utf-8') if isinstance(self.queue, unicode) else self.queue
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.ticket, len(value)))
             pieces.append(value)
             assert isinstance(self.exchange, basestring),\
                    'A non-bytestring value was supplied for self.exchange'
             value = self.exchange.encode('utf-8') if isinstance(self.exchange, unicode) else self.exchange
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             assert isinstance(self.routing_key, basestring),\
                    'A non-bytestring value was supplied for self.routing_key'
             value = self.routing_key.encode('utf-8') if isinstance(self.routing_key, unicode) else self.routing_key
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.nowait:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             data.encode_table(pieces, self.arguments)
             return pieces
 
@@ -1337,33 +1302,30 @@ class Queue(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.ticket, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.queue = encoded[offset:offset + length]
             try:
                 self.queue = str(self.queue)
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.nowait = (bit_buffer & (1 << 0)) != 0
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
             assert isinstance(self.queue, basestring),\
                    'A non-bytestring value was supplied for self.queue'
             value = self.queue.encode('utf-8') if isinstance(self.queue, unicode) else self.queue
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.ticket, len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.nowait:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class PurgeOk(amqp_object.Method):
@@ -1379,13 +1341,13 @@ class Queue(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            self.message_count = struct.unpack_from('>I', encoded, offset)[0]
+            self.message_count = _STRUCT_I.unpack_from(encoded, offset)[0]
             offset += 4
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>I', self.message_count))
+            pieces.append(_STRUCT_I.pack(self.message_count))
             return pieces
 
     class Delete(amqp_object.Method):
@@ -1405,17 +1367,15 @@ class Queue(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.ticket, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.queue = encoded[offset:offset + length]
             try:
                 self.queue = str(self.queue)
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.if_unused = (bit_buffer & (1 << 0)) != 0
             self.if_empty = (bit_buffer & (1 << 1)) != 0
@@ -1424,11 +1384,10 @@ class Queue(amqp_object.Class):
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
             assert isinstance(self.queue, basestring),\
                    'A non-bytestring value was supplied for self.queue'
             value = self.queue.encode('utf-8') if isinstance(self.queue, unicode) else self.queue
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.ticket, len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.if_unused:
@@ -1437,7 +1396,7 @@ class Queue(amqp_object.Class):
                 bit_buffer = bit_buffer | (1 << 1)
             if self.nowait:
                 bit_buffer = bit_buffer | (1 << 2)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class DeleteOk(amqp_object.Method):
@@ -1453,13 +1412,13 @@ class Queue(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            self.message_count = struct.unpack_from('>I', encoded, offset)[0]
+            self.message_count = _STRUCT_I.unpack_from(encoded, offset)[0]
             offset += 4
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>I', self.message_count))
+            pieces.append(_STRUCT_I.pack(self.message_count))
             return pieces
 
     class Unbind(amqp_object.Method):
@@ -1479,17 +1438,15 @@ class Queue(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.ticket, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.queue = encoded[offset:offset + length]
             try:
                 self.queue = str(self.queue)
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.exchange = encoded[offset:offset + length]
             try:
@@ -1497,7 +1454,7 @@ class Queue(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.routing_key = encoded[offset:offset + length]
             try:
@@ -1510,21 +1467,20 @@ class Queue(amqp_object.Class):
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
             assert isinstance(self.queue, basestring),\
                    'A non-bytestring value was supplied for self.queue'
             value = self.queue.encode('utf-8') if isinstance(self.queue, unicode) else self.queue
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.ticket, len(value)))
             pieces.append(value)
             assert isinstance(self.exchange, basestring),\
                    'A non-bytestring value was supplied for self.exchange'
             value = self.exchange.encode('utf-8') if isinstance(self.exchange, unicode) else self.exchange
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             assert isinstance(self.routing_key, basestring),\
                    'A non-bytestring value was supplied for self.routing_key'
             value = self.routing_key.encode('utf-8') if isinstance(self.routing_key, unicode) else self.routing_key
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             data.encode_table(pieces, self.arguments)
             return pieces
@@ -1569,23 +1525,17 @@ class Basic(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.prefetch_size = struct.unpack_from('>I', encoded, offset)[0]
-            offset += 4
-            self.prefetch_count = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.prefetch_size, self.prefetch_count, bit_buffer) = _STRUCT_IHB.unpack_from(encoded, offset)
+            offset += 7
             self.global_ = (bit_buffer & (1 << 0)) != 0
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>I', self.prefetch_size))
-            pieces.append(struct.pack('>H', self.prefetch_count))
             bit_buffer = 0
             if self.global_:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_IHB.pack(self.prefetch_size, self.prefetch_count, bit_buffer))
             return pieces
 
     class QosOk(amqp_object.Method):
@@ -1627,17 +1577,15 @@ class Basic(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.ticket, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.queue = encoded[offset:offset + length]
             try:
                 self.queue = str(self.queue)
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.consumer_tag = encoded[offset:offset + length]
             try:
@@ -1645,7 +1593,7 @@ class Basic(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.no_local = (bit_buffer & (1 << 0)) != 0
             self.no_ack = (bit_buffer & (1 << 1)) != 0
@@ -1656,16 +1604,15 @@ class Basic(amqp_object.Class):
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
             assert isinstance(self.queue, basestring),\
                    'A non-bytestring value was supplied for self.queue'
             value = self.queue.encode('utf-8') if isinstance(self.queue, unicode) else self.queue
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.ticket, len(value)))
             pieces.append(value)
             assert isinstance(self.consumer_tag, basestring),\
                    'A non-bytestring value was supplied for self.consumer_tag'
             value = self.consumer_tag.encode('utf-8') if isinstance(self.consumer_tag, unicode) else self.consumer_tag
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.no_local:
@@ -1676,7 +1623,7 @@ class Basic(amqp_object.Class):
                 bit_buffer = bit_buffer | (1 << 2)
             if self.nowait:
                 bit_buffer = bit_buffer | (1 << 3)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             data.encode_table(pieces, self.arguments)
             return pieces
 
@@ -1693,7 +1640,7 @@ class Basic(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.consumer_tag = encoded[offset:offset + length]
             try:
@@ -1708,7 +1655,7 @@ class Basic(amqp_object.Class):
             assert isinstance(self.consumer_tag, basestring),\
                    'A non-bytestring value was supplied for self.consumer_tag'
             value = self.consumer_tag.encode('utf-8') if isinstance(self.consumer_tag, unicode) else self.consumer_tag
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -1726,7 +1673,7 @@ class Basic(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.consumer_tag = encoded[offset:offset + length]
             try:
@@ -1734,7 +1681,7 @@ class Basic(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.nowait = (bit_buffer & (1 << 0)) != 0
             return self
@@ -1744,12 +1691,12 @@ class Basic(amqp_object.Class):
             assert isinstance(self.consumer_tag, basestring),\
                    'A non-bytestring value was supplied for self.consumer_tag'
             value = self.consumer_tag.encode('utf-8') if isinstance(self.consumer_tag, unicode) else self.consumer_tag
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.nowait:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class CancelOk(amqp_object.Method):
@@ -1765,7 +1712,7 @@ class Basic(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.consumer_tag = encoded[offset:offset + length]
             try:
@@ -1780,7 +1727,7 @@ class Basic(amqp_object.Class):
             assert isinstance(self.consumer_tag, basestring),\
                    'A non-bytestring value was supplied for self.consumer_tag'
             value = self.consumer_tag.encode('utf-8') if isinstance(self.consumer_tag, unicode) else self.consumer_tag
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -1801,17 +1748,15 @@ class Basic(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.ticket, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.exchange = encoded[offset:offset + length]
             try:
                 self.exchange = str(self.exchange)
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.routing_key = encoded[offset:offset + length]
             try:
@@ -1819,7 +1764,7 @@ class Basic(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.mandatory = (bit_buffer & (1 << 0)) != 0
             self.immediate = (bit_buffer & (1 << 1)) != 0
@@ -1827,23 +1772,22 @@ class Basic(amqp_object.Class):
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
             assert isinstance(self.exchange, basestring),\
                    'A non-bytestring value was supplied for self.exchange'
             value = self.exchange.encode('utf-8') if isinstance(self.exchange, unicode) else self.exchange
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.ticket, len(value)))
             pieces.append(value)
             assert isinstance(self.routing_key, basestring),\
                    'A non-bytestring value was supplied for self.routing_key'
             value = self.routing_key.encode('utf-8') if isinstance(self.routing_key, unicode) else self.routing_key
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.mandatory:
                 bit_buffer = bit_buffer | (1 << 0)
             if self.immediate:
                 bit_buffer = bit_buffer | (1 << 1)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class Return(amqp_object.Method):
@@ -1862,17 +1806,15 @@ class Basic(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            self.reply_code = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.reply_code, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.reply_text = encoded[offset:offset + length]
             try:
                 self.reply_text = str(self.reply_text)
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.exchange = encoded[offset:offset + length]
             try:
@@ -1880,7 +1822,7 @@ class Basic(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.routing_key = encoded[offset:offset + length]
             try:
@@ -1892,21 +1834,20 @@ class Basic(amqp_object.Class):
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.reply_code))
             assert isinstance(self.reply_text, basestring),\
                    'A non-bytestring value was supplied for self.reply_text'
             value = self.reply_text.encode('utf-8') if isinstance(self.reply_text, unicode) else self.reply_text
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.reply_code, len(value)))
             pieces.append(value)
             assert isinstance(self.exchange, basestring),\
                    'A non-bytestring value was supplied for self.exchange'
             value = self.exchange.encode('utf-8') if isinstance(self.exchange, unicode) else self.exchange
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             assert isinstance(self.routing_key, basestring),\
                    'A non-bytestring value was supplied for self.routing_key'
             value = self.routing_key.encode('utf-8') if isinstance(self.routing_key, unicode) else self.routing_key
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -1927,7 +1868,7 @@ class Basic(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.consumer_tag = encoded[offset:offset + length]
             try:
@@ -1935,20 +1876,16 @@ class Basic(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            self.delivery_tag = struct.unpack_from('>Q', encoded, offset)[0]
-            offset += 8
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.delivery_tag, bit_buffer, length) = _STRUCT_QBB.unpack_from(encoded, offset)
+            offset += 10
             self.redelivered = (bit_buffer & (1 << 0)) != 0
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
             self.exchange = encoded[offset:offset + length]
             try:
                 self.exchange = str(self.exchange)
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.routing_key = encoded[offset:offset + length]
             try:
@@ -1963,22 +1900,20 @@ class Basic(amqp_object.Class):
             assert isinstance(self.consumer_tag, basestring),\
                    'A non-bytestring value was supplied for self.consumer_tag'
             value = self.consumer_tag.encode('utf-8') if isinstance(self.consumer_tag, unicode) else self.consumer_tag
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
-            pieces.append(struct.pack('>Q', self.delivery_tag))
             bit_buffer = 0
             if self.redelivered:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
             assert isinstance(self.exchange, basestring),\
                    'A non-bytestring value was supplied for self.exchange'
             value = self.exchange.encode('utf-8') if isinstance(self.exchange, unicode) else self.exchange
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_QBB.pack(self.delivery_tag, bit_buffer, len(value)))
             pieces.append(value)
             assert isinstance(self.routing_key, basestring),\
                    'A non-bytestring value was supplied for self.routing_key'
             value = self.routing_key.encode('utf-8') if isinstance(self.routing_key, unicode) else self.routing_key
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -1997,33 +1932,30 @@ class Basic(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            self.ticket = struct.unpack_from('>H', encoded, offset)[0]
-            offset += 2
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.ticket, length) = _STRUCT_HB.unpack_from(encoded, offset)
+            offset += 3
             self.queue = encoded[offset:offset + length]
             try:
                 self.queue = str(self.queue)
             except UnicodeEncodeError:
                 pass
             offset += length
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.no_ack = (bit_buffer & (1 << 0)) != 0
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>H', self.ticket))
             assert isinstance(self.queue, basestring),\
                    'A non-bytestring value was supplied for self.queue'
             value = self.queue.encode('utf-8') if isinstance(self.queue, unicode) else self.queue
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_HB.pack(self.ticket, len(value)))
             pieces.append(value)
             bit_buffer = 0
             if self.no_ack:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class GetOk(amqp_object.Method):
@@ -2043,20 +1975,16 @@ class Basic(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            self.delivery_tag = struct.unpack_from('>Q', encoded, offset)[0]
-            offset += 8
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.delivery_tag, bit_buffer, length) = _STRUCT_QBB.unpack_from(encoded, offset)
+            offset += 10
             self.redelivered = (bit_buffer & (1 << 0)) != 0
-            length = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
             self.exchange = encoded[offset:offset + length]
             try:
                 self.exchange = str(self.exchange)
             except UnicodeEncodeError:
                 pass
             offset += length
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.routing_key = encoded[offset:offset + length]
             try:
@@ -2064,28 +1992,26 @@ class Basic(amqp_object.Class):
             except UnicodeEncodeError:
                 pass
             offset += length
-            self.message_count = struct.unpack_from('>I', encoded, offset)[0]
+            self.message_count = _STRUCT_I.unpack_from(encoded, offset)[0]
             offset += 4
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>Q', self.delivery_tag))
             bit_buffer = 0
             if self.redelivered:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
             assert isinstance(self.exchange, basestring),\
                    'A non-bytestring value was supplied for self.exchange'
             value = self.exchange.encode('utf-8') if isinstance(self.exchange, unicode) else self.exchange
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_QBB.pack(self.delivery_tag, bit_buffer, len(value)))
             pieces.append(value)
             assert isinstance(self.routing_key, basestring),\
                    'A non-bytestring value was supplied for self.routing_key'
             value = self.routing_key.encode('utf-8') if isinstance(self.routing_key, unicode) else self.routing_key
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
-            pieces.append(struct.pack('>I', self.message_count))
+            pieces.append(_STRUCT_I.pack(self.message_count))
             return pieces
 
     class GetEmpty(amqp_object.Method):
@@ -2101,7 +2027,7 @@ class Basic(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.cluster_id = encoded[offset:offset + length]
             try:
@@ -2116,7 +2042,7 @@ class Basic(amqp_object.Class):
             assert isinstance(self.cluster_id, basestring),\
                    'A non-bytestring value was supplied for self.cluster_id'
             value = self.cluster_id.encode('utf-8') if isinstance(self.cluster_id, unicode) else self.cluster_id
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
             return pieces
 
@@ -2134,20 +2060,17 @@ class Basic(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            self.delivery_tag = struct.unpack_from('>Q', encoded, offset)[0]
-            offset += 8
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.delivery_tag, bit_buffer) = _STRUCT_QB.unpack_from(encoded, offset)
+            offset += 9
             self.multiple = (bit_buffer & (1 << 0)) != 0
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>Q', self.delivery_tag))
             bit_buffer = 0
             if self.multiple:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_QB.pack(self.delivery_tag, bit_buffer))
             return pieces
 
     class Reject(amqp_object.Method):
@@ -2164,20 +2087,17 @@ class Basic(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            self.delivery_tag = struct.unpack_from('>Q', encoded, offset)[0]
-            offset += 8
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.delivery_tag, bit_buffer) = _STRUCT_QB.unpack_from(encoded, offset)
+            offset += 9
             self.requeue = (bit_buffer & (1 << 0)) != 0
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>Q', self.delivery_tag))
             bit_buffer = 0
             if self.requeue:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_QB.pack(self.delivery_tag, bit_buffer))
             return pieces
 
     class RecoverAsync(amqp_object.Method):
@@ -2193,7 +2113,7 @@ class Basic(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.requeue = (bit_buffer & (1 << 0)) != 0
             return self
@@ -2203,7 +2123,7 @@ class Basic(amqp_object.Class):
             bit_buffer = 0
             if self.requeue:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class Recover(amqp_object.Method):
@@ -2219,7 +2139,7 @@ class Basic(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.requeue = (bit_buffer & (1 << 0)) != 0
             return self
@@ -2229,7 +2149,7 @@ class Basic(amqp_object.Class):
             bit_buffer = 0
             if self.requeue:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class RecoverOk(amqp_object.Method):
@@ -2266,23 +2186,20 @@ class Basic(amqp_object.Class):
             return False
 
         def decode(self, encoded, offset=0):
-            self.delivery_tag = struct.unpack_from('>Q', encoded, offset)[0]
-            offset += 8
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
-            offset += 1
+            (self.delivery_tag, bit_buffer) = _STRUCT_QB.unpack_from(encoded, offset)
+            offset += 9
             self.multiple = (bit_buffer & (1 << 0)) != 0
             self.requeue = (bit_buffer & (1 << 1)) != 0
             return self
 
         def encode(self):
             pieces = list()
-            pieces.append(struct.pack('>Q', self.delivery_tag))
             bit_buffer = 0
             if self.multiple:
                 bit_buffer = bit_buffer | (1 << 0)
             if self.requeue:
                 bit_buffer = bit_buffer | (1 << 1)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_QB.pack(self.delivery_tag, bit_buffer))
             return pieces
 
 
@@ -2424,7 +2341,7 @@ class Confirm(amqp_object.Class):
             return True
 
         def decode(self, encoded, offset=0):
-            bit_buffer = struct.unpack_from('B', encoded, offset)[0]
+            bit_buffer = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.nowait = (bit_buffer & (1 << 0)) != 0
             return self
@@ -2434,7 +2351,7 @@ class Confirm(amqp_object.Class):
             bit_buffer = 0
             if self.nowait:
                 bit_buffer = bit_buffer | (1 << 0)
-            pieces.append(struct.pack('B', bit_buffer))
+            pieces.append(_STRUCT_B.pack(bit_buffer))
             return pieces
 
     class SelectOk(amqp_object.Method):
@@ -2498,14 +2415,14 @@ class BasicProperties(amqp_object.Properties):
         flags = 0
         flagword_index = 0
         while True:
-            partial_flags = struct.unpack_from('>H', encoded, offset)[0]
+            partial_flags = _STRUCT_H.unpack_from(encoded, offset)[0]
             offset += 2
             flags = flags | (partial_flags << (flagword_index * 16))
             if not (partial_flags & 1):
                 break
             flagword_index += 1
         if flags & BasicProperties.FLAG_CONTENT_TYPE:
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.content_type = encoded[offset:offset + length]
             try:
@@ -2516,7 +2433,7 @@ class BasicProperties(amqp_object.Properties):
         else:
             self.content_type = None
         if flags & BasicProperties.FLAG_CONTENT_ENCODING:
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.content_encoding = encoded[offset:offset + length]
             try:
@@ -2531,17 +2448,17 @@ class BasicProperties(amqp_object.Properties):
         else:
             self.headers = None
         if flags & BasicProperties.FLAG_DELIVERY_MODE:
-            self.delivery_mode = struct.unpack_from('B', encoded, offset)[0]
+            self.delivery_mode = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
         else:
             self.delivery_mode = None
         if flags & BasicProperties.FLAG_PRIORITY:
-            self.priority = struct.unpack_from('B', encoded, offset)[0]
+            self.priority = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
         else:
             self.priority = None
         if flags & BasicProperties.FLAG_CORRELATION_ID:
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.correlation_id = encoded[offset:offset + length]
             try:
@@ -2552,7 +2469,7 @@ class BasicProperties(amqp_object.Properties):
         else:
             self.correlation_id = None
         if flags & BasicProperties.FLAG_REPLY_TO:
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.reply_to = encoded[offset:offset + length]
             try:
@@ -2563,7 +2480,7 @@ class BasicProperties(amqp_object.Properties):
         else:
             self.reply_to = None
         if flags & BasicProperties.FLAG_EXPIRATION:
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.expiration = encoded[offset:offset + length]
             try:
@@ -2574,7 +2491,7 @@ class BasicProperties(amqp_object.Properties):
         else:
             self.expiration = None
         if flags & BasicProperties.FLAG_MESSAGE_ID:
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.message_id = encoded[offset:offset + length]
             try:
@@ -2585,12 +2502,12 @@ class BasicProperties(amqp_object.Properties):
         else:
             self.message_id = None
         if flags & BasicProperties.FLAG_TIMESTAMP:
-            self.timestamp = struct.unpack_from('>Q', encoded, offset)[0]
+            self.timestamp = _STRUCT_Q.unpack_from(encoded, offset)[0]
             offset += 8
         else:
             self.timestamp = None
         if flags & BasicProperties.FLAG_TYPE:
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.type = encoded[offset:offset + length]
             try:
@@ -2601,7 +2518,7 @@ class BasicProperties(amqp_object.Properties):
         else:
             self.type = None
         if flags & BasicProperties.FLAG_USER_ID:
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.user_id = encoded[offset:offset + length]
             try:
@@ -2612,7 +2529,7 @@ class BasicProperties(amqp_object.Properties):
         else:
             self.user_id = None
         if flags & BasicProperties.FLAG_APP_ID:
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.app_id = encoded[offset:offset + length]
             try:
@@ -2623,7 +2540,7 @@ class BasicProperties(amqp_object.Properties):
         else:
             self.app_id = None
         if flags & BasicProperties.FLAG_CLUSTER_ID:
-            length = struct.unpack_from('B', encoded, offset)[0]
+            length = _STRUCT_B.unpack_from(encoded, offset)[0]
             offset += 1
             self.cluster_id = encoded[offset:offset + length]
             try:
@@ -2643,82 +2560,82 @@ class BasicProperties(amqp_object.Properties):
             assert isinstance(self.content_type, basestring),\
                    'A non-bytestring value was supplied for self.content_type'
             value = self.content_type.encode('utf-8') if isinstance(self.content_type, unicode) else self.content_type
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
         if self.content_encoding is not None:
             flags = flags | BasicProperties.FLAG_CONTENT_ENCODING
             assert isinstance(self.content_encoding, basestring),\
                    'A non-bytestring value was supplied for self.content_encoding'
             value = self.content_encoding.encode('utf-8') if isinstance(self.content_encoding, unicode) else self.content_encoding
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
         if self.headers is not None:
             flags = flags | BasicProperties.FLAG_HEADERS
             data.encode_table(pieces, self.headers)
         if self.delivery_mode is not None:
             flags = flags | BasicProperties.FLAG_DELIVERY_MODE
-            pieces.append(struct.pack('B', self.delivery_mode))
+            pieces.append(_STRUCT_B.pack(self.delivery_mode))
         if self.priority is not None:
             flags = flags | BasicProperties.FLAG_PRIORITY
-            pieces.append(struct.pack('B', self.priority))
+            pieces.append(_STRUCT_B.pack(self.priority))
         if self.correlation_id is not None:
             flags = flags | BasicProperties.FLAG_CORRELATION_ID
             assert isinstance(self.correlation_id, basestring),\
                    'A non-bytestring value was supplied for self.correlation_id'
             value = self.correlation_id.encode('utf-8') if isinstance(self.correlation_id, unicode) else self.correlation_id
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
         if self.reply_to is not None:
             flags = flags | BasicProperties.FLAG_REPLY_TO
             assert isinstance(self.reply_to, basestring),\
                    'A non-bytestring value was supplied for self.reply_to'
             value = self.reply_to.encode('utf-8') if isinstance(self.reply_to, unicode) else self.reply_to
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
         if self.expiration is not None:
             flags = flags | BasicProperties.FLAG_EXPIRATION
             assert isinstance(self.expiration, basestring),\
                    'A non-bytestring value was supplied for self.expiration'
             value = self.expiration.encode('utf-8') if isinstance(self.expiration, unicode) else self.expiration
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
         if self.message_id is not None:
             flags = flags | BasicProperties.FLAG_MESSAGE_ID
             assert isinstance(self.message_id, basestring),\
                    'A non-bytestring value was supplied for self.message_id'
             value = self.message_id.encode('utf-8') if isinstance(self.message_id, unicode) else self.message_id
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
         if self.timestamp is not None:
             flags = flags | BasicProperties.FLAG_TIMESTAMP
-            pieces.append(struct.pack('>Q', self.timestamp))
+            pieces.append(_STRUCT_Q.pack(self.timestamp))
         if self.type is not None:
             flags = flags | BasicProperties.FLAG_TYPE
             assert isinstance(self.type, basestring),\
                    'A non-bytestring value was supplied for self.type'
             value = self.type.encode('utf-8') if isinstance(self.type, unicode) else self.type
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
         if self.user_id is not None:
             flags = flags | BasicProperties.FLAG_USER_ID
             assert isinstance(self.user_id, basestring),\
                    'A non-bytestring value was supplied for self.user_id'
             value = self.user_id.encode('utf-8') if isinstance(self.user_id, unicode) else self.user_id
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
         if self.app_id is not None:
             flags = flags | BasicProperties.FLAG_APP_ID
             assert isinstance(self.app_id, basestring),\
                    'A non-bytestring value was supplied for self.app_id'
             value = self.app_id.encode('utf-8') if isinstance(self.app_id, unicode) else self.app_id
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
         if self.cluster_id is not None:
             flags = flags | BasicProperties.FLAG_CLUSTER_ID
             assert isinstance(self.cluster_id, basestring),\
                    'A non-bytestring value was supplied for self.cluster_id'
             value = self.cluster_id.encode('utf-8') if isinstance(self.cluster_id, unicode) else self.cluster_id
-            pieces.append(struct.pack('B', len(value)))
+            pieces.append(_STRUCT_B.pack(len(value)))
             pieces.append(value)
         flag_pieces = list()
         while True:
@@ -2726,7 +2643,7 @@ class BasicProperties(amqp_object.Properties):
             partial_flags = flags & 0xFFFE
             if remainder != 0:
                 partial_flags |= 1
-            flag_pieces.append(struct.pack('>H', partial_flags))
+            flag_pieces.append(_STRUCT_H.pack(partial_flags))
             flags = remainder
             if not flags:
                 break
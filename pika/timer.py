@@ -0,0 +1,134 @@
+"""Timeouts ordered by deadline, shared by the adapters that run their own
+timers.
+
+"""
+import heapq
+import itertools
+import time
+
+
+class _Timeout(object):
+    """A timeout in a TimerQueue, which is also its handle. The callback is
+    cleared when the timeout is removed or called.
+
+    """
+    __slots__ = ('deadline', 'callback')
+
+    def __init__(self, deadline, callback):
+        """Create the timeout.
+
+        :param float deadline: The time to call the callback at
+        :param method callback: The callback method
+
+        """
+        self.deadline = deadline
+        self.callback = callback
+
+    def __repr__(self):
+        return '<%s deadline=%r callback=%r>' % (self.__class__.__name__,
+                                                 self.deadline, self.callback)
+
+
+class TimerQueue(object):
+    """Timeouts kept in a heap ordered by deadline, so adding one and finding
+    the next one due take O(log n) and O(1) time. Removed timeouts are only
+    marked as such, and are dropped from the heap when they reach the top of
+    it or when they make up more than half of it.
+
+    """
+    # The heap is not rebuilt to drop removed timeouts below this size
+    COMPACT_MIN_SIZE = 64
+
+    def __init__(self):
+        """Create an empty queue"""
+        self._heap = list()
+        self._count = itertools.count()
+        self._removed = 0
+
+    def __len__(self):
+        """Return the number of timeouts that are pending.
+
+        :rtype: int
+
+        """
+        return len(self._heap) - self._removed
+
+    def add(self, deadline, callback_method):
+        """Add the callback_method to be called after deadline seconds,
+        returning the handle of the timeout.
+
+        :param float deadline: The number of seconds to wait to call callback
+        :param method callback_method: The callback method
+        :rtype: object
+
+        """
+        timeout = _Timeout(time.time() + deadline, callback_method)
+        heapq.heappush(self._heap, (timeout.deadline, next(self._count),
+                                    timeout))
+        return timeout
+
+    def remove(self, timeout_id):
+        """Remove a timeout if it has not been called or removed yet. Values
+        that are not a handle returned by add, such as None, are ignored.
+
+        :param object timeout_id: The handle returned by add
+
+        """
+        if (not isinstance(timeout_id, _Timeout) or
+                timeout_id.callback is None):
+            return
+        timeout_id.callback = None
+        self._removed += 1
+        if (self._removed > len(self._heap) // 2 and
+                len(self._heap) > self.COMPACT_MIN_SIZE):
+            self._heap = [entry for entry in self._heap
+                          if entry[2].callback is not None]
+            heapq.heapify(self._heap)
+            self._removed = 0
+
+    def get_next_deadline(self):
+        """Return the time the next timeout is due at, or None if there are
+        no timeouts.
+
+        :rtype: float
+
+        """
+        heap = self._heap
+        while heap and heap[0][2].callback is None:
+            heapq.heappop(heap)
+            self._removed -= 1
+        return heap[0][0] if heap else None
+
+    def get_timeout(self, limit=None):
+        """Return the number of seconds until the next timeout is due, but no
+        more than limit. None is returned if there are no timeouts and no
+        limit.
+
+        :param float limit: The maximum number of seconds to return
+        :rtype: float
+
+        """
+        deadline = self.get_next_deadline()
+        if deadline is None:
+            return limit
+        remaining = max(deadline - time.time(), 0)
+        if limit is not None and limit < remaining:
+            return limit
+        return remaining
+
+    def process(self):
+        """Call the callbacks of the timeouts that are due, in order of their
+        deadlines. Timeouts added by the callbacks are left for the next call.
+
+        """
+        now = time.time()
+        last = next(self._count)
+        while (self._heap and self._heap[0][0] <= now and
+               self._heap[0][1] < last):
+            timeout = heapq.heappop(self._heap)[2]
+            callback = timeout.callback
+            if callback is None:
+                self._removed -= 1
+                continue
+            timeout.callback = None
+            callback()
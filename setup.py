@@ -40,7 +40,6 @@ setup(name='pika',
           'License :: OSI Approved :: Mozilla Public License 2.0 (MPL 2.0)',
           'Natural Language :: English',
           'Operating System :: OS Independent',
-          'Programming Language :: Python :: 2.6',
           'Programming Language :: Python :: 2.7',
           'Programming Language :: Python :: Implementation :: CPython',
           'Programming Language :: Python :: Implementation :: Jython',
@@ -2,12 +2,18 @@
 Tests for pika.base_connection.BaseConnection
 
 """
+import errno
+import socket
+import ssl
+import StringIO
+
 import mock
 try:
     import unittest2 as unittest
 except ImportError:
     import unittest
 
+from pika import frame
 from pika.adapters import base_connection
 
 
@@ -17,3 +23,351 @@ class BaseConnectionTests(unittest.TestCase):
       def foo():
           return True
       self.assertRaises(ValueError, base_connection.BaseConnection, foo)
+
+
+class BaseConnectionWriteTests(unittest.TestCase):
+
+    @mock.patch('pika.connection.Connection.connect')
+    def setUp(self, connect):
+        self.connection = base_connection.BaseConnection()
+        self.connection.socket = mock.Mock(spec=['send'])
+        self.written = list()
+        self.connection.socket.send.side_effect = self._send
+
+    def _send(self, value):
+        self.written.append(str(bytearray(value)))
+        return len(value)
+
+    def _limit_send(self, bytes_per_call):
+        def send(value):
+            self.written.append(str(bytearray(value)))
+            return min(bytes_per_call, len(value))
+        self.connection.socket.send.side_effect = send
+
+    def test_handle_write_single_frame(self):
+        self.connection.outbound_buffer.append('frame')
+        self.assertEqual(self.connection._handle_write(), 5)
+        self.connection.socket.send.assert_called_once_with('frame')
+
+    def test_handle_write_joins_queued_frames(self):
+        self.connection.outbound_buffer.extend(['ab', bytearray('cd'), 'ef'])
+        self.assertEqual(self.connection._handle_write(), 6)
+        self.assertEqual(self.written, ['abcdef'])
+        self.assertFalse(self.connection.outbound_buffer)
+
+    def test_handle_write_frame_limit(self):
+        self.connection.MAX_WRITE_FRAMES = 2
+        self.connection.outbound_buffer.extend(['ab', 'cd', 'ef'])
+        self.connection._handle_write()
+        self.assertEqual(list(self.connection.outbound_buffer), ['ef'])
+
+    def test_handle_write_size_limit(self):
+        self.connection.MAX_WRITE_SIZE = 4
+        self.connection.outbound_buffer.extend(['ab', 'cd', 'ef'])
+        self.connection._handle_write()
+        self.assertEqual(list(self.connection.outbound_buffer), ['ef'])
+
+    def test_handle_write_large_frame(self):
+        self.connection.MAX_WRITE_SIZE = 4
+        self.connection.outbound_buffer.extend(['abcdef', 'gh'])
+        self.connection._handle_write()
+        self.assertEqual(self.written, ['abcdef'])
+        self.assertEqual(list(self.connection.outbound_buffer), ['gh'])
+
+    def test_handle_write_marshals_body_frames(self):
+        self.connection.MAX_WRITE_SIZE = 30
+        body_frames = frame.BodyFrames(1, StringIO.StringIO('a' * 25), 10)
+        self.connection.outbound_buffer.extend(['ab', body_frames])
+        self.connection._handle_write()
+        self.assertEqual(self.written,
+                         ['ab' + frame.Body(1, 'a' * 10).marshal()])
+        self.assertEqual(list(self.connection.outbound_buffer), [body_frames])
+        self.assertEqual(len(body_frames), 15 + 2 * 8)
+
+    def test_handle_write_removes_marshaled_body_frames(self):
+        body_frames = frame.BodyFrames(1, StringIO.StringIO('a' * 25), 10)
+        self.connection.outbound_buffer.extend([body_frames, 'ef'])
+        self.connection._handle_write()
+        self.assertEqual(self.written,
+                         [frame.Body(1, 'a' * 10).marshal() +
+                          frame.Body(1, 'a' * 10).marshal() +
+                          frame.Body(1, 'a' * 5).marshal() + 'ef'])
+        self.assertFalse(self.connection.outbound_buffer)
+
+    def test_handle_write_body_ended_early_disconnects(self):
+        body = StringIO.StringIO('a' * 25)
+        body_frames = frame.BodyFrames(1, body, 10)
+        body.truncate(15)
+        self.connection.outbound_buffer.extend(['ab', body_frames])
+        with mock.patch.object(self.connection,
+                               '_handle_disconnect') as handle_disconnect:
+            self.connection._handle_write()
+            handle_disconnect.assert_called_once_with()
+        self.assertFalse(self.connection.socket.send.called)
+
+    def test_handle_write_body_closed_disconnects(self):
+        body = StringIO.StringIO('a' * 25)
+        body_frames = frame.BodyFrames(1, body, 10)
+        body.close()
+        self.connection.outbound_buffer.append(body_frames)
+        with mock.patch.object(self.connection,
+                               '_handle_disconnect') as handle_disconnect:
+            self.connection._handle_write()
+            handle_disconnect.assert_called_once_with()
+
+    def test_handle_write_partial_write_requeues_rest(self):
+        self._limit_send(3)
+        self.connection.outbound_buffer.extend(['ab', 'cd', 'ef'])
+        self.assertEqual(self.connection._handle_write(), 3)
+        self.assertEqual([str(bytearray(value)) for value in
+                          self.connection.outbound_buffer], ['d', 'ef'])
+
+    def test_handle_write_partial_write_keeps_memoryview_tail(self):
+        self._limit_send(2)
+        frame = bytearray('abcdef')
+        self.connection.outbound_buffer.append(frame)
+        self.connection._handle_write()
+        tail = self.connection.outbound_buffer[0]
+        self.assertIsInstance(tail, memoryview)
+        self.assertEqual(tail.tobytes(), 'cdef')
+
+    def test_handle_write_resumes_from_tail(self):
+        self._limit_send(3)
+        self.connection.outbound_buffer.extend(['abcd', 'ef'])
+        while self.connection.outbound_buffer:
+            self.connection._handle_write()
+        self.assertEqual(''.join(self.written), 'abcdefdef')
+        self.assertEqual(self.written[-1], 'def')
+
+    def test_handle_write_would_block_requeues_frames(self):
+        self.connection.socket.send.side_effect = \
+            socket.error(errno.EAGAIN, 'Resource temporarily unavailable')
+        self.connection.outbound_buffer.extend(['ab', 'cd'])
+        with mock.patch.object(self.connection,
+                               '_handle_disconnect') as handle_disconnect:
+            self.assertEqual(self.connection._handle_write(), None)
+            self.assertFalse(handle_disconnect.called)
+        self.assertEqual(list(self.connection.outbound_buffer), ['ab', 'cd'])
+        self.assertTrue(self.connection._write_blocked)
+
+    def test_handle_write_partial_write_blocks(self):
+        self._limit_send(3)
+        self.connection.outbound_buffer.extend(['ab', 'cd'])
+        self.connection._handle_write()
+        self.assertTrue(self.connection._write_blocked)
+
+    def test_handle_write_complete_write_does_not_block(self):
+        self.connection._write_blocked = True
+        self.connection.outbound_buffer.extend(['ab', 'cd'])
+        self.connection._handle_write()
+        self.assertFalse(self.connection._write_blocked)
+
+    def test_handle_events_returns_write_when_not_blocked(self):
+        self.connection._manage_event_state = mock.Mock()
+        self.connection.outbound_buffer.append('ab')
+        self.assertEqual(self.connection._handle_events(
+            1, self.connection.WRITE, write_only=True), self.connection.WRITE)
+
+    def test_handle_events_returns_nothing_when_blocked(self):
+        self.connection._manage_event_state = mock.Mock()
+        self._limit_send(1)
+        self.connection.outbound_buffer.append('ab')
+        self.assertEqual(self.connection._handle_events(
+            1, self.connection.WRITE, write_only=True), 0)
+
+    def test_handle_error_ssl_want_write_does_not_disconnect(self):
+        self.connection.params.ssl = True
+        error = ssl.SSLError(ssl.SSL_ERROR_WANT_WRITE, 'want write')
+        with mock.patch.object(self.connection,
+                               '_handle_disconnect') as handle_disconnect:
+            self.connection._handle_error(error)
+            self.assertFalse(handle_disconnect.called)
+
+
+class BaseConnectionReadTests(unittest.TestCase):
+
+    @mock.patch('pika.connection.Connection.connect')
+    def setUp(self, connect):
+        self.connection = base_connection.BaseConnection()
+        self.connection.socket = mock.Mock(spec=['recv_into'])
+        self.connection.heartbeat = mock.Mock()
+        self.received = list()
+        self.connection.socket.recv_into.side_effect = self._recv_into
+
+    def _recv_into(self, space, size):
+        value = self.received.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        space[:len(value)] = value
+        return len(value)
+
+    def test_handle_read_receives_into_frame_buffer(self):
+        self.received.append(frame.Heartbeat().marshal())
+        self.connection._handle_read()
+        space, size = self.connection.socket.recv_into.call_args[0]
+        self.assertEqual(size, self.connection._buffer_size)
+
+    def test_handle_read_returns_byte_count(self):
+        self.received.append(frame.Heartbeat().marshal())
+        self.assertEqual(self.connection._handle_read(), 8)
+
+    def test_handle_read_processes_frames(self):
+        self.received.append(frame.Heartbeat().marshal() * 2)
+        self.connection._handle_read()
+        self.assertEqual(self.connection.heartbeat.received.call_count, 2)
+
+    def test_handle_read_partial_frame(self):
+        heartbeat = frame.Heartbeat().marshal()
+        self.received.extend([heartbeat[:3], heartbeat[3:]])
+        self.connection._handle_read()
+        self.assertFalse(self.connection.heartbeat.received.called)
+        self.connection._handle_read()
+        self.assertEqual(self.connection.heartbeat.received.call_count, 1)
+
+    @mock.patch('pika.adapters.base_connection.BaseConnection.'
+                '_handle_disconnect')
+    def test_handle_read_empty_disconnects(self, handle_disconnect):
+        self.received.append('')
+        self.connection._handle_read()
+        handle_disconnect.assert_called_once_with()
+
+    @mock.patch('pika.adapters.base_connection.BaseConnection._handle_error')
+    def test_handle_read_socket_error(self, handle_error):
+        error = socket.error(errno.ECONNRESET, 'reset')
+        self.connection.socket.recv_into.side_effect = error
+        self.connection._handle_read()
+        handle_error.assert_called_once_with(error)
+
+    def test_handle_read_drains_until_would_block(self):
+        self.connection.params.frame_max = 8
+        self.received.extend([frame.Heartbeat().marshal()] * 2)
+        self.received.append(socket.error(errno.EAGAIN, 'again'))
+        self.assertEqual(self.connection._handle_read(), 16)
+        self.assertEqual(self.connection.heartbeat.received.call_count, 2)
+        self.assertEqual(self.received, [])
+        self.assertFalse(self.connection._read_budget_spent)
+
+    def test_handle_read_stops_after_short_read(self):
+        heartbeat = frame.Heartbeat().marshal()
+        self.connection.params.frame_max = 8
+        self.received.extend([heartbeat, heartbeat[:3], heartbeat[3:]])
+        self.assertEqual(self.connection._handle_read(), 11)
+        self.assertEqual(self.received, [heartbeat[3:]])
+
+    def test_handle_read_stops_at_read_size_budget(self):
+        self.connection.params.frame_max = 8
+        self.connection.MAX_READ_SIZE = 16
+        self.received.extend([frame.Heartbeat().marshal()] * 3)
+        self.assertEqual(self.connection._handle_read(), 16)
+        self.assertEqual(len(self.received), 1)
+        self.assertTrue(self.connection._read_budget_spent)
+
+    def test_handle_read_stops_at_read_frames_budget(self):
+        self.connection.params.frame_max = 8
+        self.connection.MAX_READ_FRAMES = 1
+        self.received.extend([frame.Heartbeat().marshal()] * 3)
+        self.assertEqual(self.connection._handle_read(), 8)
+        self.assertEqual(len(self.received), 2)
+        self.assertTrue(self.connection._read_budget_spent)
+
+    def test_handle_read_blocking_socket_reads_once(self):
+        self.connection.params.frame_max = 8
+        self.connection.BLOCKING_SOCKET = True
+        self.received.extend([frame.Heartbeat().marshal()] * 3)
+        self.assertEqual(self.connection._handle_read(), 8)
+        self.assertEqual(len(self.received), 2)
+
+    @mock.patch('pika.adapters.base_connection.BaseConnection.'
+                '_handle_disconnect', return_value=None)
+    def test_handle_read_stops_when_disconnected(self, handle_disconnect):
+        self.connection.params.frame_max = 8
+        self.received.extend([frame.Heartbeat().marshal(), '',
+                              frame.Heartbeat().marshal()])
+        self.assertEqual(self.connection._handle_read(), 8)
+        handle_disconnect.assert_called_once_with()
+        self.assertEqual(len(self.received), 1)
+
+    def test_handle_events_returns_read_when_budget_spent(self):
+        self.connection.params.frame_max = 8
+        self.connection.MAX_READ_FRAMES = 1
+        self.received.extend([frame.Heartbeat().marshal()] * 2)
+        self.assertEqual(self.connection._handle_events(
+            1, self.connection.READ), self.connection.READ)
+
+    def test_handle_events_returns_nothing_when_drained(self):
+        self.received.append(frame.Heartbeat().marshal())
+        self.assertEqual(self.connection._handle_events(
+            1, self.connection.READ), 0)
+
+
+class BaseConnectionSSLReadTests(unittest.TestCase):
+
+    @mock.patch('pika.connection.Connection.connect')
+    def setUp(self, connect):
+        self.connection = base_connection.BaseConnection()
+        self.connection.params.ssl = True
+        self.connection.params.frame_max = 8
+        self.connection.socket = mock.Mock(spec=['recv_into', 'pending'])
+        self.connection.socket.pending.return_value = 0
+        self.connection.heartbeat = mock.Mock()
+        self.received = list()
+        self.connection.socket.recv_into.side_effect = self._recv_into
+
+    def _recv_into(self, space, size):
+        value = self.received.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        space[:len(value)] = value
+        return len(value)
+
+    def test_ssl_handle_read_continues_after_short_read(self):
+        heartbeat = frame.Heartbeat().marshal()
+        want_read = ssl.SSLError(ssl.SSL_ERROR_WANT_READ, 'want read')
+        self.received.extend([heartbeat[:3], heartbeat[3:], want_read])
+        self.assertEqual(self.connection._handle_read(), 8)
+        self.assertEqual(self.connection.heartbeat.received.call_count, 1)
+        self.assertEqual(self.received, [])
+
+    def test_ssl_handle_read_drains_pending_past_budget(self):
+        self.connection.MAX_READ_SIZE = 8
+        self.connection.socket.pending.side_effect = [8, 8, 0]
+        self.received.extend([frame.Heartbeat().marshal()] * 4)
+        self.assertEqual(self.connection._handle_read(), 24)
+        self.assertEqual(len(self.received), 1)
+
+    def test_ssl_handle_read_blocking_socket_drains_pending(self):
+        self.connection.BLOCKING_SOCKET = True
+        self.connection.socket.pending.side_effect = [8, 0]
+        self.received.extend([frame.Heartbeat().marshal()] * 3)
+        self.assertEqual(self.connection._handle_read(), 16)
+        self.assertEqual(len(self.received), 1)
+
+    def test_ssl_pending(self):
+        self.connection.socket.pending.return_value = 5
+        self.assertEqual(self.connection._ssl_pending(), 5)
+
+    def test_ssl_pending_without_ssl(self):
+        self.connection.params.ssl = False
+        self.assertEqual(self.connection._ssl_pending(), 0)
+        self.assertFalse(self.connection.socket.pending.called)
+
+
+class BaseConnectionBlockingWriteTests(unittest.TestCase):
+
+    @mock.patch('pika.connection.Connection.connect')
+    def setUp(self, connect):
+        self.connection = base_connection.BaseConnection()
+        self.connection.BLOCKING_SOCKET = True
+        self.connection.socket = mock.Mock(spec=['sendall'])
+
+    def test_handle_write_single_frame(self):
+        self.connection.outbound_buffer.append('frame')
+        self.assertEqual(self.connection._handle_write(), 5)
+        self.connection.socket.sendall.assert_called_once_with('frame')
+
+    def test_handle_write_joins_queued_frames(self):
+        self.connection.outbound_buffer.extend(['ab', bytearray('cd'), 'ef'])
+        self.assertEqual(self.connection._handle_write(), 6)
+        self.connection.socket.sendall.assert_called_once_with(
+            bytearray('abcdef'))
+        self.assertFalse(self.connection.outbound_buffer)
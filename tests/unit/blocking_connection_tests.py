@@ -0,0 +1,178 @@
+# -*- coding: utf8 -*-
+"""
+Tests for pika.adapters.blocking_connection.BlockingConnection
+
+"""
+import socket
+import time
+
+import mock
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pika.adapters import blocking_connection
+from pika import exceptions
+from pika import frame
+from pika import timer
+
+BLOCKING_CONNECTION = 'pika.adapters.blocking_connection.BlockingConnection'
+
+
+class ReadPollerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.reader, self.writer = socket.socketpair()
+        self.poller = blocking_connection.ReadPoller(self.reader.fileno())
+
+    def tearDown(self):
+        self.reader.close()
+        self.writer.close()
+
+    def test_wait_without_data(self):
+        self.assertFalse(self.poller.wait(0))
+
+    def test_wait_with_data(self):
+        self.writer.send('x')
+        self.assertTrue(self.poller.wait(0))
+
+    def test_wait_without_timeout(self):
+        self.writer.send('x')
+        self.assertTrue(self.poller.wait(None))
+
+    def test_wait_with_select(self):
+        self.poller.poller = None
+        self.assertFalse(self.poller.wait(0))
+        self.writer.send('x')
+        self.assertTrue(self.poller.wait(None))
+
+
+class BlockingConnectionTests(unittest.TestCase):
+
+    @mock.patch(BLOCKING_CONNECTION + '.connect')
+    def setUp(self, connect):
+        self.connection = blocking_connection.BlockingConnection()
+        self.connection.socket = mock.Mock(spec=['recv_into'])
+        self.connection.heartbeat = mock.Mock()
+        self.connection._read_poller = mock.Mock()
+        self.connection._read_poller.wait.return_value = False
+        self.connection._frames_written_without_read = 0
+        self.connection._socket_timeouts = 0
+        self.connection._timeouts = timer.TimerQueue()
+
+    def test_get_wait_timeout_without_timeouts(self):
+        self.assertEqual(self.connection._get_wait_timeout(2), 2)
+
+    def test_get_wait_timeout_without_limit(self):
+        self.assertIsNone(self.connection._get_wait_timeout(None))
+
+    def test_get_wait_timeout_timeout_due_first(self):
+        self.connection.add_timeout(1, mock.Mock())
+        self.assertLessEqual(self.connection._get_wait_timeout(None), 1)
+        self.assertLessEqual(self.connection._get_wait_timeout(5), 1)
+
+    def test_get_wait_timeout_limit_first(self):
+        self.connection.add_timeout(10, mock.Mock())
+        self.assertEqual(self.connection._get_wait_timeout(2), 2)
+
+    def test_get_wait_timeout_timeout_past_due(self):
+        self.connection.add_timeout(-1, mock.Mock())
+        self.assertEqual(self.connection._get_wait_timeout(None), 0)
+
+    def test_process_data_events_waits_for_time_limit(self):
+        self.connection.process_data_events(time_limit=3)
+        self.connection._read_poller.wait.assert_called_once_with(3)
+
+    def test_process_data_events_default_time_limit(self):
+        self.connection.process_data_events()
+        self.connection._read_poller.wait.assert_called_once_with(0.01)
+
+    def test_process_data_events_reads_when_ready(self):
+        heartbeat = frame.Heartbeat().marshal()
+
+        def recv_into(space, size):
+            space[:len(heartbeat)] = heartbeat
+            return len(heartbeat)
+
+        self.connection.socket.recv_into.side_effect = recv_into
+        self.connection._read_poller.wait.return_value = True
+        self.connection._socket_timeouts = 2
+        self.connection.process_data_events(time_limit=None)
+        self.connection.heartbeat.received.assert_called_once_with()
+        self.assertEqual(self.connection._socket_timeouts, 0)
+
+    def test_process_data_events_calls_due_timeouts(self):
+        callback = mock.Mock()
+        self.connection.add_timeout(-1, callback)
+        self.connection.process_data_events(time_limit=None)
+        self.connection._read_poller.wait.assert_called_once_with(0)
+        callback.assert_called_once_with()
+
+    def test_process_data_events_closed(self):
+        self.connection.socket = None
+        self.assertRaises(exceptions.ConnectionClosed,
+                          self.connection.process_data_events)
+
+    @mock.patch(BLOCKING_CONNECTION + '.process_data_events')
+    def test_sleep_waits_for_remaining_time(self, process_data_events):
+        process_data_events.side_effect = time.sleep
+        self.connection.sleep(0.02)
+        self.assertLessEqual(process_data_events.call_args_list[0][0][0],
+                             0.02)
+        for args, kwargs in process_data_events.call_args_list:
+            self.assertGreater(args[0], 0)
+
+    def test_sleep_duration_is_kept(self):
+        self.assertEqual(blocking_connection.BlockingConnection.SLEEP_DURATION,
+                         0.1)
+
+    @mock.patch(BLOCKING_CONNECTION + '.process_data_events')
+    def test_sleep_zero(self, process_data_events):
+        self.connection.sleep(0)
+        self.assertFalse(process_data_events.called)
+
+
+class BlockingConnectionBusyPollTests(unittest.TestCase):
+
+    @mock.patch(BLOCKING_CONNECTION + '.connect')
+    def setUp(self, connect):
+        self.connection = blocking_connection.BlockingConnection(
+            busy_poll=1000)
+        self.connection._read_poller = mock.Mock()
+        self.connection._read_poller.wait.return_value = False
+
+    def test_init_busy_poll(self):
+        self.assertEqual(self.connection.busy_poll, 1000)
+
+    @mock.patch(BLOCKING_CONNECTION + '.connect')
+    def test_init_busy_poll_default(self, connect):
+        connection = blocking_connection.BlockingConnection()
+        self.assertEqual(connection.busy_poll, 0)
+
+    def test_wait_for_data_without_busy_poll(self):
+        self.connection.busy_poll = 0
+        self.connection._wait_for_data(2)
+        self.connection._read_poller.wait.assert_called_once_with(2)
+
+    def test_wait_for_data_busy_poll_finds_data(self):
+        self.connection._read_poller.wait.side_effect = [False, False, True]
+        self.assertTrue(self.connection._wait_for_data(None))
+        self.assertEqual(self.connection._read_poller.wait.call_args_list,
+                         [mock.call(0)] * 3)
+
+    def test_wait_for_data_busy_poll_then_blocks(self):
+        self.assertFalse(self.connection._wait_for_data(5))
+        calls = self.connection._read_poller.wait.call_args_list
+        self.assertEqual(calls[0], mock.call(0))
+        self.assertGreater(calls[-1][0][0], 4.9)
+        self.assertLess(calls[-1][0][0], 5)
+
+    def test_wait_for_data_busy_poll_then_blocks_without_timeout(self):
+        self.connection._wait_for_data(None)
+        calls = self.connection._read_poller.wait.call_args_list
+        self.assertEqual(calls[-1], mock.call(None))
+
+    def test_wait_for_data_busy_poll_no_wait(self):
+        self.connection._wait_for_data(0)
+        self.connection._read_poller.wait.assert_called_once_with(0)
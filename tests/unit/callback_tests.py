@@ -19,22 +19,14 @@ from pika import spec
 class CallbackTests(unittest.TestCase):
 
     KEY = 'Test Key'
-    ARGUMENTS = callback.CallbackManager.ARGUMENTS
-    CALLS = callback.CallbackManager.CALLS
-    CALLBACK = callback.CallbackManager.CALLBACK
-    ONE_SHOT = callback.CallbackManager.ONE_SHOT
-    ONLY_CALLER = callback.CallbackManager.ONLY_CALLER
     PREFIX_CLASS = spec.Basic.Consume
     PREFIX = 'Basic.Consume'
     ARGUMENTS_VALUE = {'foo': 'bar'}
 
     @property
-    def _callback_dict(self):
-        return {self.CALLBACK: self.callback_mock,
-                self.ONE_SHOT: True,
-                self.ONLY_CALLER: self.mock_caller,
-                self.ARGUMENTS: self.ARGUMENTS_VALUE,
-                self.CALLS: 1}
+    def _callback(self):
+        return callback._Callback(self.callback_mock, True, self.mock_caller,
+                                  self.ARGUMENTS_VALUE)
 
     def setUp(self):
         self.obj = callback.CallbackManager()
@@ -49,6 +41,7 @@ class CallbackTests(unittest.TestCase):
     def test_initialization(self):
         obj = callback.CallbackManager()
         self.assertDictEqual(obj._stack, {})
+        self.assertDictEqual(obj._prefixes, {})
 
 
     def test_name_or_value_method_object(self):
@@ -88,44 +81,70 @@ class CallbackTests(unittest.TestCase):
 
     def test_sanitize_decorator_with_args_only(self):
         self.obj.add(self.PREFIX_CLASS, self.KEY, None)
-        self.assertIn(self.PREFIX, self.obj._stack.keys())
+        self.assertIn(self.PREFIX, self.obj._prefixes)
 
     def test_sanitize_decorator_with_kwargs(self):
         self.obj.add(prefix=self.PREFIX_CLASS, key=self.KEY, callback=None)
-        self.assertIn(self.PREFIX, self.obj._stack.keys())
+        self.assertIn(self.PREFIX, self.obj._prefixes)
 
     def test_sanitize_decorator_with_mixed_args_and_kwargs(self):
         self.obj.add(self.PREFIX_CLASS, key=self.KEY, callback=None)
-        self.assertIn(self.PREFIX, self.obj._stack.keys())
+        self.assertIn(self.PREFIX, self.obj._prefixes)
+
+    def test_sanitize_prefix(self):
+        function = mock.Mock(__name__='function')
+        callback.sanitize_prefix(function)(self.obj, self.PREFIX_CLASS,
+                                           key=spec.Basic.Cancel)
+        function.assert_called_once_with(self.obj, self.PREFIX,
+                                         key='Basic.Cancel')
+
+    def test_check_for_prefix_and_key(self):
+        function = mock.Mock(__name__='function')
+        self.obj.add(self.PREFIX, self.KEY, None)
+        wrapper = callback.check_for_prefix_and_key(function)
+        self.assertFalse(wrapper(self.obj, self.PREFIX, 'Other Key'))
+        self.assertFalse(function.called)
+        wrapper(self.obj, self.PREFIX_CLASS, self.KEY)
+        function.assert_called_once_with(self.obj, self.PREFIX_CLASS,
+                                         self.KEY)
+
+    def test_callback_value_names(self):
+        self.assertEqual((callback.CallbackManager.CALLS,
+                          callback.CallbackManager.ARGUMENTS,
+                          callback.CallbackManager.CALLBACK,
+                          callback.CallbackManager.ONE_SHOT,
+                          callback.CallbackManager.ONLY_CALLER),
+                         ('calls', 'arguments', 'callback', 'one_shot',
+                          'only'))
 
     def test_add_first_time_prefix_added(self):
         self.obj.add(self.PREFIX, self.KEY, None)
-        self.assertIn(self.PREFIX, self.obj._stack)
+        self.assertIn(self.PREFIX, self.obj._prefixes)
 
     def test_add_first_time_key_added(self):
         self.obj.add(self.PREFIX, self.KEY, None)
-        self.assertIn(self.KEY, self.obj._stack[self.PREFIX])
+        self.assertIn((self.PREFIX, self.KEY), self.obj._stack)
 
     def test_add_first_time_callback_added(self):
         self.obj.add(self.PREFIX, self.KEY, self.callback_mock)
         self.assertEqual(self.callback_mock,
-                         self.obj._stack[self.PREFIX][self.KEY][0][self.CALLBACK])
+                         self.obj._stack[(self.PREFIX, self.KEY)][0].callback)
 
     def test_add_oneshot_default_is_true(self):
         self.obj.add(self.PREFIX, self.KEY, None)
-        self.assertTrue(self.obj._stack[self.PREFIX][self.KEY][0][self.ONE_SHOT])
+        self.assertTrue(self.obj._stack[(self.PREFIX, self.KEY)][0].one_shot)
 
     def test_add_oneshot_is_false(self):
         self.obj.add(self.PREFIX, self.KEY, None, False)
-        self.assertFalse(self.obj._stack[self.PREFIX][self.KEY][0][self.ONE_SHOT])
+        self.assertFalse(self.obj._stack[(self.PREFIX, self.KEY)][0].one_shot)
 
     def test_add_only_caller_default_is_false(self):
         self.obj.add(self.PREFIX, self.KEY, None)
-        self.assertFalse(self.obj._stack[self.PREFIX][self.KEY][0][self.ONLY_CALLER])
+        self.assertFalse(self.obj._stack[(self.PREFIX, self.KEY)][0].only_caller)
 
     def test_add_only_caller_true(self):
         self.obj.add(self.PREFIX, self.KEY, None, only_caller=True)
-        self.assertTrue(self.obj._stack[self.PREFIX][self.KEY][0][self.ONLY_CALLER])
+        self.assertTrue(self.obj._stack[(self.PREFIX, self.KEY)][0].only_caller)
 
     def test_add_returns_prefix_value_and_key(self):
         self.assertEqual(self.obj.add(self.PREFIX, self.KEY, None),
@@ -155,20 +174,27 @@ class CallbackTests(unittest.TestCase):
         self.obj.add(self.PREFIX, self.KEY, None)
         self.obj.clear()
         self.assertDictEqual(self.obj._stack, dict())
+        self.assertDictEqual(self.obj._prefixes, dict())
 
     def test_cleanup_removes_prefix(self):
         OTHER_PREFIX = 'Foo'
         self.obj.add(self.PREFIX, self.KEY, None)
         self.obj.add(OTHER_PREFIX, 'Bar', None)
         self.obj.cleanup(self.PREFIX)
-        self.assertNotIn(self.PREFIX, self.obj._stack)
+        self.assertNotIn(self.PREFIX, self.obj._prefixes)
 
     def test_cleanup_keeps_other_prefix(self):
         OTHER_PREFIX = 'Foo'
         self.obj.add(self.PREFIX, self.KEY, None)
         self.obj.add(OTHER_PREFIX, 'Bar', None)
         self.obj.cleanup(self.PREFIX)
-        self.assertIn(OTHER_PREFIX, self.obj._stack)
+        self.assertIn(OTHER_PREFIX, self.obj._prefixes)
+
+    def test_cleanup_removes_all_prefix_keys(self):
+        self.obj.add(self.PREFIX, self.KEY, None)
+        self.obj.add(self.PREFIX, 'Bar', None)
+        self.obj.cleanup(self.PREFIX)
+        self.assertDictEqual(self.obj._stack, dict())
 
     def test_cleanup_returns_true(self):
         self.obj.add(self.PREFIX, self.KEY, None)
@@ -190,7 +216,7 @@ class CallbackTests(unittest.TestCase):
         self.assertEqual(self.obj.pending(self.PREFIX_CLASS, self.KEY), 2)
 
     def test_process_callback_false(self):
-        self.obj._stack = dict()
+        self.obj.clear()
         self.assertFalse(self.obj.process('FAIL', 'False', 'Empty',
                                           self.mock_caller, []))
 
@@ -211,24 +237,57 @@ class CallbackTests(unittest.TestCase):
         args = (1, None, 'Hi')
         self.obj.add(self.PREFIX, self.KEY, self.callback_mock)
         self.obj.process(self.PREFIX, self.KEY, self, args)
-        self.assertNotIn(self.PREFIX, self.obj._stack)
+        self.assertNotIn(self.PREFIX, self.obj._prefixes)
 
     def test_process_non_one_shot_prefix_not_removed(self):
         self.obj.add(self.PREFIX, self.KEY, self.callback_mock, one_shot=False)
         self.obj.process(self.PREFIX, self.KEY, self)
-        self.assertIn(self.PREFIX, self.obj._stack)
+        self.assertIn(self.PREFIX, self.obj._prefixes)
 
     def test_process_non_one_shot_key_not_removed(self):
         self.obj.add(self.PREFIX, self.KEY, self.callback_mock, one_shot=False)
         self.obj.process(self.PREFIX, self.KEY, self)
-        self.assertIn(self.KEY, self.obj._stack[self.PREFIX])
+        self.assertIn((self.PREFIX, self.KEY), self.obj._stack)
 
     def test_process_non_one_shot_callback_not_removed(self):
         self.obj.add(self.PREFIX, self.KEY, self.callback_mock, one_shot=False)
         self.obj.process(self.PREFIX, self.KEY, self)
-        self.assertEqual(self.obj._stack[self.PREFIX][self.KEY][0][self.CALLBACK],
+        self.assertEqual(self.obj._stack[(self.PREFIX, self.KEY)][0].callback,
                          self.callback_mock)
 
+    def test_process_one_shot_added_twice_called_twice(self):
+        self.obj.add(self.PREFIX, self.KEY, self.callback_mock)
+        self.obj.add(self.PREFIX, self.KEY, self.callback_mock)
+        self.obj.process(self.PREFIX, self.KEY, self)
+        self.assertEqual(self.obj.pending(self.PREFIX, self.KEY), 1)
+        self.obj.process(self.PREFIX, self.KEY, self)
+        self.assertEqual(self.callback_mock.call_count, 2)
+        self.assertIsNone(self.obj.pending(self.PREFIX, self.KEY))
+
+    def test_process_one_shot_removed_other_callbacks_remain(self):
+        other_callback = mock.Mock()
+        self.obj.add(self.PREFIX, self.KEY, self.callback_mock)
+        self.obj.add(self.PREFIX, self.KEY, other_callback, one_shot=False)
+        self.obj.process(self.PREFIX, self.KEY, self)
+        self.assertEqual([value.callback for value in
+                          self.obj._stack[(self.PREFIX, self.KEY)]],
+                         [other_callback])
+
+    def test_process_one_shot_removes_same_callback(self):
+        self.obj.add(self.PREFIX, self.KEY, self.callback_mock)
+        self.obj.add(self.PREFIX, self.KEY, self.callback_mock,
+                     only_caller=self.mock_caller)
+        self.obj.process(self.PREFIX, self.KEY, self)
+        self.callback_mock.assert_called_once_with()
+        self.assertIsNone(self.obj.pending(self.PREFIX, self.KEY))
+
+    def test_process_arguments_mismatch_not_removed(self):
+        self.obj.add(self.PREFIX, self.KEY, self.callback_mock,
+                     arguments={'foo': 'bar'})
+        self.obj.process(self.PREFIX, self.KEY, self, {'foo': 'baz'})
+        self.assertFalse(self.callback_mock.called)
+        self.assertEqual(self.obj.pending(self.PREFIX, self.KEY), 1)
+
     def test_process_only_caller_fails(self):
         self.obj.add(self.PREFIX_CLASS, self.KEY, self.callback_mock,
                 only_caller=self.mock_caller)
@@ -239,7 +298,7 @@ class CallbackTests(unittest.TestCase):
         self.obj.add(self.PREFIX_CLASS, self.KEY, self.callback_mock,
                      only_caller=self.mock_caller)
         self.obj.process(self.PREFIX_CLASS, self.KEY, self)
-        self.assertEqual(self.obj._stack[self.PREFIX][self.KEY][0][self.CALLBACK],
+        self.assertEqual(self.obj._stack[(self.PREFIX, self.KEY)][0].callback,
                          self.callback_mock)
 
     def test_remove_with_no_callbacks_pending(self):
@@ -262,20 +321,21 @@ class CallbackTests(unittest.TestCase):
         self.obj.remove(prefix=self.PREFIX, key=self.KEY,
                         callback_value=self.callback_mock)
         self.assertDictEqual(self.obj._stack, dict())
+        self.assertDictEqual(self.obj._prefixes, dict())
 
     def test_remove_with_callback_true_non_empty_stack(self):
         self.obj.add(self.PREFIX_CLASS, self.KEY, self.callback_mock)
         self.obj.add(self.PREFIX_CLASS, self.KEY, self.mock_caller)
         self.obj.remove(self.PREFIX, self.KEY, self.callback_mock)
         self.assertEqual(self.mock_caller,
-                         self.obj._stack[self.PREFIX][self.KEY][0][self.CALLBACK])
+                         self.obj._stack[(self.PREFIX, self.KEY)][0].callback)
 
     def test_remove_prefix_key_with_other_key_prefix_remains(self):
         OTHER_KEY = 'Other Key'
         self.obj.add(self.PREFIX_CLASS, self.KEY, self.callback_mock)
         self.obj.add(self.PREFIX_CLASS, OTHER_KEY, self.mock_caller)
         self.obj.remove(self.PREFIX, self.KEY, self.callback_mock)
-        self.assertIn(self.PREFIX, self.obj._stack)
+        self.assertIn(self.PREFIX, self.obj._prefixes)
 
     def test_remove_prefix_key_with_other_key_remains(self):
         OTHER_KEY = 'Other Key'
@@ -283,7 +343,7 @@ class CallbackTests(unittest.TestCase):
         self.obj.add(prefix=self.PREFIX_CLASS, key=OTHER_KEY,
                      callback=self.mock_caller)
         self.obj.remove(self.PREFIX, self.KEY)
-        self.assertIn(OTHER_KEY, self.obj._stack[self.PREFIX])
+        self.assertIn((self.PREFIX, OTHER_KEY), self.obj._stack)
 
     def test_remove_prefix_key_with_other_key_callback_remains(self):
         OTHER_KEY = 'Other Key'
@@ -291,81 +351,72 @@ class CallbackTests(unittest.TestCase):
         self.obj.add(self.PREFIX_CLASS, OTHER_KEY, self.mock_caller)
         self.obj.remove(self.PREFIX, self.KEY)
         self.assertEqual(self.mock_caller,
-                         self.obj._stack[self.PREFIX][OTHER_KEY][0][self.CALLBACK])
+                         self.obj._stack[(self.PREFIX, OTHER_KEY)][0].callback)
 
     def test_remove_all(self):
         self.obj.add(self.PREFIX_CLASS, self.KEY, self.callback_mock)
         self.obj.remove_all(self.PREFIX, self.KEY)
-        self.assertNotIn(self.PREFIX, self.obj._stack)
+        self.assertNotIn(self.PREFIX, self.obj._prefixes)
 
     def test_should_process_callback_true(self):
         self.obj.add(self.PREFIX_CLASS, self.KEY, self.callback_mock)
-        value = self.obj._callback_dict(self.callback_mock, False, None, None)
-        self.assertTrue(self.obj._should_process_callback(value,
-                                                          self.mock_caller, []))
+        value = callback._Callback(self.callback_mock, False, None, None)
+        self.assertTrue(value.should_process(self.mock_caller, []))
 
     def test_should_process_callback_false_argument_fail(self):
         self.obj.clear()
         self.obj.add(self.PREFIX_CLASS, self.KEY, self.callback_mock,
                      arguments={'foo': 'baz'})
-        self.assertFalse(self.obj._should_process_callback(self._callback_dict,
-                                                           self.mock_caller,
-                                                           [{'foo': 'baz'}]))
+        self.assertFalse(self._callback.should_process(self.mock_caller,
+                                                       [{'foo': 'baz'}]))
 
     def test_should_process_callback_false_only_caller_failure(self):
         self.obj.add(self.PREFIX_CLASS, self.KEY, self.callback_mock)
-        value = self.obj._callback_dict(self.callback_mock, False, self, None)
-        self.assertTrue(self.obj._should_process_callback(value,
-                                                          self.mock_caller, []))
+        value = callback._Callback(self.callback_mock, False, self, None)
+        self.assertTrue(value.should_process(self.mock_caller, []))
 
     def test_should_process_callback_false_only_caller_failure(self):
         self.obj.add(self.PREFIX_CLASS, self.KEY, self.callback_mock)
-        value = self.obj._callback_dict(self.callback_mock, False,
-                                        self.mock_caller, None)
-        self.assertTrue(self.obj._should_process_callback(value,
-                                                          self.mock_caller, []))
+        value = callback._Callback(self.callback_mock, False,
+                                   self.mock_caller, None)
+        self.assertTrue(value.should_process(self.mock_caller, []))
 
-    def test_dict(self):
-        self.assertDictEqual(self.obj._callback_dict(self.callback_mock,
-                                                     True, self.mock_caller,
-                                                     self.ARGUMENTS_VALUE),
-                             self._callback_dict)
+    def test_callback_record(self):
+        value = self._callback
+        self.assertEqual((value.callback, value.one_shot, value.only_caller,
+                          value.arguments, value.calls),
+                         (self.callback_mock, True, self.mock_caller,
+                          self.ARGUMENTS_VALUE, 1))
 
     def test_arguments_match_no_arguments(self):
-        self.assertFalse(self.obj._arguments_match(self._callback_dict, []))
+        self.assertFalse(self._callback.arguments_match([]))
 
     def test_arguments_match_dict_argument(self):
-        self.assertTrue(self.obj._arguments_match(self._callback_dict,
-                                                  [self.ARGUMENTS_VALUE]))
+        self.assertTrue(self._callback.arguments_match([self.ARGUMENTS_VALUE]))
 
     def test_arguments_match_dict_argument_no_attribute(self):
-        self.assertFalse(self.obj._arguments_match(self._callback_dict,
-                                                   [{}]))
+        self.assertFalse(self._callback.arguments_match([{}]))
 
     def test_arguments_match_dict_argument_no_match(self):
-        self.assertFalse(self.obj._arguments_match(self._callback_dict,
-                                                   [{'foo': 'baz'}]))
+        self.assertFalse(self._callback.arguments_match([{'foo': 'baz'}]))
 
     def test_arguments_match_obj_argument(self):
         class TestObj(object):
             foo = 'bar'
         test_instance = TestObj()
-        self.assertTrue(self.obj._arguments_match(self._callback_dict,
-                                                  [test_instance]))
+        self.assertTrue(self._callback.arguments_match([test_instance]))
 
     def test_arguments_match_obj_no_attribute(self):
         class TestObj(object):
             qux = 'bar'
         test_instance = TestObj()
-        self.assertFalse(self.obj._arguments_match(self._callback_dict,
-                                                  [test_instance]))
+        self.assertFalse(self._callback.arguments_match([test_instance]))
 
     def test_arguments_match_obj_argument_no_match(self):
         class TestObj(object):
             foo = 'baz'
         test_instance = TestObj()
-        self.assertFalse(self.obj._arguments_match(self._callback_dict,
-                                                   [test_instance]))
+        self.assertFalse(self._callback.arguments_match([test_instance]))
 
     def test_arguments_match_obj_argument_with_method(self):
         class TestFrame(object):
@@ -374,8 +425,7 @@ class CallbackTests(unittest.TestCase):
             foo = 'bar'
         test_instance = TestFrame()
         test_instance.method = MethodObj()
-        self.assertTrue(self.obj._arguments_match(self._callback_dict,
-                                                  [test_instance]))
+        self.assertTrue(self._callback.arguments_match([test_instance]))
 
     def test_arguments_match_obj_argument_with_method_no_match(self):
         class TestFrame(object):
@@ -384,5 +434,4 @@ class CallbackTests(unittest.TestCase):
             foo = 'baz'
         test_instance = TestFrame()
         test_instance.method = MethodObj()
-        self.assertFalse(self.obj._arguments_match(self._callback_dict,
-                                                   [test_instance]))
+        self.assertFalse(self._callback.arguments_match([test_instance]))
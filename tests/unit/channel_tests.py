@@ -903,6 +903,42 @@ class ChannelTests(unittest.TestCase):
                                                 self.obj._on_getempty,
                                                 False)
 
+    def test_large_body_threshold_default(self):
+        self.assertIsNone(self.obj.large_body_threshold)
+
+    def test_large_body_threshold_sets_frame_dispatcher(self):
+        self.obj.large_body_threshold = 1048576
+        self.assertEqual(self.obj.frame_dispatcher.large_body_threshold,
+                         1048576)
+
+    def test_basic_consume_streaming(self):
+        self.obj._set_state(self.obj.OPEN)
+        consumer_tag = 'ctag1.0'
+        self.obj.basic_consume(mock.Mock(), 'test-queue',
+                               consumer_tag=consumer_tag, streaming=True)
+        self.assertIn(consumer_tag, self.obj._streaming)
+
+    def test_basic_consume_not_streaming(self):
+        self.obj._set_state(self.obj.OPEN)
+        consumer_tag = 'ctag1.0'
+        self.obj.basic_consume(mock.Mock(), 'test-queue',
+                               consumer_tag=consumer_tag)
+        self.assertNotIn(consumer_tag, self.obj._streaming)
+
+    def test_basic_consume_bytearray_body(self):
+        self.obj._set_state(self.obj.OPEN)
+        consumer_tag = 'ctag1.0'
+        self.obj.basic_consume(mock.Mock(), 'test-queue',
+                               consumer_tag=consumer_tag, bytearray_body=True)
+        self.assertIn(consumer_tag, self.obj._bytearray_bodies)
+
+    def test_basic_consume_not_bytearray_body(self):
+        self.obj._set_state(self.obj.OPEN)
+        consumer_tag = 'ctag1.0'
+        self.obj.basic_consume(mock.Mock(), 'test-queue',
+                               consumer_tag=consumer_tag)
+        self.assertNotIn(consumer_tag, self.obj._bytearray_bodies)
+
     def test_add_callbacks_channel_flow_added(self):
         self.obj._add_callbacks()
         self.obj.callbacks.add.assert_any_calls(self.obj.channel_number,
@@ -914,6 +950,36 @@ class ChannelTests(unittest.TestCase):
         self.obj._cleanup()
         self.obj.callbacks.cleanup.assert_called_once_with(str(self.obj.channel_number))
 
+    def test_cleanup_removes_bytearray_bodies(self):
+        self.obj._bytearray_bodies.add('ctag0')
+        self.obj._cleanup()
+        self.assertEqual(self.obj._bytearray_bodies, set())
+
+    def test_cleanup_closes_partial_body_file(self):
+        self.obj.large_body_threshold = 5
+        self.obj.frame_dispatcher.process(
+            frame.Method(1, spec.Basic.Deliver()))
+        self.obj.frame_dispatcher.process(
+            frame.Header(1, 6, spec.BasicProperties))
+        self.obj.frame_dispatcher.process(frame.Body(1, 'abc'))
+        body_file = self.obj.frame_dispatcher._body_file
+        self.obj._cleanup()
+        self.assertTrue(body_file.closed)
+        self.assertIsNone(self.obj.frame_dispatcher._body_file)
+
+    def test_cleanup_drops_streamed_body(self):
+        body_stream = mock.Mock()
+        self.obj.frame_dispatcher._stream_callback = mock.Mock(
+            return_value=body_stream)
+        self.obj.frame_dispatcher.process(
+            frame.Method(1, spec.Basic.Deliver()))
+        self.obj.frame_dispatcher.process(
+            frame.Header(1, 6, spec.BasicProperties))
+        self.obj.frame_dispatcher.process(frame.Body(1, 'abc'))
+        self.obj._cleanup()
+        body_stream.assert_called_once_with('abc')
+        self.assertIsNone(self.obj.frame_dispatcher._body_stream)
+
     def test_get_pending_message(self):
         key = 'foo'
         expectation = 'abc1234'
@@ -976,6 +1042,108 @@ class ChannelTests(unittest.TestCase):
             basic_return.assert_called_once_with(method_value, header_value,
                                                  '0123456789')
 
+    def test_handle_content_frame_assembles_str_body(self):
+        callback = mock.Mock()
+        self.obj._set_state(self.obj.OPEN)
+        self.obj._consumers['ctag0'] = callback
+        self.obj._pending['ctag0'] = list()
+        self.obj._handle_content_frame(
+            frame.Method(1, spec.Basic.Deliver('ctag0', 1)))
+        self.obj._handle_content_frame(
+            frame.Header(1, 10, spec.BasicProperties()))
+        self.obj._handle_content_frame(frame.Body(1, '01234'))
+        self.obj._handle_content_frame(frame.Body(1, '56789'))
+        body = callback.call_args[0][3]
+        self.assertEqual(body, '0123456789')
+        self.assertIsInstance(body, str)
+
+    def test_handle_content_frame_assembles_bytearray_body(self):
+        callback = mock.Mock()
+        self.obj._set_state(self.obj.OPEN)
+        self.obj._consumers['ctag0'] = callback
+        self.obj._pending['ctag0'] = list()
+        self.obj._bytearray_bodies.add('ctag0')
+        self.obj._handle_content_frame(
+            frame.Method(1, spec.Basic.Deliver('ctag0', 1)))
+        self.obj._handle_content_frame(
+            frame.Header(1, 10, spec.BasicProperties()))
+        self.obj._handle_content_frame(frame.Body(1, '01234'))
+        self.obj._handle_content_frame(frame.Body(1, '56789'))
+        body = callback.call_args[0][3]
+        self.assertEqual(body, bytearray('0123456789'))
+        self.assertIsInstance(body, bytearray)
+
+    def test_wants_bytearray_body_for_get_ok(self):
+        self.obj._bytearray_bodies.add('ctag0')
+        method_value = frame.Method(1, spec.Basic.GetOk(1))
+        header_value = frame.Header(1, 10, spec.BasicProperties())
+        self.assertFalse(self.obj._wants_bytearray_body(method_value,
+                                                        header_value))
+
+    def _consume_streaming(self, consumer_tag='ctag0'):
+        callback = mock.Mock()
+        self.obj._set_state(self.obj.OPEN)
+        self.obj._consumers[consumer_tag] = callback
+        self.obj._pending[consumer_tag] = list()
+        self.obj._streaming.add(consumer_tag)
+        return callback
+
+    def test_handle_content_frame_streams_body(self):
+        callback = self._consume_streaming()
+        method_value = frame.Method(1, spec.Basic.Deliver('ctag0', 1))
+        self.obj._handle_content_frame(method_value)
+        properties = spec.BasicProperties()
+        self.obj._handle_content_frame(frame.Header(1, 10, properties))
+        self.obj._handle_content_frame(frame.Body(1, '01234'))
+        self.obj._handle_content_frame(frame.Body(1, '56789'))
+        self.assertListEqual(
+            callback.call_args_list,
+            [mock.call(self.obj, method_value.method, properties, '01234'),
+             mock.call(self.obj, method_value.method, properties, '56789'),
+             mock.call(self.obj, method_value.method, properties, None)])
+
+    def test_handle_content_frame_streams_empty_body(self):
+        callback = self._consume_streaming()
+        method_value = frame.Method(1, spec.Basic.Deliver('ctag0', 1))
+        self.obj._handle_content_frame(method_value)
+        properties = spec.BasicProperties()
+        self.obj._handle_content_frame(frame.Header(1, 0, properties))
+        callback.assert_called_once_with(self.obj, method_value.method,
+                                         properties, None)
+
+    def test_get_body_stream_for_streaming_consumer(self):
+        callback = self._consume_streaming()
+        method_value = frame.Method(1, spec.Basic.Deliver('ctag0', 1))
+        header_value = frame.Header(1, 10, spec.BasicProperties())
+        body_stream = self.obj._get_body_stream(method_value, header_value)
+        body_stream('0123456789')
+        callback.assert_called_once_with(self.obj, method_value.method,
+                                         header_value.properties,
+                                         '0123456789')
+
+    def test_get_body_stream_for_consumer_none(self):
+        self.obj._consumers['ctag0'] = mock.Mock()
+        self.obj._pending['ctag0'] = list()
+        method_value = frame.Method(1, spec.Basic.Deliver('ctag0', 1))
+        header_value = frame.Header(1, 10, spec.BasicProperties())
+        self.assertIsNone(self.obj._get_body_stream(method_value,
+                                                    header_value))
+
+    def test_get_body_stream_with_pending_messages_none(self):
+        self._consume_streaming()
+        self.obj._pending['ctag0'].append(mock.Mock())
+        method_value = frame.Method(1, spec.Basic.Deliver('ctag0', 1))
+        header_value = frame.Header(1, 10, spec.BasicProperties())
+        self.assertIsNone(self.obj._get_body_stream(method_value,
+                                                    header_value))
+
+    def test_get_body_stream_for_basic_getok_none(self):
+        self._consume_streaming()
+        method_value = frame.Method(1, spec.Basic.GetOk(1))
+        header_value = frame.Header(1, 10, spec.BasicProperties())
+        self.assertIsNone(self.obj._get_body_stream(method_value,
+                                                    header_value))
+
     def test_has_content_true(self):
         self.assertTrue(self.obj._has_content(spec.Basic.GetOk))
 
@@ -1003,6 +1171,26 @@ class ChannelTests(unittest.TestCase):
         self.obj._on_cancelok(frame_value)
         self.assertNotIn(consumer_tag, self.obj._consumers)
 
+    def test_on_cancel_removed_streaming(self):
+        self.obj._streaming.add('ctag0')
+        self.obj._on_cancel(frame.Method(1, spec.Basic.Cancel('ctag0')))
+        self.assertNotIn('ctag0', self.obj._streaming)
+
+    def test_on_cancelok_removed_streaming(self):
+        self.obj._streaming.add('ctag0')
+        self.obj._on_cancelok(frame.Method(1, spec.Basic.CancelOk('ctag0')))
+        self.assertNotIn('ctag0', self.obj._streaming)
+
+    def test_on_cancel_removed_bytearray_body(self):
+        self.obj._bytearray_bodies.add('ctag0')
+        self.obj._on_cancel(frame.Method(1, spec.Basic.Cancel('ctag0')))
+        self.assertNotIn('ctag0', self.obj._bytearray_bodies)
+
+    def test_on_cancelok_removed_bytearray_body(self):
+        self.obj._bytearray_bodies.add('ctag0')
+        self.obj._on_cancelok(frame.Method(1, spec.Basic.CancelOk('ctag0')))
+        self.assertNotIn('ctag0', self.obj._bytearray_bodies)
+
     def test_on_cancelok_removed_pending(self):
         consumer_tag = 'ctag0'
         self.obj._pending[consumer_tag] = logging.debug
@@ -1057,6 +1245,33 @@ class ChannelTests(unittest.TestCase):
                                      header_value.properties, body_value))
         self.assertListEqual(mock_callback.call_args_list, expectation)
 
+    def test_on_deliver_streaming_callback_called(self):
+        callback = self._consume_streaming()
+        method_value = frame.Method(1, spec.Basic.Deliver('ctag0', 1))
+        header_value = frame.Header(1, 10, spec.BasicProperties())
+        self.obj._on_deliver(method_value, header_value, '0123456789')
+        self.assertListEqual(
+            callback.call_args_list,
+            [mock.call(self.obj, method_value.method,
+                       header_value.properties, '0123456789'),
+             mock.call(self.obj, method_value.method,
+                       header_value.properties, None)])
+
+    def test_on_deliver_streaming_pending_callbacks_called(self):
+        callback = self._consume_streaming()
+        pending = (self.obj, spec.Basic.Deliver('ctag0', 1),
+                   spec.BasicProperties(), 'abc')
+        self.obj._pending['ctag0'].append(pending)
+        method_value = frame.Method(1, spec.Basic.Deliver('ctag0', 2))
+        header_value = frame.Header(1, 0, spec.BasicProperties())
+        self.obj._on_deliver(method_value, header_value, '')
+        self.assertListEqual(
+            callback.call_args_list,
+            [mock.call(*pending),
+             mock.call(self.obj, pending[1], pending[2], None),
+             mock.call(self.obj, method_value.method,
+                       header_value.properties, None)])
+
 
     @mock.patch('logging.Logger.debug')
     def test_on_getempty(self, debug):
@@ -6,6 +6,7 @@ import mock
 import random
 import urllib
 import copy
+import StringIO
 try:
     import unittest2 as unittest
 except ImportError:
@@ -14,6 +15,7 @@ except ImportError:
 from pika import connection
 from pika import channel
 from pika import credentials
+from pika import exceptions
 from pika import frame
 from pika import spec
 
@@ -382,6 +384,42 @@ class ConnectionTests(unittest.TestCase):
         self.assertEqual(['ab'], list(self.connection.outbound_buffer))
         self.assertEqual('hearbeat obj', self.connection.heartbeat)
 
+    def test_send_message_single_buffer(self):
+        """a message is appended to the outbound buffer as a single buffer"""
+        self.connection._flush_outbound = mock.Mock()
+        self.connection._body_max_length = 10
+        self.connection._send_message(1, spec.Basic.Publish(),
+                                      (spec.BasicProperties(), 'a' * 15))
+        self.assertEqual(1, len(self.connection.outbound_buffer))
+        self.assertEqual(4, self.connection.frames_sent)
+        self.assertEqual(len(self.connection.outbound_buffer[0]),
+                         self.connection.bytes_sent)
+        self.connection._flush_outbound.assert_called_once_with()
+
+    def test_send_message_file_body(self):
+        """a file body is appended as body frames after the method and header"""
+        self.connection._flush_outbound = mock.Mock()
+        self.connection._body_max_length = 10
+        self.connection._send_message(1, spec.Basic.Publish(),
+                                      (spec.BasicProperties(),
+                                       StringIO.StringIO('a' * 15)))
+        self.assertEqual(2, len(self.connection.outbound_buffer))
+        self.assertIsInstance(self.connection.outbound_buffer[1],
+                              frame.BodyFrames)
+        self.assertEqual(4, self.connection.frames_sent)
+        self.assertEqual(sum(map(len, self.connection.outbound_buffer)),
+                         self.connection.bytes_sent)
+
+    def test_send_message_empty_file_body(self):
+        """an empty file body has no body frames to append"""
+        self.connection._flush_outbound = mock.Mock()
+        self.connection._body_max_length = 10
+        self.connection._send_message(1, spec.Basic.Publish(),
+                                      (spec.BasicProperties(),
+                                       StringIO.StringIO('')))
+        self.assertEqual(1, len(self.connection.outbound_buffer))
+        self.assertEqual(2, self.connection.frames_sent)
+
     def test_on_connection_closed(self):
         """make sure connection close sends correct frames"""
         method_frame = mock.Mock()
@@ -396,25 +434,141 @@ class ConnectionTests(unittest.TestCase):
         self.connection.heartbeat.stop.assert_called_once_with()
         self.connection._adapter_disconnect.assert_called_once_with()
 
-    @mock.patch('pika.frame.decode_frame')
-    def test_on_data_available(self, decode_frame):
+    @mock.patch('pika.frame.decode_frames')
+    def test_on_data_available(self, decode_frames):
         """test on data available and process frame"""
-        data_in = ['data']
-        self.connection._frame_buffer = ['old_data']
+        data_in = 'da'
         for frame_type in (frame.Method, spec.Basic.Deliver, frame.Heartbeat):
             frame_value = mock.Mock(spec=frame_type)
-            frame_value.frame_type = 2
+            if frame_type == frame.Heartbeat:
+                frame_value.frame_type = spec.FRAME_HEARTBEAT
+            else:
+                frame_value.frame_type = 2
             frame_value.method = 2
             frame_value.channel_number = 1
             self.connection.bytes_received = 0
             self.connection.heartbeat = mock.Mock()
             self.connection.frames_received = 0
-            decode_frame.return_value = (2, frame_value)
+            decode_frames.return_value = ([frame_value], 2, None)
             self.connection._on_data_available(data_in)
             #test value
-            self.assertListEqual([], self.connection._frame_buffer)
+            self.assertEqual(0, self.connection._frame_buffer_offset)
+            self.assertEqual(0, self.connection._frame_buffer_end)
             self.assertEqual(2, self.connection.bytes_received)
             self.assertEqual(1, self.connection.frames_received)
             if frame_type == frame.Heartbeat:
                 self.assertTrue(self.connection.heartbeat.received.called)
 
+    def test_on_data_available_decodes_frames_in_place(self):
+        """all frames in one chunk are decoded from offsets into the buffer"""
+        heartbeat = frame.Heartbeat().marshal()
+        self.connection.heartbeat = mock.Mock()
+        self.connection._on_data_available(heartbeat * 3)
+        self.assertEqual(3, self.connection.heartbeat.received.call_count)
+        self.assertEqual(24, self.connection.bytes_received)
+        self.assertEqual(0, self.connection._frame_buffer_end)
+
+    def test_on_data_available_dispatches_frames_before_invalid_frame(self):
+        """frames decoded before an invalid frame are processed first"""
+        heartbeat = frame.Heartbeat().marshal()
+        self.connection.heartbeat = mock.Mock()
+        self.assertRaises(exceptions.InvalidFrameError,
+                          self.connection._on_data_available,
+                          heartbeat * 2 + heartbeat[:-1] + 'X')
+        self.assertEqual(2, self.connection.heartbeat.received.call_count)
+        self.assertEqual(16, self.connection._frame_buffer_offset)
+
+    def test_on_data_available_reentrant_frame_order(self):
+        """frames read while processing a frame are dispatched after the
+        frames that were already decoded"""
+        processed = list()
+
+        def process_frame(frame_value):
+            processed.append(frame_value.channel_number)
+            if frame_value.channel_number == 1:
+                self.connection._on_data_available(
+                    frame.Body(3, 'c').marshal())
+
+        self.connection._process_frame = process_frame
+        self.connection._on_data_available(frame.Body(1, 'a').marshal() +
+                                           frame.Body(2, 'b').marshal())
+        self.assertEqual([1, 2, 3], processed)
+
+    def test_on_data_available_keeps_partial_frame(self):
+        """a trailing partial frame is kept at the start of the buffer"""
+        heartbeat = frame.Heartbeat().marshal()
+        self.connection.heartbeat = mock.Mock()
+        self.connection._on_data_available(heartbeat + heartbeat[:3])
+        self.assertEqual(1, self.connection.heartbeat.received.call_count)
+        self.assertEqual(8, self.connection._frame_buffer_offset)
+        self.assertEqual(11, self.connection._frame_buffer_end)
+        self.connection._on_data_available(heartbeat[3:])
+        self.assertEqual(2, self.connection.heartbeat.received.call_count)
+        self.assertEqual(0, self.connection._frame_buffer_end)
+
+    def test_frame_buffer_space_reuses_buffer(self):
+        """the frame buffer is reused once all of its bytes are decoded"""
+        self.connection.heartbeat = mock.Mock()
+        self.connection._on_data_available(frame.Heartbeat().marshal())
+        frame_buffer = self.connection._frame_buffer
+        self.connection._on_data_available(frame.Heartbeat().marshal())
+        self.assertIs(frame_buffer, self.connection._frame_buffer)
+
+    def test_frame_buffer_space_size(self):
+        """the space returned has room for at least the size requested"""
+        self.assertGreaterEqual(
+            len(self.connection._frame_buffer_space(100)), 100)
+
+    def test_frame_buffer_space_moves_partial_frame(self):
+        """a partial frame is moved to the start when space runs out"""
+        heartbeat = frame.Heartbeat().marshal()
+        self.connection.heartbeat = mock.Mock()
+        self.connection._on_data_available(heartbeat + heartbeat[:3])
+        space = len(self.connection._frame_buffer) - 11
+        self.connection._frame_buffer_space(space + 1)
+        self.assertEqual(0, self.connection._frame_buffer_offset)
+        self.assertEqual(3, self.connection._frame_buffer_end)
+        self.assertEqual(bytearray(heartbeat[:3]),
+                         self.connection._frame_buffer[:3])
+
+    def test_frame_buffer_space_grows_buffer(self):
+        """the frame buffer is replaced by a larger one when needed"""
+        self.connection._on_data_available('abc')
+        size = len(self.connection._frame_buffer)
+        self.connection._frame_buffer_space(size)
+        self.assertGreaterEqual(len(self.connection._frame_buffer), size + 3)
+        self.assertEqual(bytearray('abc'),
+                         self.connection._frame_buffer[:3])
+
+    def test_on_frame_buffer_filled(self):
+        """frames received into the frame buffer space are processed"""
+        heartbeat = frame.Heartbeat().marshal()
+        self.connection.heartbeat = mock.Mock()
+        space = self.connection._frame_buffer_space(len(heartbeat) * 2)
+        space[:len(heartbeat) + 3] = heartbeat + heartbeat[:3]
+        self.connection._on_frame_buffer_filled(len(heartbeat) + 3)
+        self.assertEqual(1, self.connection.heartbeat.received.call_count)
+        self.assertEqual(len(heartbeat) + 3,
+                         self.connection._frame_buffer_end)
+
+    @mock.patch('pika.connection.Connection._process_callbacks')
+    def test_process_frame_delivers_content_frames_to_channel(self,
+                                                              process_callbacks):
+        """Basic.Deliver, header and body frames skip the callback lookup"""
+        frames = [frame.Method(1, spec.Basic.Deliver('ctag', 1)),
+                  frame.Header(1, 1, spec.BasicProperties()),
+                  frame.Body(1, 'a')]
+        for value in frames:
+            self.connection._process_frame(value)
+        self.assertFalse(process_callbacks.called)
+        self.assertEqual([mock.call(value) for value in frames],
+                         self.channel._handle_content_frame.call_args_list)
+        self.assertEqual(3, self.connection.frames_received)
+
+    @mock.patch('pika.connection.Connection._process_callbacks')
+    def test_process_frame_processes_callbacks_for_other_methods(
+            self, process_callbacks):
+        """method frames other than Basic.Deliver process their callbacks"""
+        value = frame.Method(1, spec.Basic.ConsumeOk('ctag'))
+        self.connection._process_frame(value)
+        process_callbacks.assert_called_once_with(value)
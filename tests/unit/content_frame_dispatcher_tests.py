@@ -4,6 +4,8 @@ Tests for pika.channel.ContentFrameDispatcher
 
 """
 import marshal
+import mmap
+import mock
 try:
     import unittest2 as unittest
 except ImportError:
@@ -30,7 +32,10 @@ class ContentFrameDispatcherTests(unittest.TestCase):
         self.assertEqual(self.obj._seen_so_far, 0)
 
     def test_init_body_fragments(self):
-        self.assertEqual(self.obj._body_fragments, list())
+        self.assertIsNone(self.obj._body_fragments)
+
+    def test_init_body(self):
+        self.assertIsNone(self.obj._body)
 
     def test_process_with_basic_deliver(self):
         value = frame.Method(1, spec.Basic.Deliver())
@@ -50,6 +55,31 @@ class ContentFrameDispatcherTests(unittest.TestCase):
         value = frame.Body(1, 'abc123')
         self.obj.process(value)
         self.assertEqual(self.obj._body_fragments, [value.fragment])
+        self.assertIsNone(self.obj._body)
+
+    def test_process_with_multiple_body_frames(self):
+        method_frame = frame.Method(1, spec.Basic.Deliver())
+        self.obj.process(method_frame)
+        header_frame = frame.Header(1, 9, spec.BasicProperties)
+        self.obj.process(header_frame)
+        self.assertIsNone(self.obj.process(frame.Body(1, 'abc')))
+        self.assertIsNone(self.obj.process(frame.Body(1, '123')))
+        response = self.obj.process(frame.Body(1, 'xyz'))
+        self.assertEqual(response, (method_frame, header_frame, 'abc123xyz'))
+
+    def test_process_with_multiple_body_frames_returns_str(self):
+        self.obj.process(frame.Method(1, spec.Basic.Deliver()))
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        body_value = self.obj.process(frame.Body(1, '123'))[2]
+        self.assertIsInstance(body_value, str)
+
+    def test_process_with_empty_body(self):
+        method_frame = frame.Method(1, spec.Basic.Deliver())
+        self.obj.process(method_frame)
+        header_frame = frame.Header(1, 0, spec.BasicProperties)
+        response = self.obj.process(header_frame)
+        self.assertEqual(response, (method_frame, header_frame, ''))
 
     def test_process_with_full_message(self):
         method_frame = frame.Method(1, spec.Basic.Deliver())
@@ -78,6 +108,13 @@ class ContentFrameDispatcherTests(unittest.TestCase):
         self.assertRaises(exceptions.BodyTooLongError,
                           self.obj.process, body_frame)
 
+    def test_process_with_second_body_frame_too_big(self):
+        self.obj.process(frame.Method(1, spec.Basic.Deliver()))
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        self.assertRaises(exceptions.BodyTooLongError,
+                          self.obj.process, frame.Body(1, 'd1234'))
+
     def test_process_with_unexpected_frame_type(self):
         value = frame.Method(1, spec.Basic.Qos())
         self.assertRaises(exceptions.UnexpectedFrameError,
@@ -121,7 +158,17 @@ class ContentFrameDispatcherTests(unittest.TestCase):
         body_frame = frame.Body(1, 'abc123')
         self.obj.process(body_frame)
         self.obj._reset()
-        self.assertEqual(self.obj._body_fragments, list())
+        self.assertIsNone(self.obj._body_fragments)
+
+    def test_reset_body(self):
+        method_frame = frame.Method(1, spec.Basic.Deliver())
+        self.obj.process(method_frame)
+        header_frame = frame.Header(1, 10, spec.BasicProperties)
+        self.obj.process(header_frame)
+        body_frame = frame.Body(1, 'abc123')
+        self.obj.process(body_frame)
+        self.obj._reset()
+        self.assertIsNone(self.obj._body)
 
     def test_ascii_body_instance(self):
         method_frame = frame.Method(1, spec.Basic.Deliver())
@@ -154,3 +201,213 @@ class ContentFrameDispatcherTests(unittest.TestCase):
         body_frame = frame.Body(1, marshal.dumps(expectation))
         method_frame, header_frame, body_value = self.obj.process(body_frame)
         self.assertEqual(marshal.loads(body_value), expectation)
+
+
+class ContentFrameDispatcherBytearrayTests(unittest.TestCase):
+
+    def setUp(self):
+        self.bytearray_callback = mock.Mock(return_value=True)
+        self.obj = channel.ContentFrameDispatcher(
+            bytearray_callback=self.bytearray_callback)
+
+    def test_bytearray_callback_called_with_frames(self):
+        method_frame = frame.Method(1, spec.Basic.Deliver())
+        header_frame = frame.Header(1, 6, spec.BasicProperties)
+        self.obj.process(method_frame)
+        self.obj.process(header_frame)
+        self.bytearray_callback.assert_called_once_with(method_frame,
+                                                        header_frame)
+
+    def test_bytearray_callback_declined_returns_str(self):
+        self.bytearray_callback.return_value = False
+        self.obj.process(frame.Method(1, spec.Basic.Deliver()))
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        body_value = self.obj.process(frame.Body(1, '123'))[2]
+        self.assertEqual(body_value, 'abc123')
+        self.assertIsInstance(body_value, str)
+
+    def test_process_with_single_body_frame_returns_str(self):
+        self.obj.process(frame.Method(1, spec.Basic.Deliver()))
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        body_value = self.obj.process(frame.Body(1, 'abc123'))[2]
+        self.assertIsInstance(body_value, str)
+
+    def test_process_with_body_frame_partial(self):
+        self.obj.process(frame.Method(1, spec.Basic.Deliver()))
+        self.obj.process(frame.Header(1, 100, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc123'))
+        self.assertEqual(self.obj._body, bytearray('abc123' + '\x00' * 94))
+
+    def test_process_with_body_frame_partial_allocates_body_size(self):
+        self.obj.process(frame.Method(1, spec.Basic.Deliver()))
+        self.obj.process(frame.Header(1, 100, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc123'))
+        self.assertEqual(len(self.obj._body), 100)
+
+    def test_process_with_multiple_body_frames(self):
+        method_frame = frame.Method(1, spec.Basic.Deliver())
+        self.obj.process(method_frame)
+        header_frame = frame.Header(1, 9, spec.BasicProperties)
+        self.obj.process(header_frame)
+        self.assertIsNone(self.obj.process(frame.Body(1, 'abc')))
+        self.assertIsNone(self.obj.process(frame.Body(1, '123')))
+        response = self.obj.process(frame.Body(1, 'xyz'))
+        self.assertEqual(response, (method_frame, header_frame,
+                                    bytearray('abc123xyz')))
+
+    def test_process_with_multiple_body_frames_returns_bytearray(self):
+        self.obj.process(frame.Method(1, spec.Basic.Deliver()))
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        body_value = self.obj.process(frame.Body(1, '123'))[2]
+        self.assertIsInstance(body_value, bytearray)
+
+    def test_process_with_multiple_body_frames_body_is_resizable(self):
+        self.obj.process(frame.Method(1, spec.Basic.Deliver()))
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        body_value = self.obj.process(frame.Body(1, '123'))[2]
+        body_value.extend('xyz')
+        self.assertEqual(body_value, bytearray('abc123xyz'))
+
+
+class ContentFrameDispatcherStreamTests(unittest.TestCase):
+
+    def setUp(self):
+        self.body_stream = mock.Mock()
+        self.stream_callback = mock.Mock(return_value=self.body_stream)
+        self.obj = channel.ContentFrameDispatcher(self.stream_callback)
+        self.method_frame = frame.Method(1, spec.Basic.Deliver())
+        self.obj.process(self.method_frame)
+
+    def test_header_calls_stream_callback(self):
+        header_frame = frame.Header(1, 6, spec.BasicProperties)
+        self.obj.process(header_frame)
+        self.stream_callback.assert_called_once_with(self.method_frame,
+                                                     header_frame)
+
+    def test_empty_body_does_not_call_stream_callback(self):
+        self.obj.process(frame.Header(1, 0, spec.BasicProperties))
+        self.assertFalse(self.stream_callback.called)
+
+    def test_empty_body_returns_message(self):
+        header_frame = frame.Header(1, 0, spec.BasicProperties)
+        self.assertEqual(self.obj.process(header_frame),
+                         (self.method_frame, header_frame, ''))
+
+    def test_body_frames_are_streamed(self):
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.assertIsNone(self.obj.process(frame.Body(1, 'abc')))
+        self.assertIsNone(self.obj.process(frame.Body(1, '123')))
+        self.assertListEqual(self.body_stream.call_args_list,
+                             [mock.call('abc'), mock.call('123'),
+                              mock.call(None)])
+
+    def test_body_is_not_assembled(self):
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        self.assertIsNone(self.obj._body)
+
+    def test_reset_after_streamed_body(self):
+        self.obj.process(frame.Header(1, 3, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        self.assertIsNone(self.obj._body_stream)
+        self.assertIsNone(self.obj._method_frame)
+
+    def test_streamed_body_too_big(self):
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        self.assertRaises(exceptions.BodyTooLongError,
+                          self.obj.process, frame.Body(1, 'd1234'))
+        self.body_stream.assert_called_once_with('abc')
+        self.assertIsNone(self.obj._body_stream)
+
+    def test_discard_drops_streamed_body(self):
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        self.obj.discard()
+        self.body_stream.assert_called_once_with('abc')
+        self.assertIsNone(self.obj._body_stream)
+        self.assertIsNone(self.obj._method_frame)
+
+    def test_body_assembled_without_body_stream(self):
+        self.stream_callback.return_value = None
+        header_frame = frame.Header(1, 6, spec.BasicProperties)
+        self.obj.process(header_frame)
+        self.obj.process(frame.Body(1, 'abc'))
+        self.assertEqual(self.obj.process(frame.Body(1, '123')),
+                         (self.method_frame, header_frame,
+                          bytearray('abc123')))
+
+
+class ContentFrameDispatcherLargeBodyTests(unittest.TestCase):
+
+    def setUp(self):
+        self.obj = channel.ContentFrameDispatcher()
+        self.obj.large_body_threshold = 5
+        self.method_frame = frame.Method(1, spec.Basic.Deliver())
+        self.obj.process(self.method_frame)
+
+    def test_init_large_body_threshold(self):
+        self.assertIsNone(channel.ContentFrameDispatcher().large_body_threshold)
+
+    def test_body_above_threshold_returns_mmap(self):
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        body_value = self.obj.process(frame.Body(1, '123'))[2]
+        self.assertIsInstance(body_value, mmap.mmap)
+
+    def test_body_above_threshold_value(self):
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        body_value = self.obj.process(frame.Body(1, '123'))[2]
+        self.assertEqual(len(body_value), 6)
+        self.assertEqual(body_value[:], 'abc123')
+
+    def test_single_frame_body_above_threshold_returns_mmap(self):
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        body_value = self.obj.process(frame.Body(1, 'abc123'))[2]
+        self.assertEqual(body_value[2:4], 'c1')
+
+    def test_body_above_threshold_is_read_only(self):
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        body_value = self.obj.process(frame.Body(1, 'abc123'))[2]
+        self.assertRaises(TypeError, body_value.write, 'x')
+
+    def test_body_above_threshold_not_assembled(self):
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        self.assertIsNone(self.obj._body)
+        self.assertIsNotNone(self.obj._body_file)
+
+    def test_body_at_threshold_in_memory(self):
+        self.obj.process(frame.Header(1, 5, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        body_value = self.obj.process(frame.Body(1, '12'))[2]
+        self.assertEqual(body_value, bytearray('abc12'))
+
+    def test_body_file_closed_after_finish(self):
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        body_file = self.obj._body_file
+        self.obj.process(frame.Body(1, '123'))
+        self.assertTrue(body_file.closed)
+        self.assertIsNone(self.obj._body_file)
+
+    def test_discard_closes_body_file(self):
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        body_file = self.obj._body_file
+        self.obj.discard()
+        self.assertTrue(body_file.closed)
+        self.assertIsNone(self.obj._body_file)
+
+    def test_body_above_threshold_too_big(self):
+        self.obj.process(frame.Header(1, 6, spec.BasicProperties))
+        self.obj.process(frame.Body(1, 'abc'))
+        body_file = self.obj._body_file
+        self.assertRaises(exceptions.BodyTooLongError,
+                          self.obj.process, frame.Body(1, 'd1234'))
+        self.assertTrue(body_file.closed)
+        self.assertIsNone(self.obj._body_file)
@@ -69,3 +69,43 @@ class DataTests(unittest.TestCase):
         self.assertRaises(exceptions.InvalidFieldTypeException,
                           data.decode_table,
                           '\x00\x00\x00\t\x03fooZ\x00\x00\x04\xd2', 0)
+
+    def test_decode_value_type_codes(self):
+        values = (('t\x01', True),
+                  ('b\xff', 255),
+                  ('B\xff', -1),
+                  ('U\xff\xfe', -2),
+                  ('u\xff\xfe', 65534),
+                  ('I\xff\xff\xff\xfe', -2),
+                  ('i\xff\xff\xff\xfe', 4294967294),
+                  ('L\xff\xff\xff\xff\xff\xff\xff\xfe', -2),
+                  ('l\x00\x00\x00\x00\x00\x00\x00\x02', 2),
+                  ('s\x03foo', u'foo'),
+                  ('S\x00\x00\x00\x03foo', u'foo'),
+                  ('V', None))
+        for encoded, expectation in values:
+            self.assertEqual(data.decode_value(encoded, 0),
+                             (expectation, len(encoded)))
+
+    def test_decode_value_raises(self):
+        self.assertRaises(exceptions.InvalidFieldTypeException,
+                          data.decode_value, 'Z\x00', 0)
+
+    def test_encode_value_subclass(self):
+        class Header(str):
+            pass
+        pieces = []
+        self.assertEqual(data.encode_value(pieces, Header('foo')), 8)
+        self.assertEqual(''.join(pieces), 'S\x00\x00\x00\x03foo')
+
+    def test_encode_table_unicode_key(self):
+        pieces = []
+        data.encode_table(pieces, {u'✓': 1})
+        self.assertEqual(''.join(pieces),
+                         '\x00\x00\x00\t\x03\xe2\x9c\x93I\x00\x00\x00\x01')
+
+    def test_encode_table_round_trip_repeated_keys(self):
+        for value in ({'key': 'first'}, {'key': 'second'}):
+            pieces = []
+            data.encode_table(pieces, value)
+            self.assertEqual(data.decode_table(''.join(pieces), 0)[0], value)
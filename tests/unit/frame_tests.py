@@ -2,6 +2,9 @@
 Tests for pika.frame
 
 """
+import mmap
+import tempfile
+import StringIO
 try:
     import unittest2 as unittest
 except ImportError:
@@ -114,3 +117,234 @@ class FrameTests(unittest.TestCase):
         self.assertRaises(exceptions.InvalidFrameError,
                           frame.decode_frame,
                           '\x09\x00\x00\x00\x00\x00\x00\xce')
+
+    def decode_frame_with_offset_bytes_consumed_test(self):
+        self.assertEqual(frame.decode_frame(self.HEARTBEAT + self.BASIC_ACK,
+                                            8)[0], 21)
+
+    def decode_frame_with_offset_method_test(self):
+        self.assertIsInstance(frame.decode_frame(self.HEARTBEAT +
+                                                 self.BASIC_ACK, 8)[1].method,
+                              spec.Basic.Ack)
+
+    def decode_frame_from_bytearray_test(self):
+        value = frame.decode_frame(bytearray(self.BODY_FRAME))[1]
+        self.assertEqual(value.fragment, self.BODY_FRAME_VALUE)
+        self.assertIsInstance(value.fragment, str)
+
+    def decode_frame_with_offset_incomplete_test(self):
+        self.assertEqual(frame.decode_frame(self.HEARTBEAT +
+                                            self.BASIC_ACK[:-1], 8),
+                         (0, None))
+
+    def decode_frames_types_test(self):
+        frames, offset, error = frame.decode_frames(
+            self.HEARTBEAT + self.BASIC_ACK + self.BODY_FRAME)
+        self.assertEqual([type(value) for value in frames],
+                         [frame.Heartbeat, frame.Method, frame.Body])
+
+    def decode_frames_offset_test(self):
+        data = self.HEARTBEAT + self.BASIC_ACK + self.BODY_FRAME
+        self.assertEqual(frame.decode_frames(data)[1], len(data))
+
+    def decode_frames_partial_frame_test(self):
+        frames, offset, error = frame.decode_frames(self.HEARTBEAT +
+                                                    self.BASIC_ACK[:-1])
+        self.assertEqual((len(frames), offset), (1, 8))
+
+    def decode_frames_with_offset_test(self):
+        frames, offset, error = frame.decode_frames(
+            self.HEARTBEAT + self.BASIC_ACK, 8)
+        self.assertEqual((len(frames), offset), (1, 29))
+        self.assertIsInstance(frames[0].method, spec.Basic.Ack)
+
+    def decode_frames_end_test(self):
+        frames, offset, error = frame.decode_frames(self.HEARTBEAT * 3, 0, 16)
+        self.assertEqual((len(frames), offset), (2, 16))
+
+    def decode_frames_end_partial_frame_test(self):
+        frames, offset, error = frame.decode_frames(self.HEARTBEAT * 2, 0, 12)
+        self.assertEqual((len(frames), offset), (1, 8))
+
+    def decode_frame_end_partial_header_test(self):
+        self.assertEqual(frame.decode_frame(self.HEARTBEAT, 0, 5), (0, None))
+
+    def decode_frames_empty_test(self):
+        self.assertEqual(frame.decode_frames(self.HEARTBEAT, 8),
+                         ([], 8, None))
+
+    def decode_frames_invalid_frame_test(self):
+        frames, offset, error = frame.decode_frames(
+            self.HEARTBEAT + self.BASIC_ACK[:-1] + 'X' + self.HEARTBEAT)
+        self.assertEqual((len(frames), offset), (1, 8))
+        self.assertIsInstance(frames[0], frame.Heartbeat)
+        self.assertIsInstance(error, exceptions.InvalidFrameError)
+
+    def _message_frames(self, body, body_max_length):
+        method = spec.Basic.Publish(exchange='ex', routing_key='rk')
+        props = spec.BasicProperties(content_type='text/plain')
+        frames = [frame.Method(1, method).marshal(),
+                  frame.Header(1, len(body), props).marshal()]
+        for offset in range(0, len(body), body_max_length):
+            frames.append(frame.Body(1, body[offset:offset +
+                                             body_max_length]).marshal())
+        return (frame.marshal_message(1, method, props, body,
+                                      body_max_length),
+                ''.join(frames), len(frames))
+
+    def marshal_message_test(self):
+        value, expectation, frame_count = self._message_frames('a' * 25, 10)
+        self.assertEqual(value, (bytearray(expectation), frame_count))
+
+    def marshal_message_exact_body_frames_test(self):
+        value, expectation, frame_count = self._message_frames('a' * 20, 10)
+        self.assertEqual(value, (bytearray(expectation), frame_count))
+
+    def marshal_message_empty_body_test(self):
+        value, expectation, frame_count = self._message_frames('', 10)
+        self.assertEqual(value, (bytearray(expectation), 2))
+
+    def marshal_message_type_test(self):
+        self.assertIsInstance(self._message_frames('body', 10)[0][0],
+                              bytearray)
+
+    def _marshal_parts(self, parts, body_max_length):
+        method = spec.Basic.Publish(exchange='ex', routing_key='rk')
+        props = spec.BasicProperties(content_type='text/plain')
+        return frame.marshal_message(1, method, props, parts, body_max_length)
+
+    def marshal_message_body_parts_test(self):
+        parts = ['envelope:', 'a' * 25, ':trailer']
+        expectation = self._marshal_parts(''.join(parts), 10)
+        self.assertEqual(self._marshal_parts(parts, 10), expectation)
+
+    def marshal_message_body_parts_single_frame_test(self):
+        parts = ['abc', bytearray('def'), memoryview('ghi')]
+        self.assertEqual(self._marshal_parts(parts, 10),
+                         self._marshal_parts('abcdefghi', 10))
+
+    def marshal_message_body_parts_frame_count_test(self):
+        self.assertEqual(self._marshal_parts(['abc', 'defg', 'hij'], 5)[1], 4)
+
+    def marshal_message_body_parts_exact_frames_test(self):
+        parts = ['abcde', 'fghij']
+        self.assertEqual(self._marshal_parts(parts, 5),
+                         self._marshal_parts('abcdefghij', 5))
+
+    def marshal_message_body_parts_tuple_test(self):
+        parts = ('abc', 'defg', 'hij')
+        self.assertEqual(self._marshal_parts(parts, 4),
+                         self._marshal_parts('abcdefghij', 4))
+
+    def marshal_message_body_parts_buffer_types_test(self):
+        parts = [bytearray('abc'), memoryview('xdefgx')[1:5], 'hij']
+        self.assertEqual(self._marshal_parts(parts, 4),
+                         self._marshal_parts('abcdefghij', 4))
+
+    def marshal_message_body_parts_empty_parts_test(self):
+        parts = ['', 'abc', '', 'def', '']
+        self.assertEqual(self._marshal_parts(parts, 4),
+                         self._marshal_parts('abcdef', 4))
+
+    def marshal_message_empty_body_parts_test(self):
+        self.assertEqual(self._marshal_parts([], 4),
+                         self._marshal_parts('', 4))
+
+    def marshal_message_body_frames_test(self):
+        method = spec.Basic.Publish(exchange='ex', routing_key='rk')
+        props = spec.BasicProperties(content_type='text/plain')
+        body = frame.BodyFrames(1, StringIO.StringIO('a' * 25), 10)
+        expectation = ''.join([frame.Method(1, method).marshal(),
+                               frame.Header(1, 25, props).marshal()])
+        self.assertEqual(frame.marshal_message(1, method, props, body, 10),
+                         (bytearray(expectation), 2))
+
+
+class BodyFramesTests(unittest.TestCase):
+
+    def _body_file(self, value):
+        body = tempfile.TemporaryFile()
+        body.write(value)
+        body.seek(0)
+        self.addCleanup(body.close)
+        return body
+
+    def _marshal_all(self, body_frames):
+        frames = list()
+        while body_frames:
+            frames.append(str(body_frames.marshal_next()))
+        return frames
+
+    def _expected_frames(self, value, body_max_length):
+        return [frame.Body(1, value[offset:offset + body_max_length]).marshal()
+                for offset in range(0, len(value), body_max_length)]
+
+    def body_size_test(self):
+        body_frames = frame.BodyFrames(1, self._body_file('a' * 25), 10)
+        self.assertEqual(body_frames.body_size, 25)
+
+    def body_size_from_position_test(self):
+        body = self._body_file('a' * 25)
+        body.seek(5)
+        self.assertEqual(frame.BodyFrames(1, body, 10).body_size, 20)
+
+    def frame_count_test(self):
+        body_frames = frame.BodyFrames(1, self._body_file('a' * 25), 10)
+        self.assertEqual(body_frames.frame_count, 3)
+
+    def len_test(self):
+        body_frames = frame.BodyFrames(1, self._body_file('a' * 25), 10)
+        self.assertEqual(len(body_frames), 25 + 3 * 8)
+
+    def len_after_marshal_next_test(self):
+        body_frames = frame.BodyFrames(1, self._body_file('a' * 25), 10)
+        body_frames.marshal_next()
+        self.assertEqual(len(body_frames), 15 + 2 * 8)
+
+    def next_frame_size_test(self):
+        body_frames = frame.BodyFrames(1, self._body_file('a' * 25), 10)
+        body_frames.marshal_next()
+        body_frames.marshal_next()
+        self.assertEqual(body_frames.next_frame_size, 5 + 8)
+
+    def file_frames_test(self):
+        value = ''.join([chr(i) for i in range(256)])
+        body_frames = frame.BodyFrames(1, self._body_file(value), 100)
+        self.assertEqual(self._marshal_all(body_frames),
+                         self._expected_frames(value, 100))
+
+    def file_without_readinto_frames_test(self):
+        value = 'abcdefghijklmnopqrstuvwxy'
+        body_frames = frame.BodyFrames(1, StringIO.StringIO(value), 10)
+        self.assertEqual(self._marshal_all(body_frames),
+                         self._expected_frames(value, 10))
+
+    def mmap_frames_test(self):
+        value = 'abcdefghijklmnopqrstuvwxy'
+        body = mmap.mmap(self._body_file(value).fileno(), 0,
+                         access=mmap.ACCESS_READ)
+        body_frames = frame.BodyFrames(1, body, 10)
+        self.assertEqual(self._marshal_all(body_frames),
+                         self._expected_frames(value, 10))
+
+    def mmap_position_unchanged_test(self):
+        body = mmap.mmap(self._body_file('a' * 25).fileno(), 0,
+                         access=mmap.ACCESS_READ)
+        self._marshal_all(frame.BodyFrames(1, body, 10))
+        self.assertEqual(body.tell(), 0)
+
+    def marshal_next_type_test(self):
+        body_frames = frame.BodyFrames(1, self._body_file('abc'), 10)
+        self.assertIsInstance(body_frames.marshal_next(), bytearray)
+
+    def body_released_test(self):
+        body_frames = frame.BodyFrames(1, self._body_file('abc'), 10)
+        body_frames.marshal_next()
+        self.assertIsNone(body_frames._body)
+
+    def truncated_body_raises_test(self):
+        body = self._body_file('a' * 25)
+        body_frames = frame.BodyFrames(1, body, 10)
+        body.truncate(15)
+        body_frames.marshal_next()
+        self.assertRaises(IOError, body_frames.marshal_next)
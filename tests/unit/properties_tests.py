@@ -0,0 +1,283 @@
+"""
+Tests for pika.properties
+
+"""
+import mock
+import pickle
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pika import properties
+from pika import spec
+
+
+class LazyBasicPropertiesTests(unittest.TestCase):
+
+    PROPERTIES = spec.BasicProperties(content_type='application/json',
+                                      content_encoding='gzip',
+                                      headers={'key': 'value', 'count': 1},
+                                      delivery_mode=2,
+                                      priority=5,
+                                      correlation_id='correlation',
+                                      reply_to='reply.to',
+                                      expiration='60000',
+                                      message_id='message.id',
+                                      timestamp=1380000000,
+                                      type='type',
+                                      user_id='guest',
+                                      app_id='app',
+                                      cluster_id='cluster')
+
+    FIELDS = ('content_type', 'content_encoding', 'headers', 'delivery_mode',
+              'priority', 'correlation_id', 'reply_to', 'expiration',
+              'message_id', 'timestamp', 'type', 'user_id', 'app_id',
+              'cluster_id')
+
+    def setUp(self):
+        self.encoded = 'prefix' + ''.join(self.PROPERTIES.encode())
+        self.obj = properties.LazyBasicProperties().decode(self.encoded, 6)
+
+    def test_is_basic_properties(self):
+        self.assertIsInstance(self.obj, spec.BasicProperties)
+
+    def test_props_uses_lazy_basic_properties(self):
+        self.assertIs(properties.props[spec.BasicProperties.INDEX],
+                      properties.LazyBasicProperties)
+
+    def test_decode_does_not_decode_properties(self):
+        for name in self.FIELDS:
+            self.assertNotIn(name, properties._instance_dict(self.obj))
+
+    def test_decoded_values(self):
+        for name in self.FIELDS:
+            self.assertEqual(getattr(self.obj, name),
+                             getattr(self.PROPERTIES, name))
+
+    def test_unset_values(self):
+        obj = properties.LazyBasicProperties().decode(
+            ''.join(spec.BasicProperties(priority=1).encode()))
+        for name in self.FIELDS:
+            if name != 'priority':
+                self.assertIsNone(getattr(obj, name))
+
+    def test_values_without_decode(self):
+        obj = properties.LazyBasicProperties()
+        for name in self.FIELDS:
+            self.assertIsNone(getattr(obj, name))
+
+    def test_constructor_values(self):
+        obj = properties.LazyBasicProperties(content_type='text/plain')
+        self.assertEqual(obj.content_type, 'text/plain')
+
+    @mock.patch('pika.data.decode_table')
+    def test_headers_not_decoded_for_other_properties(self, decode_table):
+        self.assertEqual(self.obj.content_type, 'application/json')
+        self.assertFalse(decode_table.called)
+
+    @mock.patch('pika.data.decode_table')
+    def test_headers_decoded_once(self, decode_table):
+        decode_table.return_value = ({'key': 'value'}, 0)
+        self.obj.headers
+        self.obj.headers
+        decode_table.assert_called_once_with(self.encoded, 30)
+
+    def test_assigned_value_is_kept(self):
+        self.obj.content_type = 'text/plain'
+        self.assertEqual(self.obj.content_type, 'text/plain')
+
+    def test_assigned_value_is_kept_when_decoding(self):
+        self.obj.headers = {'other': 'value'}
+        self.assertEqual(self.obj.reply_to, 'reply.to')
+        self.assertEqual(self.obj.headers, {'other': 'value'})
+
+    def test_decode_resets_values(self):
+        self.obj.content_type = 'text/plain'
+        self.obj.decode(self.encoded, 6)
+        self.assertEqual(self.obj.content_type, 'application/json')
+
+    def test_encode(self):
+        self.assertEqual(''.join(self.obj.encode()),
+                         ''.join(self.PROPERTIES.encode()))
+
+    def test_repr(self):
+        self.assertEqual(repr(self.obj),
+                         repr(spec.BasicProperties().decode(self.encoded, 6)))
+
+    def test_unknown_attribute(self):
+        self.assertRaises(AttributeError, getattr, self.obj, 'unknown')
+
+    def test_vars(self):
+        self.assertEqual(vars(self.obj), vars(self.PROPERTIES))
+
+    def test_dict_keeps_assigned_value(self):
+        self.obj.content_type = 'text/plain'
+        self.assertEqual(self.obj.__dict__['content_type'], 'text/plain')
+        self.assertEqual(self.obj.__dict__['headers'],
+                         {'key': 'value', 'count': 1})
+
+    def test_pickle(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            obj = pickle.loads(pickle.dumps(self.obj, protocol))
+            self.assertIsInstance(obj, properties.LazyBasicProperties)
+            self.assertEqual(vars(obj), vars(self.PROPERTIES))
+
+    def test_pickle_keeps_assigned_value(self):
+        self.obj.priority = 1
+        obj = pickle.loads(pickle.dumps(self.obj))
+        self.assertEqual(obj.priority, 1)
+        self.assertEqual(obj.app_id, 'app')
+
+
+class FrozenBasicPropertiesTests(unittest.TestCase):
+
+    HEADERS = {'key': 'value', 'count': 1}
+
+    def setUp(self):
+        self.obj = properties.FrozenBasicProperties(content_type='text/plain',
+                                                    delivery_mode=2,
+                                                    headers=self.HEADERS)
+
+    def test_is_basic_properties(self):
+        self.assertIsInstance(self.obj, spec.BasicProperties)
+
+    def test_values(self):
+        self.assertEqual((self.obj.content_type, self.obj.delivery_mode,
+                          self.obj.headers, self.obj.priority),
+                         ('text/plain', 2, self.HEADERS, None))
+
+    def test_headers_are_copied(self):
+        self.assertIsNot(self.obj.headers, self.HEADERS)
+
+    def test_encode(self):
+        expectation = spec.BasicProperties(content_type='text/plain',
+                                           delivery_mode=2,
+                                           headers=self.HEADERS).encode()
+        self.assertEqual(self.obj.encode(), [''.join(expectation)])
+
+    @mock.patch('pika.spec.BasicProperties.encode')
+    def test_encode_is_cached(self, encode):
+        encode.return_value = ['encoded']
+        obj = properties.FrozenBasicProperties(content_type='text/plain')
+        obj.encode()
+        obj.encode()
+        encode.assert_called_once_with(obj)
+
+    def test_encode_returns_new_list(self):
+        self.obj.encode().append('value')
+        self.assertEqual(len(self.obj.encode()), 1)
+
+    def test_set_attribute_raises(self):
+        self.assertRaises(AttributeError, setattr, self.obj,
+                          'content_type', 'application/json')
+
+    def test_del_attribute_raises(self):
+        self.assertRaises(AttributeError, delattr, self.obj, 'content_type')
+
+    def test_repr(self):
+        self.assertEqual(repr(self.obj),
+                         repr(spec.BasicProperties(content_type='text/plain',
+                                                   delivery_mode=2,
+                                                   headers=self.HEADERS)))
+
+    def test_pickle(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            obj = pickle.loads(pickle.dumps(self.obj, protocol))
+            self.assertIsInstance(obj, properties.FrozenBasicProperties)
+            self.assertEqual(vars(obj), vars(self.obj))
+            self.assertEqual(obj.encode(), self.obj.encode())
+
+    def test_pickled_is_immutable(self):
+        obj = pickle.loads(pickle.dumps(self.obj))
+        self.assertRaises(AttributeError, setattr, obj,
+                          'content_type', 'application/json')
+
+
+class BasicPropertiesTemplateTests(unittest.TestCase):
+
+    CONSTANT = {'service': 'billing', 'schema-version': 3}
+    VARIABLE = {'trace-id': 'abcdef'}
+
+    def setUp(self):
+        self.template = properties.BasicPropertiesTemplate(
+            content_type='application/json', content_encoding='gzip',
+            delivery_mode=2, app_id='publisher', headers=self.CONSTANT)
+
+    def _decode(self, value):
+        decoded = spec.BasicProperties()
+        decoded.decode(''.join(value.encode()))
+        return decoded
+
+    def test_render_encodes_merged_headers(self):
+        headers = dict(self.CONSTANT)
+        headers.update(self.VARIABLE)
+        decoded = self._decode(self.template.render(self.VARIABLE))
+        self.assertEqual((decoded.content_type, decoded.content_encoding,
+                          decoded.headers, decoded.delivery_mode,
+                          decoded.app_id),
+                         ('application/json', 'gzip', headers, 2,
+                          'publisher'))
+
+    def test_render_without_headers(self):
+        decoded = self._decode(self.template.render())
+        self.assertEqual(decoded.headers, self.CONSTANT)
+
+    def test_template_without_headers(self):
+        template = properties.BasicPropertiesTemplate(delivery_mode=2)
+        decoded = self._decode(template.render(self.VARIABLE))
+        self.assertEqual((decoded.headers, decoded.delivery_mode),
+                         (self.VARIABLE, 2))
+
+    def test_render_constant_key_raises(self):
+        self.assertRaises(ValueError, self.template.render,
+                          {'service': 'other'})
+
+    def test_render_encodes_variable_headers_only(self):
+        with mock.patch('pika.data.encode_table',
+                        wraps=properties.data.encode_table) as encode_table:
+            self.template.render(self.VARIABLE)
+        encode_table.assert_called_once_with(mock.ANY, self.VARIABLE)
+
+    def test_rendered_values(self):
+        value = self.template.render(self.VARIABLE)
+        headers = dict(self.CONSTANT)
+        headers.update(self.VARIABLE)
+        self.assertEqual((value.content_type, value.headers, value.priority),
+                         ('application/json', headers, None))
+
+    def test_rendered_headers_are_copied(self):
+        headers = dict(self.VARIABLE)
+        value = self.template.render(headers)
+        headers['trace-id'] = 'changed'
+        headers['other'] = 1
+        expected = dict(self.CONSTANT)
+        expected.update(self.VARIABLE)
+        self.assertEqual(value.headers, expected)
+        self.assertEqual(self._decode(value).headers, expected)
+
+    def test_rendered_is_immutable(self):
+        self.assertRaises(AttributeError, setattr,
+                          self.template.render(self.VARIABLE),
+                          'content_type', 'text/plain')
+
+    def test_rendered_vars(self):
+        value = self.template.render(self.VARIABLE)
+        headers = dict(self.CONSTANT)
+        headers.update(self.VARIABLE)
+        self.assertEqual(vars(value),
+                         vars(spec.BasicProperties(
+                             content_type='application/json',
+                             content_encoding='gzip', delivery_mode=2,
+                             app_id='publisher', headers=headers)))
+
+    def test_rendered_pickle(self):
+        value = self.template.render(self.VARIABLE)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            obj = pickle.loads(pickle.dumps(value, protocol))
+            self.assertEqual(vars(obj), vars(value))
+            self.assertEqual(self._decode(obj).headers, value.headers)
+
+    def test_rendered_unknown_attribute(self):
+        self.assertRaises(AttributeError, getattr,
+                          self.template.render(self.VARIABLE), 'unknown')
@@ -0,0 +1,325 @@
+"""
+Tests for pika.adapters.select_connection
+
+"""
+import select
+import socket
+import time
+
+import mock
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pika.adapters import select_connection
+
+
+class SelectPollerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.obj = select_connection.SelectPoller(0, mock.Mock(),
+                                                  select_connection.READ,
+                                                  mock.Mock())
+
+    def test_get_poll_timeout_without_timeouts(self):
+        self.assertEqual(self.obj.get_poll_timeout(),
+                         select_connection.SelectPoller.TIMEOUT)
+
+    @mock.patch('time.time', return_value=100)
+    def test_get_poll_timeout_rounds_up_to_next_timeout(self, unused_time):
+        self.obj.add_timeout(0.0101, mock.Mock())
+        self.assertEqual(self.obj.get_poll_timeout(), 0.011)
+
+    def test_process_timeouts(self):
+        callback = mock.Mock()
+        self.obj.add_timeout(-1, callback)
+        self.obj.process_timeouts()
+        callback.assert_called_once_with()
+
+    def test_remove_timeout(self):
+        callback = mock.Mock()
+        self.obj.remove_timeout(self.obj.add_timeout(-1, callback))
+        self.obj.process_timeouts()
+        self.assertFalse(callback.called)
+
+
+class MultipleHandlerTests(object):
+
+    POLLER = None
+
+    def setUp(self):
+        self.pairs = [socket.socketpair() for _ in xrange(3)]
+        self.handlers = [mock.Mock() for _ in self.pairs]
+        self.state_managers = [mock.Mock() for _ in self.pairs]
+        self.obj = self.POLLER()
+        for (reader, writer), handler, state_manager in zip(
+                self.pairs, self.handlers, self.state_managers):
+            self.obj.add_handler(reader.fileno(), handler,
+                                 select_connection.READ, state_manager)
+        self.timeout = self.obj.add_timeout(0, mock.Mock())
+
+    def tearDown(self):
+        for reader, writer in self.pairs:
+            reader.close()
+            writer.close()
+
+    def test_poll_dispatches_to_ready_handlers(self):
+        self.pairs[0][1].send('x')
+        self.pairs[2][1].send('x')
+        self.obj.poll()
+        for index in (0, 2):
+            self.handlers[index].assert_called_once_with(
+                self.pairs[index][0].fileno(), select_connection.READ,
+                write_only=False)
+        self.assertFalse(self.handlers[1].called)
+
+    def test_poll_skips_removed_handler(self):
+        self.obj.remove_handler(self.pairs[0][0].fileno())
+        self.pairs[0][1].send('x')
+        self.pairs[1][1].send('x')
+        self.obj.poll()
+        self.assertFalse(self.handlers[0].called)
+        self.assertTrue(self.handlers[1].called)
+
+    def test_poll_skips_handler_removed_while_dispatching(self):
+        filenos = [reader.fileno() for reader, writer in self.pairs]
+        for handler in self.handlers:
+            handler.side_effect = lambda *args, **kwargs: [
+                self.obj.remove_handler(fileno) for fileno in filenos]
+        for reader, writer in self.pairs:
+            writer.send('x')
+        self.obj.poll()
+        self.assertEqual(sum([handler.call_count
+                              for handler in self.handlers]), 1)
+
+    def test_update_handler(self):
+        fileno = self.pairs[1][0].fileno()
+        self.obj.update_handler(fileno, select_connection.WRITE)
+        self.obj.poll(write_only=True)
+        self.handlers[1].assert_called_once_with(
+            fileno, select_connection.WRITE, write_only=True)
+
+    def test_write_only_poll_of_unwritable_socket_does_not_wait(self):
+        reader = self.pairs[1][0]
+        reader.setblocking(0)
+        try:
+            while True:
+                reader.send('x' * 65536)
+        except socket.error:
+            pass
+        self.obj.remove_timeout(self.timeout)
+        self.obj.add_timeout(5, mock.Mock())
+        self.obj.update_handler(reader.fileno(), select_connection.WRITE)
+        start = time.time()
+        self.obj.poll(write_only=True)
+        self.assertLess(time.time() - start, 0.5)
+        self.assertFalse(self.handlers[1].called)
+
+    def test_remove_unknown_handler(self):
+        self.obj.remove_handler(-1)
+
+    def test_manage_event_state_calls_all_state_managers(self):
+        self.obj._manage_event_state()
+        for state_manager in self.state_managers:
+            state_manager.assert_called_once_with()
+
+
+class SelectPollerMultipleHandlerTests(MultipleHandlerTests,
+                                       unittest.TestCase):
+
+    POLLER = select_connection.SelectPoller
+
+
+@unittest.skipIf(not hasattr(select, 'poll'), 'poll is not available')
+class PollPollerMultipleHandlerTests(MultipleHandlerTests,
+                                     unittest.TestCase):
+
+    POLLER = select_connection.PollPoller
+
+
+@unittest.skipIf(not hasattr(select, 'epoll'), 'epoll is not available')
+class EPollPollerMultipleHandlerTests(MultipleHandlerTests,
+                                      unittest.TestCase):
+
+    POLLER = select_connection.EPollPoller
+
+
+@unittest.skipIf(not hasattr(select, 'epoll'), 'epoll is not available')
+class EdgeTriggeredEPollPollerMultipleHandlerTests(MultipleHandlerTests,
+                                                  unittest.TestCase):
+
+    POLLER = select_connection.EdgeTriggeredEPollPoller
+
+    def setUp(self):
+        super(EdgeTriggeredEPollPollerMultipleHandlerTests, self).setUp()
+        for handler in self.handlers:
+            handler.return_value = None
+
+
+@unittest.skipIf(not hasattr(select, 'epoll'), 'epoll is not available')
+class EdgeTriggeredEPollPollerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.reader, self.writer = socket.socketpair()
+        self.fileno = self.reader.fileno()
+        self.handler = mock.Mock(return_value=None)
+        self.obj = select_connection.EdgeTriggeredEPollPoller(
+            self.fileno, self.handler, select_connection.READ)
+        self.obj._poll = mock.Mock(wraps=self.obj._poll)
+        self.obj.add_timeout(0, mock.Mock())
+
+    def tearDown(self):
+        self.reader.close()
+        self.writer.close()
+
+    def test_update_handler_does_not_modify_epoll(self):
+        self.obj.update_handler(self.fileno, select_connection.READ |
+                                select_connection.WRITE)
+        self.obj.update_handler(self.fileno, select_connection.READ)
+        self.assertFalse(self.obj._poll.modify.called)
+
+    def test_poll_dispatches_edge_once(self):
+        self.writer.send('x')
+        self.obj.poll()
+        self.obj.poll()
+        self.handler.assert_called_once_with(
+            self.fileno, select_connection.READ, write_only=False)
+
+    def test_poll_dispatches_events_still_ready_without_waiting(self):
+        self.handler.return_value = select_connection.READ
+        self.writer.send('x')
+        self.obj.poll()
+        self.obj.poll()
+        self.assertEqual(self.handler.call_count, 2)
+        self.assertEqual(self.obj._poll.poll.call_args[0], (0,))
+
+    def test_write_only_poll_writes_without_polling(self):
+        self.obj.update_handler(self.fileno, select_connection.READ |
+                                select_connection.WRITE)
+        self.handler.return_value = select_connection.WRITE
+        self.obj.poll(write_only=True)
+        self.obj.poll(write_only=True)
+        self.assertEqual(self.obj._poll.poll.call_count, 1)
+        self.assertEqual(self.handler.call_args_list,
+                         [mock.call(self.fileno, select_connection.WRITE,
+                                    write_only=True)] * 2)
+
+    def test_write_only_poll_keeps_read_ready(self):
+        self.writer.send('x')
+        self.obj.update_handler(self.fileno, select_connection.READ |
+                                select_connection.WRITE)
+        self.obj.poll(write_only=True)
+        self.handler.reset_mock()
+        self.obj.update_handler(self.fileno, select_connection.READ)
+        self.obj.poll()
+        self.handler.assert_called_once_with(
+            self.fileno, select_connection.READ, write_only=False)
+
+    def test_write_only_poll_does_not_wait(self):
+        self.obj.update_handler(self.fileno, select_connection.READ |
+                                select_connection.WRITE)
+        self.obj.poll(write_only=True)
+        self.obj._poll.poll.assert_called_once_with(0)
+
+    def test_poll_keeps_edges_seen_while_dispatching(self):
+        def handler(fileno, events, write_only=False):
+            if not write_only:
+                self.reader.recv(1)
+                self.writer.send('y')
+                self.obj.poll(write_only=True)
+
+        self.handler.side_effect = handler
+        self.writer.send('x')
+        self.obj.poll()
+        self.assertEqual(self.obj._ready[self.fileno] &
+                         select_connection.READ, select_connection.READ)
+        self.obj.poll()
+        self.assertEqual(self.handler.call_args_list,
+                         [mock.call(self.fileno, select_connection.READ,
+                                    write_only=False)] * 2)
+
+    def test_remove_handler(self):
+        self.obj.remove_handler(self.fileno)
+        self.assertEqual(self.obj._ready, dict())
+
+
+@unittest.skipIf(not hasattr(select, 'kqueue'), 'kqueue is not available')
+class KQueuePollerMultipleHandlerTests(MultipleHandlerTests,
+                                       unittest.TestCase):
+
+    POLLER = select_connection.KQueuePoller
+
+
+class IOLoopTests(unittest.TestCase):
+
+    def setUp(self):
+        self.obj = select_connection.IOLoop()
+        self.sockets = [socket.socketpair()[0] for _ in xrange(2)]
+
+    def tearDown(self):
+        for value in self.sockets:
+            value.close()
+
+    def test_start_poller_shares_poller(self):
+        self.obj.start_poller(mock.Mock(), select_connection.READ,
+                              self.sockets[0].fileno(), mock.Mock())
+        poller = self.obj.poller
+        self.obj.start_poller(mock.Mock(), select_connection.READ,
+                              self.sockets[1].fileno(), mock.Mock())
+        self.assertIs(self.obj.poller, poller)
+        self.assertEqual(set(poller._handlers),
+                         set([value.fileno() for value in self.sockets]))
+
+    def test_start_poller_default_state_manager(self):
+        state_manager = mock.Mock()
+        self.obj = select_connection.IOLoop(state_manager)
+        self.obj.start_poller(mock.Mock(), select_connection.READ,
+                              self.sockets[0].fileno())
+        self.obj.poller._manage_event_state()
+        state_manager.assert_called_once_with()
+
+    def test_remove_handler(self):
+        self.obj.start_poller(mock.Mock(), select_connection.READ,
+                              self.sockets[0].fileno(), mock.Mock())
+        self.obj.remove_handler(self.sockets[0].fileno())
+        self.assertEqual(self.obj.poller._handlers, dict())
+
+    def test_remove_handler_without_poller(self):
+        self.obj.remove_handler(self.sockets[0].fileno())
+
+    @unittest.skipIf(not hasattr(select, 'epoll'), 'epoll is not available')
+    @mock.patch('pika.adapters.select_connection.SELECT_TYPE', 'epoll_et')
+    def test_start_poller_edge_triggered_epoll(self):
+        self.obj.start_poller(mock.Mock(), select_connection.READ,
+                              self.sockets[0].fileno(), mock.Mock())
+        self.assertEqual(self.obj.poller_type, 'EdgeTriggeredEPollPoller')
+
+
+class SelectConnectionTests(unittest.TestCase):
+
+    @mock.patch('pika.connection.Connection.connect')
+    def test_shared_ioloop(self, connect):
+        ioloop = select_connection.IOLoop()
+        connections = [select_connection.SelectConnection(ioloop=ioloop)
+                       for _ in xrange(2)]
+        for connection in connections:
+            self.assertIs(connection.ioloop, ioloop)
+
+    @mock.patch('pika.connection.Connection.connect')
+    def test_own_ioloop(self, connect):
+        first = select_connection.SelectConnection()
+        second = select_connection.SelectConnection()
+        self.assertIsNot(first.ioloop, second.ioloop)
+
+    @mock.patch('pika.connection.Connection.connect')
+    def test_adapter_disconnect_removes_handler(self, connect):
+        ioloop = mock.Mock(spec=select_connection.IOLoop)
+        connection = select_connection.SelectConnection(
+            ioloop=ioloop, stop_ioloop_on_close=False)
+        sock = mock.Mock()
+        sock.fileno.return_value = 42
+        connection.socket = sock
+        connection._adapter_disconnect()
+        ioloop.remove_handler.assert_called_once_with(42)
+        sock.close.assert_called_once_with()
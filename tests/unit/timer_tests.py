@@ -0,0 +1,114 @@
+"""
+Tests for pika.timer
+
+"""
+import mock
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from pika import timer
+
+
+class TimerQueueTests(unittest.TestCase):
+
+    def setUp(self):
+        self.obj = timer.TimerQueue()
+
+    def test_empty(self):
+        self.assertEqual(len(self.obj), 0)
+        self.assertIsNone(self.obj.get_next_deadline())
+
+    def test_add_returns_unique_handles(self):
+        callback = mock.Mock()
+        self.assertIsNot(self.obj.add(1, callback), self.obj.add(1, callback))
+        self.assertEqual(len(self.obj), 2)
+
+    @mock.patch('time.time', return_value=100)
+    def test_get_next_deadline(self, unused_time):
+        self.obj.add(5, mock.Mock())
+        self.obj.add(2, mock.Mock())
+        self.obj.add(9, mock.Mock())
+        self.assertEqual(self.obj.get_next_deadline(), 102)
+
+    @mock.patch('time.time', return_value=100)
+    def test_get_next_deadline_skips_removed(self, unused_time):
+        self.obj.add(5, mock.Mock())
+        self.obj.remove(self.obj.add(2, mock.Mock()))
+        self.assertEqual(self.obj.get_next_deadline(), 105)
+        self.assertEqual(len(self.obj), 1)
+
+    def test_get_timeout_without_timeouts(self):
+        self.assertEqual(self.obj.get_timeout(3), 3)
+        self.assertIsNone(self.obj.get_timeout())
+
+    @mock.patch('time.time', return_value=100)
+    def test_get_timeout(self, unused_time):
+        self.obj.add(2, mock.Mock())
+        self.assertEqual(self.obj.get_timeout(), 2)
+        self.assertEqual(self.obj.get_timeout(3), 2)
+        self.assertEqual(self.obj.get_timeout(1), 1)
+
+    def test_get_timeout_past_due(self):
+        self.obj.add(-1, mock.Mock())
+        self.assertEqual(self.obj.get_timeout(3), 0)
+
+    def test_process_calls_due_in_order(self):
+        calls = list()
+        self.obj.add(-1, lambda: calls.append('second'))
+        self.obj.add(-2, lambda: calls.append('first'))
+        self.obj.add(10, lambda: calls.append('later'))
+        self.obj.process()
+        self.assertEqual(calls, ['first', 'second'])
+        self.assertEqual(len(self.obj), 1)
+
+    def test_process_skips_removed(self):
+        callback = mock.Mock()
+        self.obj.remove(self.obj.add(-1, callback))
+        self.obj.process()
+        self.assertFalse(callback.called)
+        self.assertEqual(len(self.obj), 0)
+
+    def test_process_leaves_timeouts_added_by_callbacks(self):
+        callback = mock.Mock()
+        self.obj.add(-1, lambda: self.obj.add(-1, callback))
+        self.obj.process()
+        self.assertFalse(callback.called)
+        self.obj.process()
+        callback.assert_called_once_with()
+
+    def test_process_callback_removes_due_timeout(self):
+        callback = mock.Mock()
+        handles = list()
+        self.obj.add(-2, lambda: self.obj.remove(handles[0]))
+        handles.append(self.obj.add(-1, callback))
+        self.obj.process()
+        self.assertFalse(callback.called)
+
+    def test_remove_twice(self):
+        handle = self.obj.add(1, mock.Mock())
+        self.obj.remove(handle)
+        self.obj.remove(handle)
+        self.assertEqual(len(self.obj), 0)
+
+    def test_remove_unknown_timeout(self):
+        self.obj.add(1, mock.Mock())
+        for timeout_id in (None, '1380000000.0', object()):
+            self.obj.remove(timeout_id)
+        self.assertEqual(len(self.obj), 1)
+
+    def test_remove_called_timeout(self):
+        handle = self.obj.add(-1, mock.Mock())
+        self.obj.process()
+        self.obj.remove(handle)
+        self.assertEqual(len(self.obj), 0)
+
+    def test_remove_compacts_heap(self):
+        handles = [self.obj.add(index, mock.Mock())
+                   for index in xrange(self.obj.COMPACT_MIN_SIZE * 2)]
+        for handle in handles[1:]:
+            self.obj.remove(handle)
+        self.assertLess(len(self.obj._heap), len(handles) // 2)
+        self.assertEqual(len(self.obj), 1)
+        self.assertEqual(self.obj.get_next_deadline(), handles[0].deadline)
@@ -0,0 +1,93 @@
+"""Measure the CPU time an idle BlockingConnection uses and how late its
+timeouts fire, waiting on a socket that never receives anything. The
+connection is driven by calling process_data_events in a loop with its
+default 10 ms time limit, as a consumer loop used to poll, and with no time
+limit, as start_consuming waits.
+
+Run from the repository root::
+
+    python utils/benchmarks/blocking_idle.py
+
+"""
+import os
+import resource
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika.adapters import blocking_connection
+
+DURATION = 2.0
+TIMEOUT_INTERVAL = 0.25
+
+
+class BenchmarkConnection(blocking_connection.BlockingConnection):
+    """Connection that does not connect"""
+
+    def connect(self):
+        pass
+
+
+def cpu_time():
+    """Return the user and system CPU time used by the process.
+
+    :rtype: float
+
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run(time_limit):
+    """Process data events for DURATION seconds with a timeout that is added
+    again every TIMEOUT_INTERVAL seconds, returning the number of calls to
+    process_data_events, the CPU time used and the mean timeout lateness.
+
+    :param float time_limit: The time limit of each process_data_events call
+    :rtype: tuple(int, float, float)
+
+    """
+    reader, writer = socket.socketpair()
+    conn = BenchmarkConnection()
+    conn.socket = reader
+    conn._read_poller = blocking_connection.ReadPoller(reader.fileno())
+    conn._frames_written_without_read = 0
+    conn._socket_timeouts = 0
+    conn._timeouts = dict()
+
+    lateness = list()
+
+    def on_timeout(deadline):
+        lateness.append(time.time() - deadline)
+        add_timeout()
+
+    def add_timeout():
+        deadline = time.time() + TIMEOUT_INTERVAL
+        conn.add_timeout(TIMEOUT_INTERVAL, lambda: on_timeout(deadline))
+
+    add_timeout()
+    calls = 0
+    start_cpu = cpu_time()
+    end = time.time() + DURATION
+    while time.time() < end:
+        conn.process_data_events(time_limit)
+        calls += 1
+    used = cpu_time() - start_cpu
+    reader.close()
+    writer.close()
+    return calls, used, sum(lateness) / len(lateness)
+
+
+def main():
+    for name, time_limit in (('10 ms', 0.01), ('none', None)):
+        calls, used, lateness = run(time_limit)
+        print('time limit %-5s: %5i wakeups in %.1fs, %.1f ms CPU, '
+              'timeouts %.2f ms late' % (name, calls, DURATION, used * 1000,
+                                         lateness * 1000))
+
+
+if __name__ == '__main__':
+    main()
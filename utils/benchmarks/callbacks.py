@@ -0,0 +1,56 @@
+"""Measure the per call cost of the CallbackManager operations used by a
+Channel RPC: registering the one-shot reply callback, checking for pending
+callbacks when the reply arrives and processing it.
+
+Run from the repository root::
+
+    python utils/benchmarks/callbacks.py
+
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import callback
+from pika import frame
+from pika import spec
+
+ITERATIONS = 100000
+
+
+def on_reply(method_frame):
+    pass
+
+
+def main():
+    manager = callback.CallbackManager()
+    # Callbacks that a channel and connection keep registered
+    for channel_number in range(1, 11):
+        for key in (spec.Basic.GetEmpty, spec.Basic.Cancel, spec.Channel.Flow,
+                    spec.Channel.Close):
+            manager.add(channel_number, key, on_reply, False)
+
+    reply = frame.Method(1, spec.Queue.DeclareOk('queue', 0, 0))
+
+    def rpc():
+        manager.add(1, spec.Queue.DeclareOk, on_reply,
+                    arguments={'queue': 'queue'})
+        if manager.pending(reply.channel_number, reply.method):
+            manager.process(reply.channel_number, reply.method, manager,
+                            reply)
+
+    def pending_miss():
+        manager.pending(1, spec.Basic.Ack)
+
+    for name, function in (('add/pending/process', rpc),
+                           ('pending (no callbacks)', pending_miss)):
+        timer = timeit.Timer(function)
+        best = min(timer.repeat(3, ITERATIONS)) / ITERATIONS * 1000000
+        print('%-24s %8.2f us' % (name, best))
+
+
+if __name__ == '__main__':
+    main()
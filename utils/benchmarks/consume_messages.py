@@ -0,0 +1,70 @@
+"""Measure how many messages per second are consumed from an in-memory
+stream of Basic.Deliver, header and body frames, from the bytes read from
+the socket to the consumer callback.
+
+Run from the repository root::
+
+    python utils/benchmarks/consume_messages.py
+
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import channel
+from pika import connection
+from pika import frame
+from pika import spec
+
+READ_SIZE = spec.FRAME_MAX_SIZE
+MESSAGES = 200000
+BODY = 'x' * 100
+
+
+class BenchmarkConnection(connection.Connection):
+    """Connection that does not connect"""
+
+    def connect(self):
+        pass
+
+
+def main():
+    conn = BenchmarkConnection()
+    chan = channel.Channel(conn, 1)
+    chan._set_state(chan.OPEN)
+    conn._channels[1] = chan
+
+    consumed = [0]
+
+    def on_message(unused_channel, method, properties, body):
+        consumed[0] += 1
+
+    chan._consumers['ctag1.0'] = on_message
+    chan._pending['ctag1.0'] = list()
+
+    message = ''.join([
+        frame.Method(1, spec.Basic.Deliver('ctag1.0', 1, False, 'exchange',
+                                           'routing.key')).marshal(),
+        frame.Header(1, len(BODY),
+                     spec.BasicProperties(content_type='text/plain',
+                                          delivery_mode=2)).marshal(),
+        frame.Body(1, BODY).marshal()])
+    stream = message * MESSAGES
+    chunks = [stream[offset:offset + READ_SIZE]
+              for offset in xrange(0, len(stream), READ_SIZE)]
+
+    start = time.time()
+    for chunk in chunks:
+        conn._on_data_available(chunk)
+    duration = time.time() - start
+
+    assert consumed[0] == MESSAGES
+    print('%i messages consumed in %.3fs, %i messages/s' %
+          (MESSAGES, duration, MESSAGES / duration))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Count the epoll and socket calls a SelectConnection makes to publish and
+consume messages with the level-triggered and the edge-triggered epoll
+pollers. A fake broker in another process sends a Basic.Deliver for every
+message published to it, and the consumer publishes a new message for every
+message delivered, keeping WINDOW messages in flight.
+
+Run from the repository root::
+
+    python utils/benchmarks/epoll_syscalls.py
+
+"""
+import collections
+import multiprocessing
+import os
+import select
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import channel
+from pika import frame
+from pika import spec
+from pika.adapters import select_connection
+
+BODY_SIZES = (100, 64 * 1024)
+MESSAGES = 20000
+WINDOW = 10
+COUNTED = ('poll', 'modify', 'register', 'unregister', 'send', 'recv_into')
+
+
+class CountingProxy(object):
+    """Pass attribute access through to an object, counting the calls of the
+    methods in COUNTED
+
+    """
+    def __init__(self, value, counts):
+        self._value = value
+        self._counts = counts
+
+    def __getattr__(self, name):
+        attribute = getattr(self._value, name)
+        if name not in COUNTED:
+            return attribute
+
+        def counted(*args, **kwargs):
+            self._counts[name] += 1
+            return attribute(*args, **kwargs)
+        return counted
+
+
+class BenchmarkConnection(select_connection.SelectConnection):
+    """Connection that does not connect"""
+
+    def connect(self):
+        pass
+
+
+def broker(sock, client, publish_size, deliver):
+    """Send deliver for every publish_size bytes received, until the client
+    closes its socket.
+
+    :param socket.socket sock: The socket of the broker
+    :param socket.socket client: The socket of the client, closed here
+    :param int publish_size: The size of a published message
+    :param str deliver: The frames of a delivered message
+
+    """
+    client.close()
+    received = 0
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            return
+        count, received = divmod(received + len(data), publish_size)
+        if count:
+            sock.sendall(deliver * count)
+
+
+def run(poller_type, body_size):
+    """Publish and consume MESSAGES messages with body_size byte bodies,
+    returning the calls counted and the time it took.
+
+    :param str poller_type: The SELECT_TYPE to use
+    :param int body_size: The size of the message bodies
+    :rtype: tuple(dict, float)
+
+    """
+    select_connection.SELECT_TYPE = poller_type
+    body = 'x' * body_size
+    method = spec.Basic.Publish(exchange='exchange', routing_key='routing.key')
+    props = spec.BasicProperties(content_type='text/plain')
+
+    conn = BenchmarkConnection()
+    conn.connection_state = conn.CONNECTION_OPEN
+    conn._body_max_length = conn._get_body_frame_max_length()
+    publish_size = len(frame.marshal_message(1, method, props, body,
+                                             conn._body_max_length)[0])
+    deliver = frame.marshal_message(
+        1, spec.Basic.Deliver('ctag1.0', 1, False, 'exchange', 'routing.key'),
+        props, body, conn._body_max_length)[0]
+
+    client, server = socket.socketpair()
+    process = multiprocessing.Process(target=broker,
+                                      args=(server, client, publish_size,
+                                            deliver))
+    process.start()
+    server.close()
+    client.setblocking(0)
+
+    counts = collections.defaultdict(int)
+    conn.socket = CountingProxy(client, counts)
+    conn.ioloop.start_poller(conn._handle_events, conn.event_state,
+                             client.fileno(), conn._manage_event_state)
+    conn.ioloop.poller._poll = CountingProxy(conn.ioloop.poller._poll, counts)
+
+    chan = channel.Channel(conn, 1)
+    chan._set_state(chan.OPEN)
+    conn._channels[1] = chan
+    state = {'published': 0, 'consumed': 0}
+
+    def publish():
+        state['published'] += 1
+        conn._send_message(1, method, (props, body))
+
+    def on_message(unused_channel, unused_method, unused_properties,
+                   unused_body):
+        state['consumed'] += 1
+        if state['published'] < MESSAGES:
+            publish()
+        elif state['consumed'] == MESSAGES:
+            conn.ioloop.stop()
+
+    chan._consumers['ctag1.0'] = on_message
+    chan._pending['ctag1.0'] = list()
+
+    start = time.time()
+    for _ in xrange(WINDOW):
+        publish()
+    conn.ioloop.start()
+    duration = time.time() - start
+    client.close()
+    process.join()
+    return counts, duration
+
+
+def main():
+    if not hasattr(select, 'epoll'):
+        print('epoll is not available')
+        return
+    for body_size in BODY_SIZES:
+        for poller_type in ('epoll', 'epoll_et'):
+            counts, duration = run(poller_type, body_size)
+            print('%-8s %6i byte bodies: %s, %.2fs' %
+                  (poller_type, body_size,
+                   ', '.join(['%s %.2f' % (name,
+                                           counts[name] / float(MESSAGES))
+                              for name in COUNTED if counts[name]]),
+                   duration))
+    print('(calls per message)')
+
+
+if __name__ == '__main__':
+    main()
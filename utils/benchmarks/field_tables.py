@@ -0,0 +1,63 @@
+"""Measure the round trip and the encode and decode throughput of AMQP field
+tables of 5, 50 and 500 entries, such as message headers.
+
+Run from the repository root::
+
+    python utils/benchmarks/field_tables.py
+
+"""
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import data
+
+ITERATIONS = 20000
+SIZES = (5, 50, 500)
+
+# Header values of the types that are seen in practice. Decimal values are
+# left out as their arithmetic dominates the time of any table they are in.
+VALUES = ('text/plain', 42, True, 1380000000L, u'unicod\xe9', None,
+          'application-id', datetime.datetime(2013, 9, 24, 12, 0),
+          {'nested': 'table', 'count': 1}, ['a', 1, False])
+
+
+def table(size):
+    """Return a table of size entries.
+
+    :param int size: The number of entries
+    :rtype: dict
+
+    """
+    return dict(('x-header-%i' % index, VALUES[index % len(VALUES)])
+                for index in xrange(size))
+
+
+def encode(value):
+    pieces = list()
+    data.encode_table(pieces, value)
+    return ''.join(pieces)
+
+
+def main():
+    print('%-8s %14s %14s' % ('entries', 'encode/s', 'decode/s'))
+    for size in SIZES:
+        value = table(size)
+        encoded = encode(value)
+        decoded = data.decode_table(encoded, 0)[0]
+        assert decoded == value, 'Round trip failed'
+        iterations = ITERATIONS * 5 // size
+        encode_time = min(timeit.Timer(lambda: encode(value)).repeat(
+            3, iterations)) / iterations
+        decode_time = min(timeit.Timer(
+            lambda: data.decode_table(encoded, 0)).repeat(
+                3, iterations)) / iterations
+        print('%-8i %14i %14i' % (size, 1 / encode_time, 1 / decode_time))
+
+
+if __name__ == '__main__':
+    main()
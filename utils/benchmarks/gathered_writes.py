@@ -0,0 +1,91 @@
+"""Count the socket write calls and time needed to drain a burst of small
+published messages from the outbound buffer through a local socket.
+
+Run from the repository root::
+
+    python utils/benchmarks/gathered_writes.py
+
+"""
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import spec
+from pika.adapters import base_connection
+
+MESSAGES = 100000
+BODY = 'x' * 100
+
+
+class CountingSocket(object):
+    """Socket wrapper that counts the calls that write to the socket"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.writes = 0
+
+    def send(self, data):
+        self.writes += 1
+        return self.sock.send(data)
+
+    def sendall(self, data):
+        self.writes += 1
+        return self.sock.sendall(data)
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+class BenchmarkConnection(base_connection.BaseConnection):
+    """Connection that does not connect and only writes when drained"""
+
+    def connect(self):
+        pass
+
+    def _flush_outbound(self):
+        pass
+
+
+def drain(sock):
+    """Read from sock until it is closed.
+
+    :param socket.socket sock: The socket to read from
+
+    """
+    while sock.recv(1048576):
+        pass
+
+
+def main():
+    writer, reader = socket.socketpair()
+    thread = threading.Thread(target=drain, args=(reader,))
+    thread.start()
+
+    conn = BenchmarkConnection()
+    conn._body_max_length = conn._get_body_frame_max_length()
+    conn.socket = CountingSocket(writer)
+    method = spec.Basic.Publish(exchange='exchange', routing_key='routing.key')
+    props = spec.BasicProperties(content_type='text/plain')
+    for _ in xrange(MESSAGES):
+        conn._send_message(1, method, (props, BODY))
+
+    start = time.time()
+    while conn.outbound_buffer:
+        conn._handle_write()
+    duration = time.time() - start
+
+    writer.close()
+    thread.join()
+    print('%i messages drained in %.3fs with %i socket writes, '
+          '%.3f writes per message' % (MESSAGES, duration,
+                                       conn.socket.writes,
+                                       float(conn.socket.writes) / MESSAGES))
+
+
+if __name__ == '__main__':
+    main()
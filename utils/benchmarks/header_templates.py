@@ -0,0 +1,66 @@
+"""Measure how many content headers per second can be marshalled when every
+message has a headers table with mostly constant and a few variable entries,
+comparing spec.BasicProperties with pika.properties.BasicPropertiesTemplate.
+
+Run from the repository root::
+
+    python utils/benchmarks/header_templates.py
+
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import frame
+from pika import properties
+from pika import spec
+
+ITERATIONS = 50000
+CONSTANT_ENTRIES = (2, 10, 50)
+
+
+def decode(marshaled):
+    """Return the headers of a marshalled content header frame.
+
+    :param str marshaled: The marshalled frame
+    :rtype: dict
+
+    """
+    return frame.decode_frame(marshaled)[1].properties.headers
+
+
+def main():
+    variable = {'x-trace-id': '0af7651916cd43dd8448eb211c80319c',
+                'x-published-at': 1380000000}
+    print('%-16s %18s %18s' % ('constant entries', 'BasicProperties/s',
+                               'template/s'))
+    for size in CONSTANT_ENTRIES:
+        constant = dict(('x-constant-%i' % index, 'value-%i' % index)
+                        for index in xrange(size))
+        template = properties.BasicPropertiesTemplate(
+            content_type='application/json', delivery_mode=2,
+            headers=constant)
+
+        def basic_properties():
+            headers = dict(constant)
+            headers.update(variable)
+            props = spec.BasicProperties(content_type='application/json',
+                                         delivery_mode=2, headers=headers)
+            return frame.Header(1, 100, props).marshal()
+
+        def rendered():
+            return frame.Header(1, 100, template.render(variable)).marshal()
+
+        assert decode(basic_properties()) == decode(rendered())
+        results = list()
+        for function in (basic_properties, rendered):
+            best = min(timeit.Timer(function).repeat(3, ITERATIONS))
+            results.append(ITERATIONS / best)
+        print('%-16i %18i %18i' % (size, results[0], results[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Measure how many inbound frames per second Connection._on_data_available
+can decode when fed socket-sized chunks of Basic.Deliver messages.
+
+Run from the repository root::
+
+    python utils/benchmarks/inbound_frames.py
+
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import connection
+from pika import frame
+from pika import spec
+
+READ_SIZE = spec.FRAME_MAX_SIZE
+BODY_SIZES = (100, 65536)
+STREAM_SIZE = 32 * 1024 * 1024
+
+
+class BenchmarkConnection(connection.Connection):
+    """Connection that does not connect and only counts decoded frames"""
+
+    def connect(self):
+        pass
+
+    def _process_frame(self, frame_value):
+        self.frames_received += 1
+
+
+def message_frames(body_size):
+    """Return the marshalled method, header and body frames of one message.
+
+    :param int body_size: The size of the message body
+    :rtype: str
+
+    """
+    return ''.join([
+        frame.Method(1, spec.Basic.Deliver('ctag1.0', 1, False, 'exchange',
+                                           'routing.key')).marshal(),
+        frame.Header(1, body_size,
+                     spec.BasicProperties(content_type='text/plain',
+                                          delivery_mode=2)).marshal(),
+        frame.Body(1, 'x' * body_size).marshal()])
+
+
+def run(body_size):
+    """Feed a stream of messages through the inbound frame decoder.
+
+    :param int body_size: The size of each message body
+    :rtype: tuple(int, float)
+
+    """
+    message = message_frames(body_size)
+    stream = message * max(1, STREAM_SIZE // len(message))
+    chunks = [stream[offset:offset + READ_SIZE]
+              for offset in xrange(0, len(stream), READ_SIZE)]
+    conn = BenchmarkConnection()
+    start = time.time()
+    for chunk in chunks:
+        conn._on_data_available(chunk)
+    return conn.frames_received, time.time() - start
+
+
+def main():
+    for body_size in BODY_SIZES:
+        frames, duration = run(body_size)
+        print('%6i byte bodies: %8i frames in %.3fs, %10.0f frames/sec' %
+              (body_size, frames, duration, frames / duration))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Measure the time and the peak memory it takes to consume a large message
+body that is split over many body frames, from the bytes read from the socket
+to the consumer callback, reading one frame at a time. The message is consumed
+by a streaming consumer first, then by a consumer on a channel that spills
+large bodies to disk, then by a consumer that asked for the body as a
+bytearray, and then by a consumer that gets the body joined into a str.
+
+The peak memory is the growth of the maximum resident set size of the process
+while the message is consumed. Since the maximum only grows, each mode is run
+in order of the memory it is expected to need.
+
+Run from the repository root::
+
+    python utils/benchmarks/large_body_assembly.py
+
+"""
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import channel
+from pika import connection
+from pika import frame
+from pika import spec
+
+BODY_SIZE = 10 * 1024 * 1024
+MESSAGES = 10
+
+
+class BenchmarkConnection(connection.Connection):
+    """Connection that does not connect"""
+
+    def connect(self):
+        pass
+
+
+def max_rss():
+    """Return the maximum resident set size of the process in bytes.
+
+    :rtype: int
+
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def consume(frames, mode):
+    """Consume the message in frames MESSAGES times, returning the best time
+    per message and the peak memory growth of the first message.
+
+    :param list frames: The marshaled frames of the message
+    :param str mode: One of streaming, spilled, bytearray or joined
+    :rtype: tuple(float, int)
+
+    """
+    conn = BenchmarkConnection()
+    chan = channel.Channel(conn, 1)
+    chan._set_state(chan.OPEN)
+    conn._channels[1] = chan
+
+    received = [0]
+
+    def on_message(unused_channel, method, properties, body):
+        if body is not None:
+            received[0] += len(body)
+
+    chan._consumers['ctag1.0'] = on_message
+    chan._pending['ctag1.0'] = list()
+    if mode == 'streaming':
+        chan._streaming.add('ctag1.0')
+    elif mode == 'spilled':
+        chan.large_body_threshold = BODY_SIZE // 2
+    elif mode == 'bytearray':
+        chan._bytearray_bodies.add('ctag1.0')
+
+    durations = list()
+    peak = None
+    for message in xrange(MESSAGES):
+        before = max_rss()
+        start = time.time()
+        for value in frames:
+            conn._on_data_available(value)
+        durations.append(time.time() - start)
+        if peak is None:
+            peak = max_rss() - before
+        assert received[0] == BODY_SIZE
+        received[0] = 0
+    return min(durations), peak
+
+
+def main():
+    # Every body frame carries the same fragment, so that the stream does not
+    # have to be held in memory and only the assembly shows in the peak
+    fragment_size = spec.FRAME_MAX_SIZE - spec.FRAME_HEADER_SIZE - 1
+    frames = [
+        frame.Method(1, spec.Basic.Deliver('ctag1.0', 1, False, 'exchange',
+                                           'routing.key')).marshal(),
+        frame.Header(1, BODY_SIZE, spec.BasicProperties()).marshal()]
+    body_frame = frame.Body(1, 'x' * fragment_size).marshal()
+    frames.extend([body_frame] * (BODY_SIZE // fragment_size))
+    remainder = BODY_SIZE % fragment_size
+    if remainder:
+        frames.append(frame.Body(1, 'x' * remainder).marshal())
+
+    for mode in ('streaming', 'spilled', 'bytearray', 'joined'):
+        duration, peak = consume(frames, mode)
+        print('%-10s %i MB body in %i frames: %.2f ms per message, '
+              'peak memory growth %.1f MB' %
+              (mode, BODY_SIZE / 1024 / 1024, len(frames) - 2,
+               duration * 1000, peak / 1024.0 / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Compare the per message cost of decoding BasicProperties eagerly with
+decoding them on demand, for consumers that read none, some or all of them.
+
+Run from the repository root::
+
+    python utils/benchmarks/lazy_properties.py
+
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import properties
+from pika import spec
+
+ITERATIONS = 100000
+
+ENCODED = ''.join(spec.BasicProperties(
+    content_type='application/json',
+    delivery_mode=2,
+    headers={'x-origin': 'benchmark', 'x-attempt': 1, 'x-trace': 'abcdef'},
+    message_id='message.id',
+    timestamp=1380000000).encode())
+
+ACCESS = [('no properties read', ()),
+          ('content_type read', ('content_type',)),
+          ('headers read', ('headers',)),
+          ('all properties read', ('content_type', 'delivery_mode',
+                                   'headers', 'message_id', 'timestamp'))]
+
+
+def per_message(cls, names):
+    """Return the best per message time in microseconds of decoding the
+    properties with cls and then reading names from them.
+
+    :param type cls: The properties class
+    :param tuple names: The properties to read
+    :rtype: float
+
+    """
+    def decode():
+        value = cls().decode(ENCODED)
+        for name in names:
+            getattr(value, name)
+    timer = timeit.Timer(decode)
+    return min(timer.repeat(3, ITERATIONS)) / ITERATIONS * 1000000
+
+
+def main():
+    print('%-25s %12s %12s' % ('', 'eager (us)', 'lazy (us)'))
+    for label, names in ACCESS:
+        print('%-25s %12.2f %12.2f' %
+              (label,
+               per_message(spec.BasicProperties, names),
+               per_message(properties.LazyBasicProperties, names)))
+
+
+if __name__ == '__main__':
+    main()
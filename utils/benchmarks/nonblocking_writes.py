@@ -0,0 +1,148 @@
+"""Measure how long a single write stalls the IOLoop when a large message is
+published to a peer that reads slowly, with a blocking and a non-blocking
+socket. Then measure how long publishing a message takes with each
+SelectConnection poller when the peer does not read at all, which is how
+long the write only poll of the flush that follows the publish waits for
+the full socket.
+
+Run from the repository root::
+
+    python utils/benchmarks/nonblocking_writes.py
+
+"""
+import os
+import select
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import spec
+from pika.adapters import base_connection
+from pika.adapters import select_connection
+
+BODY_SIZE = 8 * 1048576
+READ_SIZE = 65536
+READ_INTERVAL = 0.002
+FLUSHES = 20
+
+
+class BenchmarkConnection(base_connection.BaseConnection):
+    """Connection that does not connect and only writes when drained"""
+
+    def connect(self):
+        pass
+
+    def _flush_outbound(self):
+        pass
+
+
+class BenchmarkSelectConnection(select_connection.SelectConnection):
+    """Connection that does not connect"""
+
+    def connect(self):
+        pass
+
+
+def slow_drain(sock):
+    """Read from sock in small chunks until it is closed.
+
+    :param socket.socket sock: The socket to read from
+
+    """
+    while sock.recv(READ_SIZE):
+        time.sleep(READ_INTERVAL)
+
+
+def run(blocking):
+    """Drain a large message and return the total time and the longest time
+    spent in a single write.
+
+    :param bool blocking: Use a blocking socket
+    :rtype: tuple
+
+    """
+    writer, reader = socket.socketpair()
+    writer.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, READ_SIZE)
+    writer.setblocking(int(blocking))
+    thread = threading.Thread(target=slow_drain, args=(reader,))
+    thread.start()
+
+    conn = BenchmarkConnection()
+    conn.BLOCKING_SOCKET = blocking
+    conn._body_max_length = conn._get_body_frame_max_length()
+    conn.socket = writer
+    conn._send_message(1, spec.Basic.Publish(routing_key='routing.key'),
+                       (spec.BasicProperties(), 'x' * BODY_SIZE))
+
+    longest = 0
+    start = time.time()
+    while conn.outbound_buffer:
+        select.select([], [writer], [])
+        write_start = time.time()
+        conn._handle_write()
+        longest = max(longest, time.time() - write_start)
+    duration = time.time() - start
+
+    writer.close()
+    thread.join()
+    return duration, longest
+
+
+def run_flushes(poller_type):
+    """Publish FLUSHES messages to a peer that does not read, once its socket
+    is full, and return the average time each publish took.
+
+    :param str poller_type: The SELECT_TYPE to use
+    :rtype: float
+
+    """
+    select_connection.SELECT_TYPE = poller_type
+    writer, reader = socket.socketpair()
+    writer.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, READ_SIZE)
+    writer.setblocking(0)
+    try:
+        while True:
+            writer.send('x' * READ_SIZE)
+    except socket.error:
+        pass
+
+    conn = BenchmarkSelectConnection()
+    conn.connection_state = conn.CONNECTION_OPEN
+    conn._body_max_length = conn._get_body_frame_max_length()
+    conn.socket = writer
+    conn.ioloop.start_poller(conn._handle_events, conn.event_state,
+                             writer.fileno(), conn._manage_event_state)
+    method = spec.Basic.Publish(routing_key='routing.key')
+    start = time.time()
+    for _ in xrange(FLUSHES):
+        conn._send_message(1, method, (spec.BasicProperties(), 'x' * 1024))
+    duration = time.time() - start
+
+    writer.close()
+    reader.close()
+    return duration / FLUSHES
+
+
+def main():
+    for name, blocking in (('blocking', True), ('non-blocking', False)):
+        duration, longest = run(blocking)
+        print('%-12s drained in %.3fs, longest write stalled the loop for '
+              '%.1fms' % (name, duration, longest * 1000))
+    poller_types = ['select']
+    if hasattr(select, 'poll'):
+        poller_types.append('poll')
+    if hasattr(select, 'epoll'):
+        poller_types.extend(['epoll', 'epoll_et'])
+    if hasattr(select, 'kqueue'):
+        poller_types.append('kqueue')
+    for poller_type in poller_types:
+        print('%-8s publish to a full socket took %.3fms' %
+              (poller_type, run_flushes(poller_type) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Measure how fast Connection._send_message marshals messages whose body is
+built from an envelope, a payload and a trailer, joining the parts before
+publishing them and passing the parts as a list.
+
+Run from the repository root::
+
+    python utils/benchmarks/publish_body_parts.py
+
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import connection
+from pika import spec
+
+PAYLOAD_SIZES = (4096, 1024 * 1024)
+TOTAL_SIZE = 1024 * 1024 * 1024
+ENVELOPE = '{"type": "event", "version": 3, "payload": "'
+TRAILER = '", "checksum": "0123456789abcdef"}'
+
+
+class BenchmarkConnection(connection.Connection):
+    """Connection that does not connect and discards outbound frames"""
+
+    def connect(self):
+        pass
+
+    def _flush_outbound(self):
+        self.outbound_buffer.clear()
+
+
+def run(payload_size, joined):
+    """Publish TOTAL_SIZE bytes of messages with payload_size byte payloads.
+
+    :param int payload_size: The size of each message payload
+    :param bool joined: Join the body parts before publishing them
+    :rtype: tuple(int, float)
+
+    """
+    conn = BenchmarkConnection()
+    conn._body_max_length = conn._get_body_frame_max_length()
+    method = spec.Basic.Publish(exchange='exchange', routing_key='routing.key')
+    props = spec.BasicProperties(content_type='application/json')
+    payload = 'x' * payload_size
+    messages = max(1, TOTAL_SIZE // payload_size)
+    start = time.time()
+    for _ in xrange(messages):
+        if joined:
+            body = ''.join((ENVELOPE, payload, TRAILER))
+        else:
+            body = [ENVELOPE, payload, TRAILER]
+        conn._send_message(1, method, (props, body))
+    return messages, time.time() - start
+
+
+def main():
+    for payload_size in PAYLOAD_SIZES:
+        for joined in (True, False):
+            messages, duration = run(payload_size, joined)
+            print('%9i byte payloads, %-6s: %6i messages in %.3fs, '
+                  '%8.1f MB/sec' % (payload_size,
+                                    'joined' if joined else 'parts',
+                                    messages, duration,
+                                    messages * payload_size / duration /
+                                    1048576))
+
+
+if __name__ == '__main__':
+    main()
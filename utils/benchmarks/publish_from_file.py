@@ -0,0 +1,110 @@
+"""Measure the time and the peak memory it takes to publish a large message
+whose body is read from a file, passing the body as a str read from the file,
+as the file object itself and as an mmap of the file. The outbound buffer is
+written to a socket that discards everything, as an IOLoop would write it.
+
+The peak memory is the growth of the maximum resident set size of the process
+while the message is published. Since the maximum only grows, the bodies are
+published in order of the memory they are expected to need. Pages of the mmap
+that have been read count towards the resident set size even though the
+kernel can reclaim them.
+
+Run from the repository root::
+
+    python utils/benchmarks/publish_from_file.py
+
+"""
+import mmap
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import spec
+from pika.adapters import base_connection
+
+BODY_SIZE = 64 * 1024 * 1024
+
+
+class DiscardingSocket(object):
+    """Socket that accepts and discards everything written to it"""
+
+    def send(self, value):
+        return len(value)
+
+
+class BenchmarkConnection(base_connection.BaseConnection):
+    """Connection that does not connect and only writes when drained"""
+
+    def connect(self):
+        pass
+
+    def _flush_outbound(self):
+        pass
+
+
+def max_rss():
+    """Return the maximum resident set size of the process in bytes.
+
+    :rtype: int
+
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def publish(get_body):
+    """Publish the body returned by get_body and write the outbound buffer,
+    returning the time it took and the peak memory growth.
+
+    :param callable get_body: Returns the body to publish
+    :rtype: tuple(float, int)
+
+    """
+    conn = BenchmarkConnection()
+    conn.socket = DiscardingSocket()
+    conn._body_max_length = conn._get_body_frame_max_length()
+    method = spec.Basic.Publish(exchange='exchange', routing_key='routing.key')
+    props = spec.BasicProperties(content_type='application/octet-stream')
+    before = max_rss()
+    start = time.time()
+    conn._send_message(1, method, (props, get_body()))
+    written = 0
+    while conn.outbound_buffer:
+        written += conn._handle_write()
+    duration = time.time() - start
+    assert written == conn.bytes_sent
+    return duration, max_rss() - before
+
+
+def main():
+    body_file = tempfile.TemporaryFile()
+    chunk = os.urandom(1024 * 1024)
+    for _ in xrange(BODY_SIZE // len(chunk)):
+        body_file.write(chunk)
+    body_file.flush()
+
+    def file_body():
+        body_file.seek(0)
+        return body_file
+
+    def mmap_body():
+        return mmap.mmap(body_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def str_body():
+        body_file.seek(0)
+        return body_file.read()
+
+    for name, get_body in (('file', file_body), ('mmap', mmap_body),
+                           ('str', str_body)):
+        duration, peak = publish(get_body)
+        print('%-5s %i MB body: %.1f ms, peak memory growth %.1f MB' %
+              (name, BODY_SIZE / 1024 / 1024, duration * 1000,
+               peak / 1024.0 / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
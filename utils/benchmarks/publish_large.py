@@ -0,0 +1,62 @@
+"""Measure how fast Connection._send_message marshals messages with large
+bodies into the outbound buffer.
+
+Run from the repository root::
+
+    python utils/benchmarks/publish_large.py
+
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import connection
+from pika import spec
+
+BODY_SIZES = (1024 * 1024, 16 * 1024 * 1024)
+TOTAL_SIZE = 2048 * 1024 * 1024
+
+
+class BenchmarkConnection(connection.Connection):
+    """Connection that does not connect and discards outbound frames"""
+
+    def connect(self):
+        pass
+
+    def _flush_outbound(self):
+        self.outbound_buffer.clear()
+
+
+def run(body_size):
+    """Publish TOTAL_SIZE bytes of messages with body_size byte bodies.
+
+    :param int body_size: The size of each message body
+    :rtype: tuple(int, float)
+
+    """
+    conn = BenchmarkConnection()
+    conn._body_max_length = conn._get_body_frame_max_length()
+    method = spec.Basic.Publish(exchange='exchange', routing_key='routing.key')
+    props = spec.BasicProperties(content_type='application/octet-stream')
+    body = 'x' * body_size
+    messages = max(1, TOTAL_SIZE // body_size)
+    start = time.time()
+    for _ in xrange(messages):
+        conn._send_message(1, method, (props, body))
+    return messages, time.time() - start
+
+
+def main():
+    for body_size in BODY_SIZES:
+        messages, duration = run(body_size)
+        print('%9i byte bodies: %5i messages in %.3fs, %8.1f messages/sec, '
+              '%8.1f MB/sec' % (body_size, messages, duration,
+                                messages / duration,
+                                messages * body_size / duration / 1048576))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Measure how many messages per second Connection._send_message can marshal
+when the same BasicProperties are published with every message, comparing
+spec.BasicProperties with pika.properties.FrozenBasicProperties.
+
+Run from the repository root::
+
+    python utils/benchmarks/publish_properties.py
+
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import connection
+from pika import properties
+from pika import spec
+
+MESSAGES = 100000
+BODY = 'x' * 100
+VALUES = dict(content_type='application/json',
+              delivery_mode=2,
+              headers={'x-origin': 'benchmark',
+                       'x-attempt': 1,
+                       'x-trace': 'abcdef'})
+
+
+class BenchmarkConnection(connection.Connection):
+    """Connection that does not connect and discards outbound frames"""
+
+    def connect(self):
+        pass
+
+    def _flush_outbound(self):
+        self.outbound_buffer.clear()
+
+
+def run(props):
+    """Publish MESSAGES messages with props and return the duration.
+
+    :param pika.spec.BasicProperties props: The properties to publish with
+    :rtype: float
+
+    """
+    conn = BenchmarkConnection()
+    conn._body_max_length = conn._get_body_frame_max_length()
+    method = spec.Basic.Publish(exchange='exchange', routing_key='routing.key')
+    start = time.time()
+    for _ in xrange(MESSAGES):
+        conn._send_message(1, method, (props, BODY))
+    return time.time() - start
+
+
+def main():
+    for label, props in [('BasicProperties',
+                          spec.BasicProperties(**VALUES)),
+                         ('FrozenBasicProperties',
+                          properties.FrozenBasicProperties(**VALUES))]:
+        duration = run(props)
+        print('%-22s %8i messages in %.3fs, %10.0f messages/sec' %
+              (label, MESSAGES, duration, MESSAGES / duration))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Measure the round trip latency of synchronous BlockingChannel RPCs
+against a broker stand-in that runs in another process on the loopback
+interface and answers Queue.Declare right away, with and without busy
+polling. The stand-in only speaks as much of AMQP as the benchmark needs.
+
+Run from the repository root::
+
+    python utils/benchmarks/rpc_latency.py
+
+"""
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import connection
+from pika import frame
+from pika import spec
+from pika.adapters import blocking_connection
+
+ROUND_TRIPS = 20000
+BUSY_POLLS = (0, 50, 200)
+
+
+def reply(method):
+    """Return the reply of the broker stand-in to method, or None if it does
+    not reply.
+
+    :param pika.amqp_object.Method method: The method received
+    :rtype: pika.amqp_object.Method
+
+    """
+    if isinstance(method, spec.Connection.StartOk):
+        return spec.Connection.Tune(0, spec.FRAME_MAX_SIZE, 0)
+    elif isinstance(method, spec.Connection.Open):
+        return spec.Connection.OpenOk()
+    elif isinstance(method, spec.Channel.Open):
+        return spec.Channel.OpenOk()
+    elif isinstance(method, spec.Queue.Declare):
+        return spec.Queue.DeclareOk(method.queue, 0, 0)
+    elif isinstance(method, spec.Channel.Close):
+        return spec.Channel.CloseOk()
+    elif isinstance(method, spec.Connection.Close):
+        return spec.Connection.CloseOk()
+
+
+def serve(listener):
+    """Accept a single connection and answer it until it is closed.
+
+    :param socket.socket listener: The listening socket
+
+    """
+    sock, unused_address = listener.accept()
+    sock.setsockopt(socket.SOL_TCP, socket.TCP_NODELAY, 1)
+    data = sock.recv(8)
+    assert data == 'AMQP\x00\x00\x09\x01', repr(data)
+    sock.sendall(frame.Method(0, spec.Connection.Start(
+        server_properties={'capabilities': {}},
+        mechanisms='PLAIN', locales='en_US')).marshal())
+    data = ''
+    while True:
+        value = sock.recv(65536)
+        if not value:
+            break
+        data += value
+        offset = 0
+        while True:
+            consumed, frame_value = frame.decode_frame(data, offset)
+            if not frame_value:
+                break
+            offset += consumed
+            method = reply(frame_value.method)
+            if method:
+                sock.sendall(frame.Method(frame_value.channel_number,
+                                          method).marshal())
+        data = data[offset:]
+    sock.close()
+
+
+def run(busy_poll):
+    """Make ROUND_TRIPS Queue.Declare RPCs to a broker stand-in, returning
+    the latency of each one in seconds.
+
+    :param int busy_poll: Microseconds for the connection to busy poll
+    :rtype: list
+
+    """
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+    server = multiprocessing.Process(target=serve, args=(listener,))
+    server.start()
+    parameters = connection.ConnectionParameters(
+        '127.0.0.1', listener.getsockname()[1])
+    conn = blocking_connection.BlockingConnection(parameters, busy_poll)
+    listener.close()
+    chan = conn.channel()
+    latencies = list()
+    for _ in xrange(ROUND_TRIPS):
+        start = time.time()
+        chan.queue_declare('benchmark', passive=True)
+        latencies.append(time.time() - start)
+    conn.close()
+    server.join()
+    return latencies
+
+
+def main():
+    for busy_poll in BUSY_POLLS:
+        latencies = sorted(run(busy_poll))
+        print('busy_poll %3i us: %i round trips, p50 %.1f us, '
+              'p99 %.1f us' %
+              (busy_poll, len(latencies),
+               latencies[len(latencies) // 2] * 1000000,
+               latencies[len(latencies) * 99 // 100] * 1000000))
+
+
+if __name__ == '__main__':
+    main()
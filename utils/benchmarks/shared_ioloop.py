@@ -0,0 +1,78 @@
+"""Measure how fast one IOLoop poller dispatches events to many file
+descriptors, each with its own handler as a connection would have. On each
+pass a few of the sockets get data, and the poller polls all of them once.
+
+Run from the repository root::
+
+    python utils/benchmarks/shared_ioloop.py
+
+"""
+import os
+import random
+import select
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika.adapters import select_connection
+
+SOCKET_COUNTS = (10, 100, 500)
+ACTIVE = 5
+PASSES = 5000
+
+
+def run(poller_class, count):
+    """Register count sockets with a poller and make PASSES passes with
+    ACTIVE of them readable, returning the time per pass.
+
+    :param type poller_class: The poller class
+    :param int count: The number of sockets
+    :rtype: float
+
+    """
+    pairs = [socket.socketpair() for _ in xrange(count)]
+    poller = poller_class()
+    handled = [0]
+
+    def handler(fileno, events, write_only=False):
+        readers[fileno].recv(1)
+        handled[0] += 1
+
+    readers = dict()
+    for reader, writer in pairs:
+        readers[reader.fileno()] = reader
+        poller.add_handler(reader.fileno(), handler, select_connection.READ)
+    writers = [writer for reader, writer in pairs]
+    start = time.time()
+    for _ in xrange(PASSES):
+        for writer in random.sample(writers, ACTIVE):
+            writer.send('x')
+        poller.poll()
+    duration = time.time() - start
+    assert handled[0] == PASSES * ACTIVE
+    for reader, writer in pairs:
+        reader.close()
+        writer.close()
+    return duration / PASSES
+
+
+def main():
+    pollers = [select_connection.SelectPoller]
+    if hasattr(select, 'poll'):
+        pollers.append(select_connection.PollPoller)
+    if hasattr(select, 'epoll'):
+        pollers.append(select_connection.EPollPoller)
+    if hasattr(select, 'kqueue'):
+        pollers.append(select_connection.KQueuePoller)
+    for poller_class in pollers:
+        for count in SOCKET_COUNTS:
+            duration = run(poller_class, count)
+            print('%-12s %4i sockets, %i active: %6.1f us per pass' %
+                  (poller_class.__name__, count, ACTIVE, duration * 1000000))
+
+
+if __name__ == '__main__':
+    main()
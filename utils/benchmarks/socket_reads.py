@@ -0,0 +1,128 @@
+"""Measure how fast messages are read from a socket and dispatched to a
+consumer, waiting for the socket to be readable with select as an IOLoop
+would. The socket is read with recv, appending the data to the frame buffer,
+with a single recv_into straight into the frame buffer per READ event, and
+with recv_into until the socket is drained or the read budget is spent.
+
+Run from the repository root::
+
+    python utils/benchmarks/socket_reads.py
+
+"""
+import os
+import select
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import channel
+from pika import frame
+from pika import spec
+from pika.adapters import base_connection
+
+BODY_SIZES = (4096, 128 * 1024)
+TOTAL_SIZE = 64 * 1024 * 1024
+
+
+class BenchmarkConnection(base_connection.BaseConnection):
+    """Connection that does not connect"""
+
+    def connect(self):
+        pass
+
+    def _handle_recv(self):
+        """Read with recv and append the data to the frame buffer, as the
+        connection did before it read with recv_into.
+
+        :rtype: int
+
+        """
+        data = self.socket.recv(self._buffer_size)
+        self._on_data_available(data)
+        return len(data)
+
+
+def message(body_size):
+    """Return the marshaled frames of a message with a body_size byte body.
+
+    :param int body_size: The size of the body
+    :rtype: str
+
+    """
+    return ''.join([
+        frame.Method(1, spec.Basic.Deliver('ctag1.0', 1, False, 'exchange',
+                                           'routing.key')).marshal(),
+        frame.Header(1, body_size, spec.BasicProperties()).marshal(),
+        frame.Body(1, 'x' * body_size).marshal()])
+
+
+def run(body_size, mode):
+    """Read TOTAL_SIZE bytes of messages with body_size byte bodies from a
+    socket written to by another thread, returning the number of messages,
+    the number of READ events and the time it took.
+
+    :param int body_size: The size of each message body
+    :param str mode: One of recv, recv_into or drain
+    :rtype: tuple(int, int, float)
+
+    """
+    reader, writer = socket.socketpair()
+    reader.setblocking(0)
+    conn = BenchmarkConnection()
+    conn.socket = reader
+    if mode != 'drain':
+        conn.MAX_READ_SIZE = 0
+    chan = channel.Channel(conn, 1)
+    chan._set_state(chan.OPEN)
+    conn._channels[1] = chan
+
+    received = [0]
+
+    def on_message(unused_channel, method, properties, body):
+        received[0] += 1
+
+    chan._consumers['ctag1.0'] = on_message
+    chan._pending['ctag1.0'] = list()
+
+    value = message(body_size)
+    messages = max(1, TOTAL_SIZE // body_size)
+    batch = value * max(1, 65536 // len(value))
+    batches = messages // (len(batch) // len(value))
+    messages = batches * (len(batch) // len(value))
+
+    def write():
+        for _ in xrange(batches):
+            writer.sendall(batch)
+
+    thread = threading.Thread(target=write)
+    read = conn._handle_recv if mode == 'recv' else conn._handle_read
+    events = 0
+    start = time.time()
+    thread.start()
+    while received[0] < messages:
+        select.select([reader], [], [])
+        events += 1
+        read()
+    duration = time.time() - start
+    thread.join()
+    reader.close()
+    writer.close()
+    return messages, events, duration
+
+
+def main():
+    for body_size in BODY_SIZES:
+        for mode in ('recv', 'recv_into', 'drain'):
+            messages, events, duration = run(body_size, mode)
+            print('%7i byte bodies, %-9s: %7i messages in %.3fs, '
+                  '%9.1f messages/sec, %6i READ events' %
+                  (body_size, mode, messages, duration,
+                   messages / duration, events))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Measure the per call cost of decoding and encoding the AMQP methods and
+properties that are on the hot path of publishing and consuming.
+
+Run from the repository root::
+
+    python utils/benchmarks/spec_decode.py
+
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import spec
+
+ITERATIONS = 200000
+
+VALUES = [
+    ('Basic.Deliver',
+     spec.Basic.Deliver('ctag1.0', 1, False, 'exchange', 'routing.key')),
+    ('Basic.Ack', spec.Basic.Ack(1, False)),
+    ('Basic.Publish', spec.Basic.Publish(0, 'exchange', 'routing.key')),
+    ('BasicProperties',
+     spec.BasicProperties(content_type='text/plain', delivery_mode=2)),
+    ('BasicProperties (all fields)',
+     spec.BasicProperties(content_type='application/json',
+                          content_encoding='gzip',
+                          headers={'key': 'value', 'count': 1},
+                          delivery_mode=2,
+                          priority=5,
+                          correlation_id='correlation',
+                          reply_to='reply.to',
+                          expiration='60000',
+                          message_id='message.id',
+                          timestamp=1380000000,
+                          type='type',
+                          user_id='guest',
+                          app_id='benchmark',
+                          cluster_id='cluster'))]
+
+
+def per_call(function):
+    """Return the best per call time of function in microseconds.
+
+    :param callable function: The function to time
+    :rtype: float
+
+    """
+    timer = timeit.Timer(function)
+    return min(timer.repeat(3, ITERATIONS)) / ITERATIONS * 1000000
+
+
+def main():
+    print('%-30s %12s %12s' % ('', 'decode (us)', 'encode (us)'))
+    for name, value in VALUES:
+        cls = value.__class__
+        encoded = ''.join(value.encode())
+        print('%-30s %12.2f %12.2f' %
+              (name,
+               per_call(lambda: cls().decode(encoded)),
+               per_call(value.encode)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""Measure how fast messages are read from a plain and an SSL socket and
+dispatched to a consumer, waiting for the socket to be readable with select
+as an IOLoop would. The SSL socket is read once per READ event, and until it
+is drained or the read budget is spent. A self-signed certificate for the
+SSL socket is created with the openssl command line tool.
+
+Run from the repository root::
+
+    python utils/benchmarks/ssl_reads.py
+
+"""
+import os
+import select
+import shutil
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika import channel
+from pika import frame
+from pika import spec
+from pika.adapters import base_connection
+
+BODY_SIZES = (4096, 128 * 1024)
+TOTAL_SIZE = 64 * 1024 * 1024
+
+
+class BenchmarkConnection(base_connection.BaseConnection):
+    """Connection that does not connect"""
+
+    def connect(self):
+        pass
+
+
+def create_certificate(path):
+    """Create a self-signed certificate and its key in path, returning the
+    paths of the certificate and the key.
+
+    :param str path: The directory to create them in
+    :rtype: tuple(str, str)
+
+    """
+    certfile = os.path.join(path, 'cert.pem')
+    keyfile = os.path.join(path, 'key.pem')
+    with open(os.devnull, 'w') as devnull:
+        subprocess.check_call(['openssl', 'req', '-x509', '-newkey',
+                               'rsa:2048', '-nodes', '-days', '1',
+                               '-subj', '/CN=localhost', '-keyout', keyfile,
+                               '-out', certfile],
+                              stdout=devnull, stderr=devnull)
+    return certfile, keyfile
+
+
+def message(body_size):
+    """Return the marshaled frames of a message with a body_size byte body.
+
+    :param int body_size: The size of the body
+    :rtype: str
+
+    """
+    return ''.join([
+        frame.Method(1, spec.Basic.Deliver('ctag1.0', 1, False, 'exchange',
+                                           'routing.key')).marshal(),
+        frame.Header(1, body_size, spec.BasicProperties()).marshal(),
+        frame.Body(1, 'x' * body_size).marshal()])
+
+
+def run(body_size, mode, certfile, keyfile):
+    """Read TOTAL_SIZE bytes of messages with body_size byte bodies from a
+    socket written to by another thread, returning the number of messages,
+    the number of READ events and the time it took.
+
+    :param int body_size: The size of each message body
+    :param str mode: One of plain, ssl-single or ssl-drain
+    :param str certfile: The path of the server certificate
+    :param str keyfile: The path of the server key
+    :rtype: tuple(int, int, float)
+
+    """
+    reader, writer = [socket.socket(_sock=value)
+                      for value in socket.socketpair()]
+    conn = BenchmarkConnection()
+    if mode != 'plain':
+        server = []
+
+        def handshake():
+            server.append(ssl.wrap_socket(writer, keyfile, certfile,
+                                          server_side=True))
+
+        thread = threading.Thread(target=handshake)
+        thread.start()
+        reader = ssl.wrap_socket(reader)
+        thread.join()
+        writer = server[0]
+        conn.params.ssl = True
+        if mode == 'ssl-single':
+            conn.MAX_READ_SIZE = 0
+    reader.setblocking(0)
+    conn.socket = reader
+    chan = channel.Channel(conn, 1)
+    chan._set_state(chan.OPEN)
+    conn._channels[1] = chan
+
+    received = [0]
+
+    def on_message(unused_channel, method, properties, body):
+        received[0] += 1
+
+    chan._consumers['ctag1.0'] = on_message
+    chan._pending['ctag1.0'] = list()
+
+    value = message(body_size)
+    messages = max(1, TOTAL_SIZE // body_size)
+    batch = value * max(1, 65536 // len(value))
+    batches = messages // (len(batch) // len(value))
+    messages = batches * (len(batch) // len(value))
+
+    def write():
+        for _ in xrange(batches):
+            writer.sendall(batch)
+
+    thread = threading.Thread(target=write)
+    events = 0
+    start = time.time()
+    thread.start()
+    while received[0] < messages:
+        select.select([reader], [], [])
+        events += 1
+        conn._handle_read()
+    duration = time.time() - start
+    thread.join()
+    reader.close()
+    writer.close()
+    return messages, events, duration
+
+
+def main():
+    path = tempfile.mkdtemp()
+    try:
+        certfile, keyfile = create_certificate(path)
+        for body_size in BODY_SIZES:
+            for mode in ('plain', 'ssl-single', 'ssl-drain'):
+                messages, events, duration = run(body_size, mode, certfile,
+                                                 keyfile)
+                print('%7i byte bodies, %-10s: %6i messages in %.3fs, '
+                      '%8.1f MB/sec, %6i READ events' %
+                      (body_size, mode, messages, duration,
+                       messages * body_size / duration / 1048576, events))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Measure the cost of the SelectPoller timeouts with many of them pending:
+adding them, processing them on every pass of the IOLoop when none are due,
+and removing them, the last one added first.
+
+Run from the repository root::
+
+    python utils/benchmarks/timeouts.py
+
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__),
+                                                 '..', '..')))
+
+from pika.adapters import select_connection
+
+TIMEOUT_COUNTS = (100, 1000, 10000)
+PASSES = 1000
+
+
+def callback():
+    pass
+
+
+def run(count):
+    """Add count timeouts, process them PASSES times and remove them,
+    returning the time each step took per operation.
+
+    :param int count: The number of timeouts
+    :rtype: tuple(float, float, float)
+
+    """
+    poller = select_connection.SelectPoller(0, None, 0, None)
+    start = time.time()
+    handles = [poller.add_timeout(3600 + index, callback)
+               for index in xrange(count)]
+    added = (time.time() - start) / count
+    start = time.time()
+    for _ in xrange(PASSES):
+        poller.process_timeouts()
+    processed = (time.time() - start) / PASSES
+    start = time.time()
+    for handle in reversed(handles):
+        poller.remove_timeout(handle)
+    removed = (time.time() - start) / count
+    return added, processed, removed
+
+
+def main():
+    for count in TIMEOUT_COUNTS:
+        added, processed, removed = run(count)
+        print('%6i timeouts: add %.2f us, process pass %.2f us, '
+              'remove %.2f us' % (count, added * 1000000,
+                                  processed * 1000000, removed * 1000000))
+
+
+if __name__ == '__main__':
+    main()
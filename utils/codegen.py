@@ -7,6 +7,7 @@
 from __future__ import nested_scopes
 
 import os
+import struct
 import sys
 
 RABBITMQ_PUBLIC_UMBRELLA = '../../rabbitmq-public-umbrella'
@@ -71,6 +72,26 @@ amqp_codegen.AmqpMethod.structName = lambda m: camel(m.klass.name) + '.' + camel
 amqp_codegen.AmqpClass.structName = lambda c: camel(c.name) + "Properties"
 
 
+# Struct format characters of the fixed width domains
+STRUCT_FORMATS = {
+    'octet': 'B',
+    'short': 'H',
+    'long': 'I',
+    'longlong': 'Q',
+    'timestamp': 'Q'
+    }
+
+# Struct format characters of the string domain length prefixes
+LENGTH_FORMATS = {
+    'shortstr': 'B',
+    'longstr': 'I'
+    }
+
+
+def structName(fmt):
+    return '_STRUCT_' + fmt
+
+
 def constantName(s):
     return '_'.join(re.split('[- ]', s.upper()))
 
@@ -85,100 +106,116 @@ def flagName(c, f):
 def generate(specPath):
     spec = amqp_codegen.AmqpSpec(specPath)
 
-    def genSingleDecode(prefix, cLvalue, unresolved_domain):
-        type = spec.resolveDomain(unresolved_domain)
-        if type == 'shortstr':
-            print(prefix + "length = struct.unpack_from('B', encoded, offset)[0]")
-            print(prefix + "offset += 1")
-            print(prefix + "%s = encoded[offset:offset + length]" % cLvalue)
-            print(prefix + "try:")
-            print(prefix + "    %s = str(%s)" % (cLvalue, cLvalue))
-            print(prefix + "except UnicodeEncodeError:")
-            print(prefix + "    pass")
-            print(prefix + "offset += length")
-        elif type == 'longstr':
-            print(prefix + "length = struct.unpack_from('>I', encoded, offset)[0]")
-            print(prefix + "offset += 4")
+    def fieldRuns(fields):
+        """Group fields into runs of adjacent fixed width values that are
+        packed and unpacked with a single precompiled struct. A run ends with
+        the length prefix of a string, and tables are a run of their own."""
+        runs = []
+        run = []
+        bitindex = None
+        for f in fields:
+            type = spec.resolveDomain(f.domain)
+            if type == 'bit':
+                if bitindex is None or bitindex >= 8:
+                    if [item for item in run if item[0] == 'bits']:
+                        runs.append(run)
+                        run = []
+                    run.append(('bits', 'B', []))
+                    bitindex = 0
+                run[-1][2].append((f, bitindex))
+                bitindex += 1
+                continue
+            bitindex = None
+            if type in STRUCT_FORMATS:
+                run.append(('field', STRUCT_FORMATS[type], f))
+            elif type in LENGTH_FORMATS:
+                run.append(('string', LENGTH_FORMATS[type], f))
+                runs.append(run)
+                run = []
+            elif type == 'table':
+                if run:
+                    runs.append(run)
+                    run = []
+                runs.append([('table', None, f)])
+            else:
+                raise Exception("Illegal domain in fieldRuns", type)
+        if run:
+            runs.append(run)
+        return runs
+
+    def runFormat(run):
+        if run[0][0] == 'table':
+            return None
+        return ''.join([item[1] for item in run])
+
+    def genDecodeRun(prefix, run):
+        kind, fmt, f = run[-1]
+        if kind == 'table':
+            print(prefix + "(self.%s, offset) = data.decode_table(encoded, offset)" % \
+                  pyize(f.name))
+            return
+        fmt = runFormat(run)
+        targets = []
+        for kind, _, value in run:
+            if kind == 'bits':
+                targets.append('bit_buffer')
+            elif kind == 'string':
+                targets.append('length')
+            else:
+                targets.append('self.%s' % pyize(value.name))
+        if len(targets) == 1:
+            print(prefix + "%s = %s.unpack_from(encoded, offset)[0]" % \
+                  (targets[0], structName(fmt)))
+        else:
+            print(prefix + "(%s) = %s.unpack_from(encoded, offset)" % \
+                  (', '.join(targets), structName(fmt)))
+        print(prefix + "offset += %d" % struct.calcsize('>' + fmt))
+        for kind, _, value in run:
+            if kind == 'bits':
+                for bf, bitindex in value:
+                    print(prefix + "self.%s = (bit_buffer & (1 << %d)) != 0" % \
+                          (pyize(bf.name), bitindex))
+        if kind == 'string':
+            cLvalue = 'self.%s' % pyize(f.name)
             print(prefix + "%s = encoded[offset:offset + length]" % cLvalue)
             print(prefix + "try:")
             print(prefix + "    %s = str(%s)" % (cLvalue, cLvalue))
             print(prefix + "except UnicodeEncodeError:")
             print(prefix + "    pass")
             print(prefix + "offset += length")
-        elif type == 'octet':
-            print(prefix + "%s = struct.unpack_from('B', encoded, offset)[0]" % cLvalue)
-            print(prefix + "offset += 1")
-        elif type == 'short':
-            print(prefix + "%s = struct.unpack_from('>H', encoded, offset)[0]" % cLvalue)
-            print(prefix + "offset += 2")
-        elif type == 'long':
-            print(prefix + "%s = struct.unpack_from('>I', encoded, offset)[0]" % cLvalue)
-            print(prefix + "offset += 4")
-        elif type == 'longlong':
-            print(prefix + "%s = struct.unpack_from('>Q', encoded, offset)[0]" % cLvalue)
-            print(prefix + "offset += 8")
-        elif type == 'timestamp':
-            print(prefix + "%s = struct.unpack_from('>Q', encoded, offset)[0]" % cLvalue)
-            print(prefix + "offset += 8")
-        elif type == 'bit':
-            raise Exception("Can't decode bit in genSingleDecode")
-        elif type == 'table':
-            print(Exception(prefix + "(%s, offset) = data.decode_table(encoded, offset)" % \
-                  cLvalue))
-        else:
-            raise Exception("Illegal domain in genSingleDecode", type)
-
-    def genSingleEncode(prefix, cValue, unresolved_domain):
-        type = spec.resolveDomain(unresolved_domain)
-        if type == 'shortstr':
-            print(prefix + \
-                "assert isinstance(%s, basestring),\\\n%s       'A non-bytestring value was supplied for %s'" \
-                % (cValue, prefix, cValue))
-            print(prefix + "value = %s.encode('utf-8') if isinstance(%s, unicode) else %s" % (cValue, cValue, cValue))
-            print(prefix + "pieces.append(struct.pack('B', len(value)))")
-            print(prefix + "pieces.append(value)")
-        elif type == 'longstr':
-            print(prefix + \
-                "assert isinstance(%s, basestring),\\\n%s       'A non-bytestring value was supplied for %s'" \
-                % (cValue, prefix ,cValue))
-            print(prefix + "value = %s.encode('utf-8') if isinstance(%s, unicode) else %s" % (cValue, cValue, cValue))
-            print(prefix + "pieces.append(struct.pack('>I', len(value)))")
+
+    def genEncodeRun(prefix, run):
+        kind, fmt, f = run[-1]
+        if kind == 'table':
+            print(prefix + "data.encode_table(pieces, self.%s)" % pyize(f.name))
+            return
+        values = []
+        for kind, _, value in run:
+            if kind == 'bits':
+                print(prefix + "bit_buffer = 0")
+                for bf, bitindex in value:
+                    print(prefix + "if self.%s:" % pyize(bf.name))
+                    print(prefix + "    bit_buffer = bit_buffer | (1 << %d)" % \
+                          bitindex)
+                values.append('bit_buffer')
+            elif kind == 'string':
+                cValue = 'self.%s' % pyize(value.name)
+                print(prefix + \
+                    "assert isinstance(%s, basestring),\\\n%s       'A non-bytestring value was supplied for %s'" \
+                    % (cValue, prefix, cValue))
+                print(prefix + "value = %s.encode('utf-8') if isinstance(%s, unicode) else %s" % (cValue, cValue, cValue))
+                values.append('len(value)')
+            else:
+                values.append('self.%s' % pyize(value.name))
+        print(prefix + "pieces.append(%s.pack(%s))" % \
+              (structName(runFormat(run)), ', '.join(values)))
+        if kind == 'string':
             print(prefix + "pieces.append(value)")
-        elif type == 'octet':
-            print(prefix + "pieces.append(struct.pack('B', %s))" % cValue)
-        elif type == 'short':
-            print(prefix + "pieces.append(struct.pack('>H', %s))" % cValue)
-        elif type == 'long':
-            print(prefix + "pieces.append(struct.pack('>I', %s))" % cValue)
-        elif type == 'longlong':
-            print(prefix + "pieces.append(struct.pack('>Q', %s))" % cValue)
-        elif type == 'timestamp':
-            print(prefix + "pieces.append(struct.pack('>Q', %s))" % cValue)
-        elif type == 'bit':
-            raise Exception("Can't encode bit in genSingleEncode")
-        elif type == 'table':
-            print(Exception(prefix + "data.encode_table(pieces, %s)" % cValue))
-        else:
-            raise Exception("Illegal domain in genSingleEncode", type)
 
     def genDecodeMethodFields(m):
         print("        def decode(self, encoded, offset=0):")
-        bitindex = None
-        for f in m.arguments:
-            if spec.resolveDomain(f.domain) == 'bit':
-                if bitindex is None:
-                    bitindex = 0
-                if bitindex >= 8:
-                    bitindex = 0
-                if not bitindex:
-                    print("            bit_buffer = struct.unpack_from('B', encoded, offset)[0]")
-                    print("            offset += 1")
-                print("            self.%s = (bit_buffer & (1 << %d)) != 0" % \
-                      (pyize(f.name), bitindex))
-                bitindex += 1
-            else:
-                bitindex = None
-                genSingleDecode("            ", "self.%s" % (pyize(f.name),), f.domain)
+        for run in fieldRuns(m.arguments):
+            genDecodeRun("            ", run)
         print("            return self")
         print('')
 
@@ -187,7 +224,8 @@ def generate(specPath):
         print("        flags = 0")
         print("        flagword_index = 0")
         print("        while True:")
-        print("            partial_flags = struct.unpack_from('>H', encoded, offset)[0]")
+        print("            partial_flags = %s.unpack_from(encoded, offset)[0]" % \
+              structName('H'))
         print("            offset += 2")
         print("            flags = flags | (partial_flags << (flagword_index * 16))")
         print("            if not (partial_flags & 1):")
@@ -198,7 +236,7 @@ def generate(specPath):
                 print("        self.%s = (flags & %s) != 0" % (pyize(f.name), flagName(c, f)))
             else:
                 print("        if flags & %s:" % (flagName(c, f),))
-                genSingleDecode("            ", "self.%s" % (pyize(f.name),), f.domain)
+                genDecodeRun("            ", fieldRuns([f])[0])
                 print("        else:")
                 print("            self.%s = None" % (pyize(f.name),))
         print("        return self")
@@ -207,29 +245,8 @@ def generate(specPath):
     def genEncodeMethodFields(m):
         print("        def encode(self):")
         print("            pieces = list()")
-        bitindex = None
-
-        def finishBits():
-            if bitindex is not None:
-                print("            pieces.append(struct.pack('B', bit_buffer))")
-        for f in m.arguments:
-            if spec.resolveDomain(f.domain) == 'bit':
-                if bitindex is None:
-                    bitindex = 0
-                    print("            bit_buffer = 0")
-                if bitindex >= 8:
-                    finishBits()
-                    print("            bit_buffer = 0")
-                    bitindex = 0
-                print("            if self.%s:" % pyize(f.name))
-                print("                bit_buffer = bit_buffer | (1 << %d)" % \
-                    bitindex)
-                bitindex += 1
-            else:
-                finishBits()
-                bitindex = None
-                genSingleEncode("            ", "self.%s" % (pyize(f.name),), f.domain)
-        finishBits()
+        for run in fieldRuns(m.arguments):
+            genEncodeRun("            ", run)
         print("            return pieces")
         print('')
 
@@ -243,20 +260,33 @@ def generate(specPath):
             else:
                 print("        if self.%s is not None:" % (pyize(f.name),))
                 print("            flags = flags | %s" % (flagName(c, f),))
-                genSingleEncode("            ", "self.%s" % (pyize(f.name),), f.domain)
+                genEncodeRun("            ", fieldRuns([f])[0])
         print("        flag_pieces = list()")
         print("        while True:")
         print("            remainder = flags >> 16")
         print("            partial_flags = flags & 0xFFFE")
         print("            if remainder != 0:")
         print("                partial_flags |= 1")
-        print("            flag_pieces.append(struct.pack('>H', partial_flags))")
+        print("            flag_pieces.append(%s.pack(partial_flags))" % \
+              structName('H'))
         print("            flags = remainder")
         print("            if not flags:")
         print("                break")
         print("        return flag_pieces + pieces")
         print('')
 
+    def structFormats():
+        formats = set(['H'])
+        for m in spec.allMethods():
+            for run in fieldRuns(m.arguments):
+                formats.add(runFormat(run))
+        for c in spec.allClasses():
+            for f in c.fields:
+                if spec.resolveDomain(f.domain) != 'bit':
+                    formats.add(runFormat(fieldRuns([f])[0]))
+        formats.discard(None)
+        return sorted(formats)
+
     def fieldDeclList(fields):
         return ''.join([", %s=%s" % (pyize(f.name), fieldvalue(f.defaultvalue)) for f in fields])
 
@@ -299,6 +329,11 @@ from pika import data
         print("%s = %s" % (key, constants[key]))
     print('')
 
+    # Precompiled structs shared by the generated encode and decode methods
+    for fmt in structFormats():
+        print("%s = struct.Struct('>%s')" % (structName(fmt), fmt))
+    print('')
+
     for c in spec.allClasses():
         print('')
         print('class %s(amqp_object.Class):' % (camel(c.name),))